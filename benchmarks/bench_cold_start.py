@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold-start cost of the package in fresh interpreters, as paid by a
+worker that starts, imports math_interpreter and evaluates one formula.
+
+Reports the import time, the latency of the first evaluation and the total,
+for the lazy package namespace and for loading every public name up front.
+For a per-module breakdown run:
+
+    python -X importtime -c "import math_interpreter"
+
+Run from the repository root:
+
+    python benchmarks/bench_cold_start.py
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import math_interpreter
+{load}
+imported = time.perf_counter()
+from math_interpreter import Context, parse
+context = Context()
+context.set_variable("x", 2.0)
+context.set_variable("y", 3.0)
+parse("x * 2 + y / 4 - 1").interpret(context)
+evaluated = time.perf_counter()
+print(json.dumps([imported - start, evaluated - imported, len(sys.modules)]))
+"""
+
+
+def cold_start(load: str):
+    """Run one fresh interpreter and return its import and first-evaluation times."""
+    output = subprocess.run([sys.executable, "-c", SCRIPT.format(load=load)], cwd=ROOT,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    """Compare lazy loading against loading every public name at import."""
+    runs = 15
+    variants = (
+        ("lazy", ""),
+        ("all names", "from math_interpreter import *"),
+    )
+    print(f"{'namespace':<12}{'import ms':>11}{'first eval ms':>15}{'total ms':>10}{'modules':>9}")
+    for label, load in variants:
+        samples = [cold_start(load) for _ in range(runs)]
+        imports = statistics.median(sample[0] for sample in samples)
+        first = statistics.median(sample[1] for sample in samples)
+        modules = samples[-1][2]
+        print(f"{label:<12}{imports * 1e3:>11.2f}{first * 1e3:>15.2f}"
+              f"{(imports + first) * 1e3:>10.2f}{modules:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark: interpret calls and evaluation time of fused against plain trees,
+and program length and run time with and without superinstructions.
+
+Run from the repository root:
+
+    python benchmarks/bench_fusion.py
+"""
+
+import os
+import sys
+import timeit
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from math_interpreter.compiler import compile_expression
+from math_interpreter.fusion import fuse
+from math_interpreter.rebalance import rebalance
+from math_interpreter.workloads import (
+    balanced_tree, random_context, random_tree, variable_names, wide_sum,
+)
+
+
+def compile_plain(expression):
+    """Compile an expression without combining instructions into superinstructions."""
+    with mock.patch('math_interpreter.compiler._superinstructions',
+                    lambda instructions, root, table: (instructions, root)):
+        return compile_expression(expression)
+
+
+def main():
+    """Compare plain and fused evaluation on generated trees."""
+    repeat = 20
+    variables = 16
+    context = random_context(variable_names(variables), seed=1)
+    trees = (
+        ("wide sum 4k", wide_sum(4096, variable_count=variables, seed=1)),
+        ("balanced 4k", balanced_tree(4096, variable_count=variables, seed=1)),
+        ("random 8k", rebalance(random_tree(8191, variable_count=variables, seed=1))),
+    )
+    print(f"{'tree':<14}{'form':<8}{'calls':>8}{'interpret us':>15}{'program':>9}{'run us':>10}")
+    for label, tree in trees:
+        fused = fuse(tree)
+        assert str(fused) == str(tree)
+        assert fused.interpret(context) == tree.interpret(context)
+        programs = (compile_plain(tree), compile_expression(tree))
+        for form, expression, program in (("plain", tree, programs[0]), ("fused", fused, programs[1])):
+            interpret = min(timeit.repeat(lambda: expression.interpret(context), number=repeat, repeat=5)) / repeat
+            run = min(timeit.repeat(lambda: program.run(context), number=repeat, repeat=5)) / repeat
+            print(f"{label:<14}{form:<8}{expression.node_count():>8}{interpret * 1e6:>15.1f}"
+                  f"{len(program):>9}{run * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark: evaluating many linear formulas as linear forms against
+interpreting them one by one and running their compiled programs.
+
+Run from the repository root:
+
+    python benchmarks/bench_linear.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from math_interpreter.compiler import compile_expression
+from math_interpreter.linear import LinearSystem, linear_form
+from math_interpreter.workloads import random_columns, random_context, variable_names, wide_sum
+
+
+def main():
+    """Compare per-formula and linear-form evaluation for one context and for a batch."""
+    formulas = [wide_sum(16, variable_count=64, seed=seed) for seed in range(1000)]
+    names = variable_names(64)
+    context = random_context(names, seed=1)
+    rows = 200
+    columns = random_columns(names, rows, seed=1)
+
+    forms = [linear_form(formula) for formula in formulas]
+    system = LinearSystem(forms)
+    programs = [compile_expression(formula) for formula in formulas]
+
+    single = (
+        ("interpret", lambda: [formula.interpret(context) for formula in formulas]),
+        ("program", lambda: [program.run(context) for program in programs]),
+        ("linear forms", lambda: [form.evaluate(context) for form in forms]),
+        ("linear system", lambda: system.evaluate(context)),
+    )
+    batch = (
+        ("program batch", lambda: [program.run_batch(columns, rows) for program in programs]),
+        ("linear system", lambda: system.evaluate_batch(columns, rows)),
+    )
+    print(f"{len(formulas)} formulas of 16 terms over {len(names)} variables")
+    for title, cases, repeat in (("one context", single, 20), (f"{rows} rows", batch, 2)):
+        print(f"\n{title}")
+        for label, run in cases:
+            seconds = min(timeit.repeat(run, number=repeat, repeat=3)) / repeat
+            print(f"  {label:<16}{seconds * 1e3:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the cost of metrics on instrumented entry points, comparing the
+undecorated function, the decorated function with metrics disabled and the
+decorated function recording into an active registry.
+
+Run from the repository root:
+
+    python benchmarks/bench_metrics.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from math_interpreter import metrics
+from math_interpreter.limits import EvaluationLimits
+from math_interpreter.multi_eval import evaluate_many
+from math_interpreter.scenarios import evaluate_scenarios
+from math_interpreter.workloads import random_context, random_tree, variable_names
+
+
+def main():
+    """Time small and medium calls of several entry points in each metrics state."""
+    names = variable_names(8)
+    context = random_context(names, seed=1)
+    limits = EvaluationLimits(max_nodes=100000)
+    cases = []
+    for size in (7, 101, 1001):
+        tree = random_tree(size, seed=size)
+        tree.node_count()
+        cases.extend([
+            (f"EvaluationLimits.evaluate {size}", EvaluationLimits.evaluate, (limits, tree, context)),
+            (f"evaluate_many {size}", evaluate_many, ([tree], context)),
+            (f"evaluate_scenarios {size}", evaluate_scenarios, (tree, context, [{"x0": 1.0}])),
+        ])
+
+    print(f"{'entry point':<34}{'plain us':>10}{'disabled':>10}{'enabled':>10}{'overhead':>10}")
+    for label, function, args in cases:
+        number = 5000 if label.endswith(" 7") else 500
+        timings = []
+        for run, enabled in ((function.__wrapped__, False), (function, False), (function, True)):
+            if enabled:
+                metrics.enable()
+            else:
+                metrics.disable()
+            seconds = min(timeit.repeat(lambda: run(*args), number=number, repeat=3)) / number
+            timings.append(seconds)
+        metrics.disable()
+        plain, disabled, enabled = timings
+        print(f"{label:<34}{plain * 1e6:>10.2f}{disabled * 1e6:>10.2f}{enabled * 1e6:>10.2f}"
+              f"{(enabled / plain - 1) * 100:>9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
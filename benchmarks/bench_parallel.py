@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Benchmark: evaluating one large balanced tree with evaluate_parallel against
+plain interpret, for a growing number of worker processes.
+
+The parallel times include creating the worker pool. Speedups need as many
+idle CPU cores as workers; on a single core every worker count is slower
+than interpret.
+
+Run from the repository root:
+
+    python benchmarks/bench_parallel.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from math_interpreter.parallel import evaluate_parallel
+from math_interpreter.workloads import balanced_tree, random_context, variable_names
+
+
+def best_of(run, repeat: int = 3) -> float:
+    """Return the fastest of several timed runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    """Compare interpret with evaluate_parallel on one tree of several million nodes."""
+    tree = balanced_tree(2000000, seed=1)
+    context = random_context(variable_names(8), seed=1)
+    cores = os.cpu_count() or 1
+    print(f"{2 * 2000000 - 1} nodes, {cores} CPU cores")
+
+    baseline = best_of(lambda: tree.interpret(context))
+    print(f"{'interpret':<14}{baseline * 1e3:>10.1f} ms")
+    for workers in sorted({1, 2, 4, cores}):
+        seconds = best_of(lambda: evaluate_parallel(tree, context, max_workers=workers))
+        print(f"{workers:>2} workers    {seconds * 1e3:>10.1f} ms{baseline / seconds:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: payload size and pickle/unpickle time of the flat tree encoding
+against pickling the nested node objects.
+
+Run from the repository root:
+
+    python benchmarks/bench_pickle.py
+"""
+
+import copyreg
+import io
+import os
+import pickle
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from math_interpreter.expression import Expression
+from math_interpreter.workloads import balanced_tree, left_chain, random_tree
+
+
+def _nested_reduce(node):
+    """Reduce a node the way pickle does by default: its class and attributes."""
+    return copyreg.__newobj__, (type(node),), dict(node.__dict__)
+
+
+def _node_classes():
+    pending = [Expression]
+    for cls in pending:
+        pending.extend(cls.__subclasses__())
+    return pending
+
+
+def dumps_nested(expression):
+    """Pickle an expression as a nested object graph."""
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = {cls: _nested_reduce for cls in _node_classes()}
+    pickler.dump(expression)
+    return buffer.getvalue()
+
+
+def dumps_flat(expression):
+    """Pickle an expression through Expression.__reduce__."""
+    return pickle.dumps(expression, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def main():
+    """Compare both encodings on balanced, random and chained trees."""
+    repeat = 5
+    trees = (
+        ("balanced 64k", balanced_tree(65536, seed=1)),
+        ("random 64k", random_tree(65536, seed=1)),
+        ("chain 900", left_chain(900, seed=1)),
+        ("chain 100k", left_chain(100000, seed=1)),
+    )
+    print(f"{'tree':<14}{'encoding':<10}{'bytes':>12}{'dumps ms':>11}{'loads ms':>11}")
+    for label, tree in trees:
+        for name, dumps in (("nested", dumps_nested), ("flat", dumps_flat)):
+            try:
+                payload = dumps(tree)
+                pickle.loads(payload)
+            except RecursionError:
+                print(f"{label:<14}{name:<10}{'RecursionError':>34}")
+                continue
+            dump_time = timeit.timeit(lambda: dumps(tree), number=repeat) / repeat
+            load_time = timeit.timeit(lambda: pickle.loads(payload), number=repeat) / repeat
+            print(f"{label:<14}{name:<10}{len(payload):>12,}{dump_time * 1e3:>11.1f}{load_time * 1e3:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark: evaluation time and peak stack depth before and after rebalancing.
+
+Run from the repository root:
+
+    python benchmarks/bench_rebalance.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from math_interpreter.compiler import compile_expression
+from math_interpreter.rebalance import rebalance, tree_depth
+from math_interpreter.workloads import left_chain, random_context, variable_names
+
+
+def peak_interpret_frames(expression, context):
+    """Measure the deepest nesting of interpret calls during one evaluation."""
+    depth = 0
+    peak = 0
+
+    def profile(frame, event, arg):
+        nonlocal depth, peak
+        if frame.f_code.co_name != "interpret":
+            return
+        if event == "call":
+            depth += 1
+            peak = max(peak, depth)
+        elif event == "return":
+            depth -= 1
+
+    sys.setprofile(profile)
+    try:
+        expression.interpret(context)
+    finally:
+        sys.setprofile(None)
+    return peak
+
+
+def main():
+    """Compare a folded chain against its rebalanced form."""
+    length = 900  # Stays below the default recursion limit for interpret.
+    repeat = 200
+    expression = left_chain(length, variable_count=16, seed=1, multiplication_rate=0.0)
+    balanced = rebalance(expression)
+    context = random_context(variable_names(16), seed=1)
+
+    print(f"{'tree':<12}{'depth':>8}{'frames':>10}{'interpret us':>15}{'program us':>13}")
+    for label, tree in (("left chain", expression), ("rebalanced", balanced)):
+        program = compile_expression(tree)
+        interpret = timeit.timeit(lambda: tree.interpret(context), number=repeat) / repeat
+        run = timeit.timeit(lambda: program.run(context), number=repeat) / repeat
+        print(f"{label:<12}{tree_depth(tree):>8}{peak_interpret_frames(tree, context):>10}"
+              f"{interpret * 1e6:>15.1f}{run * 1e6:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
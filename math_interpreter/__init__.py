@@ -1,21 +1,92 @@
 """
 Math Interpreter - A mathematical expression interpreter using the Interpreter Pattern.
+
+The public names are loaded on first access, so importing the package does
+not import the evaluation engines, the server or their dependencies until
+they are used. The rebalance function is the exception: it shares its name
+with its submodule, and importing that submodule would otherwise replace
+the function with the module, so it is bound eagerly. It needs only the
+core expression modules.
 """
 
-from math_interpreter.expression import Expression
-from math_interpreter.context import Context
-from math_interpreter.terminal_expressions import Constant, Variable
-from math_interpreter.non_terminal_expressions import Addition, Multiplication
-from math_interpreter.exceptions import InterpreterError, VariableNotDefinedError, InvalidExpressionError
-
-__all__ = [
-    'Expression',
-    'Context',
-    'Constant',
-    'Variable',
-    'Addition',
-    'Multiplication',
-    'InterpreterError',
-    'VariableNotDefinedError',
-    'InvalidExpressionError',
-]
\ No newline at end of file
+import importlib
+
+__version__ = "0.1.0"
+
+# The submodule defining every public name; None marks a public submodule.
+_EXPORTS = {
+    'Expression': 'expression',
+    'Context': 'context',
+    'Constant': 'terminal_expressions',
+    'Variable': 'terminal_expressions',
+    'BinaryOperation': 'non_terminal_expressions',
+    'Addition': 'non_terminal_expressions',
+    'Multiplication': 'non_terminal_expressions',
+    'Subtraction': 'non_terminal_expressions',
+    'Division': 'non_terminal_expressions',
+    'Power': 'non_terminal_expressions',
+    'InterpreterError': 'exceptions',
+    'VariableNotDefinedError': 'exceptions',
+    'InvalidExpressionError': 'exceptions',
+    'DivisionByZeroError': 'exceptions',
+    'CircularDependencyError': 'exceptions',
+    'EvaluationLimitError': 'exceptions',
+    'Operator': 'operators',
+    'register_operator': 'operators',
+    'get_operator': 'operators',
+    'ColumnStore': 'columnar',
+    'evaluate_columns': 'columnar',
+    'Program': 'compiler',
+    'compile_expression': 'compiler',
+    'structural_key': 'compiler',
+    'ExpressionCache': 'cache',
+    'workloads': None,
+    'rebalance': 'rebalance',
+    'balanced_sum': 'rebalance',
+    'balanced_product': 'rebalance',
+    'tree_depth': 'rebalance',
+    'evaluate_parallel': 'parallel',
+    'parse': 'parser',
+    'ShortCircuitEvaluator': 'shortcircuit',
+    'evaluate_scenarios': 'scenarios',
+    'FormulaRegistry': 'formulas',
+    'EvaluationLimits': 'limits',
+    'replace': 'persistent',
+    'evaluate_many': 'multi_eval',
+    'metrics': None,
+    'MetricsRegistry': 'metrics',
+    'bounds': 'intervals',
+    'prune_partitions': 'intervals',
+    'select_typecode': 'intervals',
+    'Tracer': 'tracing',
+    'format_trace': 'tracing',
+    'ExpressionBuilder': 'builder',
+    'MultiplyAdd': 'fusion',
+    'AddMultiply': 'fusion',
+    'ScaledVariable': 'fusion',
+    'fuse': 'fusion',
+    'unfuse': 'fusion',
+    'LinearForm': 'linear',
+    'LinearSystem': 'linear',
+    'linear_form': 'linear',
+}
+
+__all__ = list(_EXPORTS)
+
+from math_interpreter.rebalance import rebalance  # noqa: E402
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name, False)
+    if module is False:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if module is None:
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
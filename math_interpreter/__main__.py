@@ -0,0 +1,106 @@
+"""
+Command-line entry point for the Math Interpreter.
+
+Usage:
+    python -m math_interpreter serve [--host HOST] [--port PORT]
+    python -m math_interpreter eval FORMULAS (--csv FILE | --columns DIR) [--workers N]
+"""
+
+import argparse
+import os
+import sys
+
+
+def _serve(arguments) -> int:
+    from math_interpreter.cache import ExpressionCache
+    from math_interpreter.limits import EvaluationLimits
+    from math_interpreter.server import serve
+
+    cache = ExpressionCache(arguments.cache_dir) if arguments.cache_dir else None
+    limits = None
+    if any(limit is not None for limit in (arguments.max_nodes, arguments.max_depth,
+                                           arguments.max_steps)):
+        limits = EvaluationLimits(arguments.max_nodes, arguments.max_depth, arguments.max_steps)
+    print(f"Serving on http://{arguments.host}:{arguments.port}", file=sys.stderr)
+    serve(arguments.host, arguments.port, arguments.batch_window_ms / 1000.0,
+          arguments.max_batch, cache, limits)
+    return 0
+
+
+def _eval(arguments) -> int:
+    from math_interpreter.batch_eval import evaluate_files
+    from math_interpreter.exceptions import InterpreterError
+
+    output = None
+    if arguments.output is not None:
+        output = open(arguments.output, 'w', newline='', encoding='utf-8')
+    try:
+        summary = evaluate_files(arguments.formulas, csv_path=arguments.csv,
+                                 columns_dir=arguments.columns, output=output,
+                                 output_columns=arguments.output_columns,
+                                 workers=arguments.workers, chunk_size=arguments.chunk_size)
+    except (InterpreterError, OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    finally:
+        if output is not None:
+            output.close()
+    print(f"Evaluated {summary}", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command-line argument parser.
+
+    Returns:
+        argparse.ArgumentParser: The parser with one subcommand per mode.
+    """
+    parser = argparse.ArgumentParser(prog='python -m math_interpreter')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help='run a local JSON-over-HTTP evaluation server')
+    serve.add_argument('--host', default='127.0.0.1', help='interface to bind (default: 127.0.0.1)')
+    serve.add_argument('--port', type=int, default=8765, help='port to bind (default: 8765)')
+    serve.add_argument('--batch-window-ms', type=float, default=2.0,
+                       help='time to coalesce requests into a batch (default: 2)')
+    serve.add_argument('--max-batch', type=int, default=1024,
+                       help='maximum requests per batch (default: 1024)')
+    serve.add_argument('--cache-dir', help='directory of a persistent compiled-formula cache')
+    serve.add_argument('--max-nodes', type=int, help='reject formulas with more nodes')
+    serve.add_argument('--max-depth', type=int, help='reject formulas nested deeper')
+    serve.add_argument('--max-steps', type=int, help='reject formulas taking more evaluation steps per row')
+    serve.set_defaults(handler=_serve)
+
+    evaluate = commands.add_parser('eval', help='evaluate a formula file over a data file')
+    evaluate.add_argument('formulas', help='file with one formula per line, optionally "name = formula"')
+    source = evaluate.add_mutually_exclusive_group(required=True)
+    source.add_argument('--csv', help='CSV input with a header row of variable names')
+    source.add_argument('--columns', help='directory of binary float64 column files, or float32 columns '
+                                          'with typecode sidecar files')
+    evaluate.add_argument('--output', help='CSV output file (default: standard output)')
+    evaluate.add_argument('--output-columns', help='directory for one binary result column per formula')
+    evaluate.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                          help='number of worker processes (default: CPU count)')
+    evaluate.add_argument('--chunk-size', type=int, default=10000,
+                          help='rows evaluated per chunk (default: 10000)')
+    evaluate.set_defaults(handler=_eval)
+    return parser
+
+
+def main(argv=None) -> int:
+    """
+    Run the command line.
+
+    Args:
+        argv: The arguments, without the program name. Defaults to sys.argv[1:].
+
+    Returns:
+        int: The exit status.
+    """
+    arguments = build_parser().parse_args(argv)
+    return arguments.handler(arguments)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Batch evaluation of formula files over data files for the Math Interpreter.
+
+This is the engine behind "python -m math_interpreter eval". Formulas are
+read from a text file, input rows are streamed from a CSV file or a
+directory of binary column files in chunks, the chunks are evaluated
+column-wise by a pool of worker processes, and the results are written out
+one chunk at a time.
+"""
+
+import csv
+import math
+import os
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from math_interpreter.columnar import ColumnStore, store_typecode
+from math_interpreter.compiler import compile_expression
+from math_interpreter.context import Context
+from math_interpreter.exceptions import InterpreterError, InvalidExpressionError, VariableNotDefinedError
+from math_interpreter.parser import parse
+
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+class BatchSummary:
+    """
+    The outcome of a batch evaluation run.
+    """
+
+    def __init__(self, rows: int, seconds: float, errors: int):
+        """
+        Initialize a summary.
+
+        Args:
+            rows: The number of input rows evaluated.
+            seconds: The total wall time in seconds.
+            errors: The number of (row, formula) results that failed and were written as NaN.
+        """
+        self.rows = rows
+        self.seconds = seconds
+        self.errors = errors
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        The throughput of the run.
+        """
+        return self.rows / self.seconds if self.seconds > 0 else float('inf')
+
+    def __str__(self) -> str:
+        return (f"{self.rows} rows in {self.seconds:.3f} s "
+                f"({self.rows_per_second:,.0f} rows/s, {self.errors} errors)")
+
+
+def load_formulas(path: str) -> List[Tuple[str, str]]:
+    """
+    Read a formula file.
+
+    Each non-blank line holds one formula, optionally named as
+    "name = formula". Lines starting with '#' are comments. Unnamed formulas
+    are named f1, f2, ... by their position.
+
+    Args:
+        path: The path of the formula file.
+
+    Returns:
+        List[Tuple[str, str]]: (name, formula text) pairs in file order.
+
+    Raises:
+        InvalidExpressionError: If the file holds no formulas or a name repeats.
+    """
+    formulas = []
+    with open(path, 'r', encoding='utf-8') as handle:
+        for line in handle:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            name, separator, text = line.partition('=')
+            if not separator:
+                name, text = f"f{len(formulas) + 1}", line
+            formulas.append((name.strip(), text.strip()))
+    if not formulas:
+        raise InvalidExpressionError(f"No formulas in '{path}'")
+    names = [name for name, _ in formulas]
+    if len(set(names)) != len(names):
+        raise InvalidExpressionError(f"Formula names in '{path}' are not unique")
+    return formulas
+
+
+def _csv_chunks(path: str, names: Sequence[str], chunk_size: int) -> Iterator[Tuple[Dict, int]]:
+    """
+    Stream the referenced columns of a CSV file with a header row in chunks.
+    """
+    with open(path, 'r', newline='', encoding='utf-8') as handle:
+        reader = csv.reader(handle)
+        header = next(reader, [])
+        positions = {}
+        for name in names:
+            if name not in header:
+                raise VariableNotDefinedError(f"Variable '{name}' is not a column of '{path}'")
+            positions[name] = header.index(name)
+        while True:
+            columns = {name: [] for name in names}
+            rows = 0
+            for record in reader:
+                if not record:
+                    continue
+                if len(record) < len(header):
+                    raise ValueError(f"Line {reader.line_num} of '{path}' has fewer fields than the header")
+                for name, position in positions.items():
+                    columns[name].append(float(record[position]))
+                rows += 1
+                if rows == chunk_size:
+                    break
+            if not rows:
+                return
+            yield columns, rows
+
+
+def _column_chunks(directory: str, names: Sequence[str], chunk_size: int) -> Iterator[Tuple[Dict, int]]:
+    """
+    Stream the referenced columns of a column store in chunks.
+    """
+    store = ColumnStore(directory)
+    mapped = {}
+    try:
+        for name in names:
+            mapped[name] = store.open(name)
+        lengths = {len(column) for column in mapped.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns {list(names)} differ in length")
+        total = lengths.pop() if lengths else 0
+        for start in range(0, total, chunk_size):
+            stop = min(start + chunk_size, total)
+            yield {name: column.window(start, stop) for name, column in mapped.items()}, stop - start
+    finally:
+        for column in mapped.values():
+            column.close()
+
+
+_worker_programs: List = []
+
+
+def _initialize_worker(texts: Sequence[str]) -> None:
+    """
+    Compile the formulas once per worker process.
+    """
+    global _worker_programs
+    _worker_programs = [compile_expression(parse(text)) for text in texts]
+
+
+def _evaluate_chunk(chunk: Tuple[Dict, int]) -> Tuple[List[List[float]], int]:
+    """
+    Evaluate every formula over one chunk of rows.
+
+    Failing rows are evaluated one by one and written as NaN.
+    """
+    columns, rows = chunk
+    outputs = []
+    errors = 0
+    for program in _worker_programs:
+        try:
+            outputs.append(program.run_batch(columns, rows))
+            continue
+        except InterpreterError:
+            pass
+        values = []
+        for row in range(rows):
+            context = Context()
+            for name in program.variables:
+                context.set_variable(name, columns[name][row])
+            try:
+                values.append(program.run(context))
+            except InterpreterError:
+                values.append(math.nan)
+                errors += 1
+        outputs.append(values)
+    return outputs, errors
+
+
+def evaluate_files(formula_path: str, csv_path: Optional[str] = None,
+                   columns_dir: Optional[str] = None, output: Optional[TextIO] = None,
+                   output_columns: Optional[str] = None, workers: int = 1,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> BatchSummary:
+    """
+    Evaluate the formulas of a formula file over every row of a data source.
+
+    Args:
+        formula_path: The path of the formula file.
+        csv_path: A CSV input file with a header row of variable names.
+        columns_dir: A directory of binary column files, used instead of csv_path.
+        output: A text stream receiving CSV results, one column per formula.
+            Defaults to standard output unless output_columns is given.
+        output_columns: A directory receiving one binary result column per formula.
+        workers: The number of worker processes; 1 evaluates in-process.
+        chunk_size: The number of rows evaluated per chunk.
+
+    Returns:
+        BatchSummary: The number of rows, wall time and error count.
+
+    Raises:
+        InvalidExpressionError: If a formula cannot be parsed.
+        VariableNotDefinedError: If the input lacks a referenced variable.
+    """
+    if (csv_path is None) == (columns_dir is None):
+        raise ValueError("Exactly one of csv_path and columns_dir is required")
+    started = time.perf_counter()
+    formulas = load_formulas(formula_path)
+    texts = [text for _, text in formulas]
+    names = sorted(set().union(*(parse(text).free_variables() for text in texts)))
+    if csv_path is not None:
+        chunks = _csv_chunks(csv_path, names, chunk_size)
+    else:
+        chunks = _column_chunks(columns_dir, names, chunk_size)
+
+    writers = _open_outputs([name for name, _ in formulas], output, output_columns)
+    rows = 0
+    errors = 0
+    pool = None
+    try:
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker,
+                                       initargs=(texts,))
+            results = _bounded_map(pool, _evaluate_chunk, chunks, 2 * workers)
+        else:
+            _initialize_worker(texts)
+            results = map(_evaluate_chunk, chunks)
+        for outputs, chunk_errors in results:
+            writers.write(outputs)
+            rows += len(outputs[0])
+            errors += chunk_errors
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        writers.close()
+    return BatchSummary(rows, time.perf_counter() - started, errors)
+
+
+def _bounded_map(pool, function, items, limit):
+    """
+    Like pool.map, but keep at most limit items in flight so input is streamed.
+    """
+    in_flight = deque()
+    for item in items:
+        in_flight.append(pool.submit(function, item))
+        if len(in_flight) >= limit:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+class _CsvOutput:
+    """
+    Writes result chunks as CSV rows under a header of formula names.
+    """
+
+    def __init__(self, names: Sequence[str], stream: TextIO):
+        self._writer = csv.writer(stream)
+        self._writer.writerow(names)
+
+    def write(self, outputs: List[List[float]]) -> None:
+        self._writer.writerows(zip(*outputs))
+
+    def close(self) -> None:
+        pass
+
+
+class _ColumnOutput:
+    """
+    Appends result chunks to one binary column file per formula.
+    """
+
+    def __init__(self, names: Sequence[str], directory: str):
+        os.makedirs(directory, exist_ok=True)
+        store = ColumnStore(directory)
+        self._handles = []
+        for name in names:
+            self._handles.append(open(store.path_for(name), 'wb'))
+            store_typecode(store.path_for(name), 'd')
+
+    def write(self, outputs: List[List[float]]) -> None:
+        for handle, values in zip(self._handles, outputs):
+            array('d', values).tofile(handle)
+
+    def close(self) -> None:
+        for handle in self._handles:
+            handle.close()
+
+
+def _open_outputs(names, output, output_columns):
+    if output_columns is not None:
+        return _ColumnOutput(names, output_columns)
+    return _CsvOutput(names, output if output is not None else sys.stdout)
@@ -0,0 +1,180 @@
+"""
+Bulk expression builder for the Math Interpreter.
+
+Generated formulas built with nested constructor calls or with the
+arithmetic operators come out as deep chains with repeated subtrees. An
+ExpressionBuilder instead optimizes while it builds:
+
+- interning: equal constants, variables and operations are built once and
+  shared, so repeated subexpressions become one node;
+- constant folding: operations on constants are evaluated, constants in
+  sums and products are combined, and identity operands are dropped;
+- balanced association: sums and products of many operands are built as
+  balanced trees of logarithmic depth. Nested sums and products are
+  flattened into their operands, except that a nested operation used
+  more than once stays shared.
+
+Combining constants and regrouping operands reassociates floating-point
+operations, which can change results in the last bits.
+"""
+
+from typing import Dict, List, Tuple
+
+from math_interpreter.exceptions import InterpreterError
+from math_interpreter.expression import Expression
+from math_interpreter.non_terminal_expressions import operation_class
+from math_interpreter.operators import ADDITION, MULTIPLICATION, Operator, get_operator
+from math_interpreter.rebalance import combine_pairwise
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+class ExpressionBuilder:
+    """
+    Builds compact, shallow expression trees.
+
+    Nodes are interned per builder: building the same subexpression twice
+    with one builder returns the same node.
+    """
+
+    def __init__(self):
+        self._constants: Dict[str, Constant] = {}
+        self._variables: Dict[str, Variable] = {}
+        self._operations: Dict[Tuple, Expression] = {}
+
+    def constant(self, value: float) -> Constant:
+        """
+        Get the interned constant for a value.
+        """
+        value = float(value)
+        key = value.hex()
+        node = self._constants.get(key)
+        if node is None:
+            node = self._constants[key] = Constant(value)
+        return node
+
+    def variable(self, name: str) -> Variable:
+        """
+        Get the interned variable for a name.
+        """
+        node = self._variables.get(name)
+        if node is None:
+            node = self._variables[name] = Variable(name)
+        return node
+
+    def _operand(self, operand) -> Expression:
+        if isinstance(operand, Expression):
+            return operand
+        if isinstance(operand, str):
+            return self.variable(operand)
+        return self.constant(operand)
+
+    def apply(self, operator, left, right) -> Expression:
+        """
+        Build one operation, folding it if both operands are constants.
+
+        Args:
+            operator: The Operator, or the name of a registered operator.
+            left: The left operand: an expression, a number or a variable name.
+            right: The right operand: an expression, a number or a variable name.
+
+        Returns:
+            Expression: The interned operation, or a constant if it was folded.
+            Operations that raise on their constant operands are not folded,
+            so the error surfaces on evaluation.
+        """
+        if not isinstance(operator, Operator):
+            operator = get_operator(operator)
+        left = self._operand(left)
+        right = self._operand(right)
+        if isinstance(left, Constant) and isinstance(right, Constant):
+            try:
+                return self.constant(operator.scalar(left.value, right.value))
+            except (ArithmeticError, InterpreterError):
+                pass
+        key = (operator.name, id(left), id(right))
+        node = self._operations.get(key)
+        if node is None:
+            node = self._operations[key] = operation_class(operator)(left, right)
+        return node
+
+    def add(self, *operands) -> Expression:
+        """
+        Build the balanced sum of any number of operands.
+
+        Nested sums among the operands are flattened, constants are combined
+        into one trailing constant and zeros are dropped.
+        """
+        return self._associative(ADDITION, operands)
+
+    def multiply(self, *operands) -> Expression:
+        """
+        Build the balanced product of any number of operands.
+
+        Nested products among the operands are flattened, constants are
+        combined into one leading constant and ones are dropped.
+        """
+        return self._associative(MULTIPLICATION, operands)
+
+    def sum(self, operands) -> Expression:
+        """
+        Build the balanced sum of an iterable of operands; see add.
+        """
+        return self._associative(ADDITION, tuple(operands))
+
+    def product(self, operands) -> Expression:
+        """
+        Build the balanced product of an iterable of operands; see multiply.
+        """
+        return self._associative(MULTIPLICATION, tuple(operands))
+
+    def subtract(self, left, right) -> Expression:
+        """
+        Build left - right, folding constants.
+        """
+        return self.apply('sub', left, right)
+
+    def divide(self, left, right) -> Expression:
+        """
+        Build left / right, folding constants.
+        """
+        return self.apply('div', left, right)
+
+    def power(self, base, exponent) -> Expression:
+        """
+        Build base ^ exponent, folding constants.
+        """
+        return self.apply('pow', base, exponent)
+
+    def _associative(self, operator: Operator, operands) -> Expression:
+        terms: List[Expression] = []
+        folded = operator.identity
+        operands = [self._operand(operand) for operand in operands]
+        # Count the uses of every nested operation first. One used more than
+        # once, like s in s + s, stays one shared operand, so flattening a
+        # DAG does not expand it into an exponentially large tree.
+        uses: Dict[int, int] = {}
+        stack = list(operands)
+        while stack:
+            operand = stack.pop()
+            count = uses.get(id(operand), 0)
+            uses[id(operand)] = count + 1
+            if not count and getattr(operand, 'operator', None) is operator:
+                stack.append(operand.right)
+                stack.append(operand.left)
+        stack = operands[::-1]
+        while stack:
+            operand = stack.pop()
+            if getattr(operand, 'operator', None) is operator and uses[id(operand)] == 1:
+                stack.append(operand.right)
+                stack.append(operand.left)
+            elif isinstance(operand, Constant):
+                folded = operator.scalar(folded, operand.value)
+            else:
+                terms.append(operand)
+        if folded != operator.identity or not terms:
+            # Products lead with their coefficient, sums trail with their offset.
+            if operator is MULTIPLICATION:
+                terms.insert(0, self.constant(folded))
+            else:
+                terms.append(self.constant(folded))
+        return combine_pairwise(terms, lambda left, right: self.apply(operator, left, right))
@@ -0,0 +1,180 @@
+"""
+Persistent on-disk cache of compiled expressions for the Math Interpreter.
+
+Compiled programs are stored one file per expression, keyed by the
+structural hash of the tree, much like Python's .pyc files. Writes are
+atomic so the cache can be shared between processes, entries are evicted
+least-recently-used first when the cache grows beyond its size budget, and
+entries written by a different library version are ignored.
+"""
+
+import os
+import pickle
+import tempfile
+from typing import Optional
+
+from math_interpreter import __version__
+from math_interpreter import metrics
+from math_interpreter.compiler import PROGRAM_FORMAT, Program, compile_expression, structural_key
+
+
+CACHE_SUFFIX = ".mipc"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ExpressionCache:
+    """
+    A disk-backed cache mapping expression trees to their compiled programs.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 version: str = __version__):
+        """
+        Initialize a cache rooted at a directory, creating it if needed.
+
+        Args:
+            directory: The directory holding the cache entries.
+            max_bytes: The size budget of the cache in bytes.
+            version: The library version entries must have been written by.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key_for(self, expression) -> str:
+        """
+        Get the cache key of an expression.
+
+        Args:
+            expression: The expression to key.
+
+        Returns:
+            str: The structural hash of the expression.
+        """
+        return structural_key(expression)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def load(self, key: str) -> Optional[Program]:
+        """
+        Load a cached program by key.
+
+        Args:
+            key: The cache key, as returned by key_for.
+
+        Returns:
+            Optional[Program]: The cached program, or None if there is no
+            usable entry for the key.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as handle:
+                version, program_format, program = pickle.load(handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+            return None
+        if version != self.version or program_format != PROGRAM_FORMAT or not isinstance(program, Program):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return program
+
+    def store(self, key: str, program: Program) -> None:
+        """
+        Atomically write a program to the cache and enforce the size budget.
+
+        Args:
+            key: The cache key, as returned by key_for.
+            program: The compiled program.
+        """
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                pickle.dump((self.version, PROGRAM_FORMAT, program), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+            raise
+        self.evict()
+
+    def get_or_compile(self, expression) -> Program:
+        """
+        Get the compiled program for an expression, compiling it on a miss.
+
+        Args:
+            expression: The expression to compile.
+
+        Returns:
+            Program: The optimized, lowered program.
+        """
+        key = self.key_for(expression)
+        program = self.load(key)
+        registry = metrics.active()
+        if registry is not None:
+            metrics.record_cache(registry, 'expression', program is not None)
+        if program is not None:
+            self.hits += 1
+            return program
+        self.misses += 1
+        program = compile_expression(expression)
+        self.store(key, program)
+        return program
+
+    def size(self) -> int:
+        """
+        Get the total size of the cache entries in bytes.
+
+        Returns:
+            int: The size of all entries.
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(CACHE_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    def evict(self) -> None:
+        """
+        Remove least-recently-used entries until the cache fits its size budget.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Remove every entry from the cache.
+        """
+        for _, _, path in self._entries():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
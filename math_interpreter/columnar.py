@@ -0,0 +1,431 @@
+"""
+Memory-mapped columnar data source for batch evaluation in the Math Interpreter.
+
+Each variable is stored as its own binary column file containing native
+float64 values, or float32 values where the value ranges allow it. The
+typecode of a column is stored next to it in a small sidecar file; columns
+without one hold float64 values. Expressions are evaluated over the columns in fixed-size windows, so only
+one window of every referenced column is held in memory at a time and the
+results are written into an output memory-mapped column.
+"""
+
+import mmap
+import os
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from math_interpreter.context import Context
+from math_interpreter.exceptions import VariableNotDefinedError
+from math_interpreter.fusion import unfuse
+from math_interpreter.intervals import column_ranges, select_typecode
+from math_interpreter.metrics import instrumented
+from math_interpreter.operators import operator_for
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+COLUMN_SUFFIX = ".col"
+TYPECODE_SUFFIX = ".typecode"
+DEFAULT_WINDOW_SIZE = 65536
+TYPECODES = ('d', 'f')
+
+
+def _check_typecode(typecode: str) -> None:
+    if typecode not in TYPECODES:
+        raise ValueError(f"Unsupported column typecode '{typecode}', expected one of {TYPECODES}")
+
+
+def column_typecode(path: str) -> str:
+    """
+    Get the typecode stored with a column file.
+
+    Args:
+        path: The file path of the column.
+
+    Returns:
+        str: 'd' for float64 or 'f' for float32. Columns written without a
+        typecode hold float64 values.
+    """
+    try:
+        with open(path + TYPECODE_SUFFIX, encoding='ascii') as handle:
+            typecode = handle.read().strip()
+    except FileNotFoundError:
+        return 'd'
+    _check_typecode(typecode)
+    return typecode
+
+
+def store_typecode(path: str, typecode: str) -> None:
+    """
+    Store the typecode of a column file next to it.
+
+    Args:
+        path: The file path of the column.
+        typecode: 'd' for float64 or 'f' for float32.
+    """
+    _check_typecode(typecode)
+    with open(path + TYPECODE_SUFFIX, 'w', encoding='ascii') as handle:
+        handle.write(typecode)
+
+
+def write_column(path: str, values: Iterable[float], typecode: str = 'd') -> int:
+    """
+    Write a sequence of values as a binary column file, with its typecode.
+
+    Args:
+        path: The file path of the column.
+        values: The values to write.
+        typecode: The array typecode of the file, 'd' for float64 or 'f' for float32.
+
+    Returns:
+        int: The number of values written.
+    """
+    _check_typecode(typecode)
+    data = array(typecode, values)
+    with open(path, 'wb') as handle:
+        data.tofile(handle)
+    store_typecode(path, typecode)
+    return len(data)
+
+
+def read_column(path: str, typecode: Optional[str] = None) -> array:
+    """
+    Read a whole binary column file into memory.
+
+    Args:
+        path: The file path of the column.
+        typecode: The array typecode of the file, 'd' for float64 or 'f' for
+            float32. Defaults to the typecode stored with the column.
+
+    Returns:
+        array: The column values.
+    """
+    if typecode is None:
+        typecode = column_typecode(path)
+    _check_typecode(typecode)
+    data = array(typecode)
+    with open(path, 'rb') as handle:
+        data.frombytes(handle.read())
+    return data
+
+
+class MappedColumn:
+    """
+    A read-only column backed by a memory-mapped file.
+    """
+
+    def __init__(self, path: str, typecode: Optional[str] = None):
+        """
+        Map a column file into memory.
+
+        Args:
+            path: The file path of the column.
+            typecode: The array typecode of the file, 'd' for float64 or 'f' for
+                float32. Defaults to the typecode stored with the column.
+        """
+        if typecode is None:
+            typecode = column_typecode(path)
+        _check_typecode(typecode)
+        self.path = path
+        self.typecode = typecode
+        size = os.path.getsize(path)
+        if size % array(typecode).itemsize:
+            raise ValueError(f"Column file '{path}' is not a whole number of '{typecode}' values")
+        self._handle = open(path, 'rb')
+        self._mmap = None
+        self._view = memoryview(b'').cast(typecode)
+        if size:
+            self._mmap = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap).cast(typecode)
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self._view)
+
+    def window(self, start: int, stop: int) -> List[float]:
+        """
+        Copy one window of the column out of the mapping.
+
+        Args:
+            start: The first row of the window.
+            stop: The row after the last row of the window.
+
+        Returns:
+            List[float]: The values in the window.
+        """
+        return self._view[start:stop].tolist()
+
+    def close(self) -> None:
+        """
+        Release the mapping and the underlying file handle.
+        """
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._handle.close()
+
+
+class ColumnStore:
+    """
+    A directory of binary column files, one file per variable name.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize a column store rooted at a directory.
+
+        Args:
+            directory: The directory holding the column files.
+        """
+        self.directory = directory
+
+    def path_for(self, name: str) -> str:
+        """
+        Get the file path used for a variable's column.
+
+        Args:
+            name: The variable name.
+
+        Returns:
+            str: The column file path.
+        """
+        return os.path.join(self.directory, name + COLUMN_SUFFIX)
+
+    def names(self) -> List[str]:
+        """
+        List the variables that have a column.
+
+        Returns:
+            List[str]: The variable names, sorted.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(entry[:-len(COLUMN_SUFFIX)] for entry in os.listdir(self.directory)
+                      if entry.endswith(COLUMN_SUFFIX))
+
+    def has_column(self, name: str) -> bool:
+        """
+        Check if a column exists for a variable.
+
+        Args:
+            name: The variable name.
+
+        Returns:
+            bool: True if the column file exists, False otherwise.
+        """
+        return os.path.isfile(self.path_for(name))
+
+    def write(self, name: str, values: Iterable[float], typecode: str = 'd') -> int:
+        """
+        Write the column for a variable.
+
+        Args:
+            name: The variable name.
+            values: The column values.
+            typecode: The array typecode of the file, 'd' for float64 or 'f' for float32.
+
+        Returns:
+            int: The number of values written.
+        """
+        return write_column(self.path_for(name), values, typecode)
+
+    def open(self, name: str, typecode: Optional[str] = None) -> MappedColumn:
+        """
+        Memory-map the column for a variable.
+
+        Args:
+            name: The variable name.
+            typecode: The array typecode of the file, 'd' for float64 or 'f' for
+                float32. Defaults to the typecode stored with the column.
+
+        Returns:
+            MappedColumn: The mapped column.
+
+        Raises:
+            VariableNotDefinedError: If there is no column for the variable.
+        """
+        if not self.has_column(name):
+            raise VariableNotDefinedError(f"Variable '{name}' has no column in '{self.directory}'")
+        return MappedColumn(self.path_for(name), typecode)
+
+
+class _WindowPlan:
+    """
+    A flattened evaluation order for an expression over column windows.
+
+    Every distinct node becomes one slot. Slots are released as soon as their
+    last consumer has run, so the number of live windows stays bounded by the
+    width of the tree instead of its size.
+    """
+
+    def __init__(self, expression):
+        # Fused nodes are evaluated through the operations they replace.
+        expression = unfuse(expression)
+        order = []
+        index_of: Dict[int, int] = {}
+        stack = [(expression, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in index_of:
+                continue
+            if expanded or operator_for(node) is None:
+                index_of[id(node)] = len(order)
+                order.append(node)
+                continue
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+
+        uses = [0] * len(order)
+        steps = []
+        for node in order:
+            operator = operator_for(node)
+            if operator is not None:
+                left = index_of[id(node.left)]
+                right = index_of[id(node.right)]
+                uses[left] += 1
+                uses[right] += 1
+                steps.append((node, operator, left, right))
+            else:
+                steps.append((node, None, -1, -1))
+
+        self.steps = steps
+        self.uses = uses
+        self.variables = sorted(expression.free_variables())
+
+    def run(self, columns: Dict[str, MappedColumn], start: int, stop: int) -> List[float]:
+        """
+        Evaluate the plan over one window of rows.
+
+        Args:
+            columns: The mapped columns of the referenced variables.
+            start: The first row of the window.
+            stop: The row after the last row of the window.
+
+        Returns:
+            List[float]: The result for every row of the window.
+        """
+        width = stop - start
+        slots = [None] * len(self.steps)
+        remaining = list(self.uses)
+        for index, (node, operator, left, right) in enumerate(self.steps):
+            if isinstance(node, Constant):
+                slots[index] = node.value
+                continue
+            if isinstance(node, Variable):
+                slots[index] = columns[node.name].window(start, stop)
+                continue
+            if operator is None:
+                slots[index] = _interpret_rows(node, columns, start, stop)
+                continue
+            slots[index] = operator.apply(slots[left], slots[right])
+            for child in (left, right):
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    slots[child] = None
+
+        result = slots[-1]
+        if isinstance(result, float):
+            return [result] * width
+        return result
+
+
+def _interpret_rows(node, columns: Dict[str, MappedColumn], start: int, stop: int) -> List[float]:
+    """
+    Interpret an opaque node row by row, with every mapped column as a variable.
+    """
+    windows = [(name, column.window(start, stop)) for name, column in columns.items()]
+    results = []
+    for row in range(stop - start):
+        context = Context()
+        for name, window in windows:
+            context.set_variable(name, window[row])
+        results.append(node.interpret(context))
+    return results
+
+
+@instrumented
+def evaluate_columns(expression, store, output_path: str,
+                     window_size: int = DEFAULT_WINDOW_SIZE, output_typecode: str = 'd',
+                     limits=None) -> int:
+    """
+    Evaluate an expression over memory-mapped columns, one window at a time.
+
+    Only the columns of variables referenced by the expression are mapped.
+    The results are written to a new column file at output_path. An
+    expression with opaque nodes, see Expression.is_opaque, may read any
+    variable: every column of the store is mapped and the opaque nodes are
+    interpreted row by row.
+
+    Args:
+        expression: The expression to evaluate.
+        store: A ColumnStore, or a directory path holding the column files.
+        output_path: The file path of the output column.
+        window_size: The number of rows evaluated per window.
+        output_typecode: 'd' to write float64 results, 'f' to write float32
+            results with half the size, or 'auto' to write float32 results
+            when intervals.select_typecode proves the ranges of the input
+            columns can neither overflow nor underflow them. The typecode is stored with the
+            output column.
+        limits: Optional EvaluationLimits the expression must meet.
+
+    Returns:
+        int: The number of rows evaluated.
+
+    Raises:
+        VariableNotDefinedError: If a referenced variable has no column.
+        ValueError: If the referenced columns differ in length.
+        EvaluationLimitError: If the expression exceeds the limits.
+    """
+    if window_size <= 0:
+        raise ValueError("window_size must be positive")
+    if output_typecode != 'auto':
+        _check_typecode(output_typecode)
+    if limits is not None:
+        limits.check(expression)
+    if not isinstance(store, ColumnStore):
+        store = ColumnStore(store)
+
+    plan = _WindowPlan(expression)
+    names = plan.variables
+    if expression.is_opaque():
+        output = os.path.abspath(output_path)
+        names = [name for name in store.names() if os.path.abspath(store.path_for(name)) != output]
+    columns: Dict[str, MappedColumn] = {}
+    try:
+        for name in names:
+            columns[name] = store.open(name)
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns {names} differ in length")
+        rows = lengths.pop() if lengths else 0
+        if output_typecode == 'auto':
+            output_typecode = select_typecode(expression, column_ranges(columns))
+        _write_windows(plan, columns, rows, output_path, window_size, output_typecode)
+    finally:
+        for column in columns.values():
+            column.close()
+    return rows
+
+
+def _write_windows(plan, columns, rows, output_path, window_size, typecode):
+    """
+    Run the plan over every window and stream the results into the output column.
+    """
+    size = rows * array(typecode).itemsize
+    store_typecode(output_path, typecode)
+    with open(output_path, 'w+b') as handle:
+        handle.truncate(size)
+        if not rows:
+            return
+        mapping = mmap.mmap(handle.fileno(), size, access=mmap.ACCESS_WRITE)
+        output = memoryview(mapping).cast(typecode)
+        try:
+            for start in range(0, rows, window_size):
+                stop = min(start + window_size, rows)
+                output[start:stop] = array(typecode, plan.run(columns, start, stop))
+            mapping.flush()
+        finally:
+            output.release()
+            mapping.close()
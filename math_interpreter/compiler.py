@@ -0,0 +1,383 @@
+"""
+Lowering of expression trees into flat programs for the Math Interpreter.
+
+A Program is a list of instructions in evaluation order. Each instruction
+stores its result in the slot with the same index, so shared subtrees are
+evaluated once and no recursion is needed at run time. Lowering optionally
+folds constant subtrees, merges structurally identical subtrees and
+combines common instruction sequences into superinstructions.
+
+Binary instructions refer to operators through the program's operator
+table, so any operator in the registry can be compiled and run.
+"""
+
+import hashlib
+import struct
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from math_interpreter.exceptions import InterpreterError, InvalidExpressionError, VariableNotDefinedError
+from math_interpreter.fusion import AddMultiply, MultiplyAdd, ScaledVariable
+from math_interpreter.metrics import instrumented
+from math_interpreter.operators import ADDITION, MULTIPLICATION, Operator, operator_for
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+OP_CONST = 0
+OP_VAR = 1
+# Superinstructions: a variable times a constant, and a product plus a value.
+OP_SCALE = 2
+OP_MULADD = 3
+# Opcodes from OP_APPLY upwards index the program's operator table.
+OP_APPLY = 4
+# Incremented whenever the instruction encoding changes, so programs stored
+# by an older encoding are not run.
+PROGRAM_FORMAT = 2
+# The tag of operations in structural digests. It is the former OP_APPLY and
+# is kept so structural keys do not change with the opcode numbering.
+_DIGEST_APPLY = 2
+
+
+class Program:
+    """
+    A lowered expression: a flat list of slot-addressed instructions.
+    """
+
+    def __init__(self, instructions: List[Tuple], variables: Tuple[str, ...],
+                 operators: Tuple[Operator, ...] = ()):
+        """
+        Initialize a program.
+
+        Args:
+            instructions: Tuples of (opcode, a, b). For OP_CONST, a is the value;
+                for OP_VAR, a is the variable name; for OP_APPLY + i, a and b
+                are the slots of the operands of operators[i]. For OP_SCALE,
+                a is a variable name and b the constant it is multiplied
+                by; for OP_MULADD, a is the pair of slots of the factors
+                and b the slot of the value added to their product.
+            variables: The names of the variables the program reads.
+            operators: The operator table of the program.
+        """
+        self.instructions = instructions
+        self.variables = variables
+        self.operators = operators
+
+    def __len__(self) -> int:
+        return len(self.instructions)
+
+    def run(self, context) -> float:
+        """
+        Evaluate the program against a context.
+
+        Args:
+            context: The context containing variable definitions.
+
+        Returns:
+            float: The result of the program.
+
+        Raises:
+            VariableNotDefinedError: If a variable is not defined in the context.
+        """
+        functions = (None,) * OP_APPLY + tuple(operator.scalar for operator in self.operators)
+        slots = []
+        append = slots.append
+        get_variable = context.get_variable
+        for op, a, b in self.instructions:
+            if op >= OP_APPLY:
+                append(functions[op](slots[a], slots[b]))
+            elif op == OP_MULADD:
+                append(slots[a[0]] * slots[a[1]] + slots[b])
+            elif op == OP_SCALE:
+                append(get_variable(a) * b)
+            elif op == OP_VAR:
+                append(get_variable(a))
+            else:
+                append(a)
+        return slots[-1]
+
+    def run_batch(self, columns: Mapping[str, Sequence[float]], rows: int) -> List[float]:
+        """
+        Evaluate the program over many rows at once, one instruction at a time.
+
+        Args:
+            columns: One sequence of row values per variable name.
+            rows: The number of rows.
+
+        Returns:
+            List[float]: The result for every row.
+
+        Raises:
+            VariableNotDefinedError: If a variable has no column.
+        """
+        slots = []
+        append = slots.append
+        for op, a, b in self.instructions:
+            if op >= OP_APPLY:
+                append(self.operators[op - OP_APPLY].apply(slots[a], slots[b]))
+            elif op == OP_MULADD:
+                append(ADDITION.apply(MULTIPLICATION.apply(slots[a[0]], slots[a[1]]), slots[b]))
+            elif op == OP_VAR or op == OP_SCALE:
+                if a not in columns:
+                    raise VariableNotDefinedError(f"Variable '{a}' is not defined")
+                append(list(columns[a]) if op == OP_VAR else MULTIPLICATION.apply(list(columns[a]), b))
+            else:
+                append(a)
+        result = slots[-1]
+        if isinstance(result, list):
+            return result
+        return [result] * rows
+
+
+def _postorder(expression):
+    """
+    Yield the distinct nodes of an expression in post-order, without recursion.
+    """
+    seen = set()
+    stack = [(expression, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in seen:
+            continue
+        children = node.children()
+        if expanded or not children:
+            seen.add(id(node))
+            yield node
+            continue
+        stack.append((node, True))
+        stack.extend((child, False) for child in reversed(children))
+
+
+def _constant_key(value: float):
+    # float.hex keeps 0.0 and -0.0 apart; NaN never compares equal and is
+    # therefore never merged.
+    return (OP_CONST, value.hex())
+
+
+@instrumented
+def compile_expression(expression, optimize: bool = True, limits=None) -> Program:
+    """
+    Lower an expression tree into a Program.
+
+    Fused nodes are lowered like the operations they replace.
+
+    Args:
+        expression: The expression to lower.
+        optimize: Whether to fold constant subtrees, merge identical subtrees
+            and emit superinstructions.
+        limits: Optional EvaluationLimits. The node and depth limits are
+            checked before lowering and the step limit against the program.
+
+    Returns:
+        Program: The lowered program.
+
+    Raises:
+        InvalidExpressionError: If the tree contains an unsupported node.
+        EvaluationLimitError: If the expression or program exceeds a limit.
+    """
+    if limits is not None:
+        limits.check_structure(expression)
+    instructions: List[Tuple] = []
+    slot_of: Dict[int, int] = {}
+    numbering: Dict[Tuple, int] = {}
+    opcodes: Dict[str, int] = {}
+    table: List[Operator] = []
+
+    def emit(key, instruction):
+        if optimize and key in numbering:
+            return numbering[key]
+        instructions.append(instruction)
+        slot = len(instructions) - 1
+        numbering[key] = slot
+        return slot
+
+    def apply(operator, a, b):
+        if operator.name not in opcodes:
+            opcodes[operator.name] = OP_APPLY + len(table)
+            table.append(operator)
+        op = opcodes[operator.name]
+        value = _fold(operator, instructions[a], instructions[b]) if optimize else None
+        if value is not None:
+            return emit(_constant_key(value), (OP_CONST, value, 0))
+        return emit((op, a, b), (op, a, b))
+
+    for node in _postorder(expression):
+        operator = operator_for(node)
+        if operator is not None:
+            slot = apply(operator, slot_of[id(node.left)], slot_of[id(node.right)])
+        elif isinstance(node, Constant):
+            slot = emit(_constant_key(node.value), (OP_CONST, node.value, 0))
+        elif isinstance(node, Variable):
+            slot = emit((OP_VAR, node.name), (OP_VAR, node.name, 0))
+        elif isinstance(node, MultiplyAdd):
+            product = apply(MULTIPLICATION, slot_of[id(node.multiplicand)], slot_of[id(node.multiplier)])
+            slot = apply(ADDITION, product, slot_of[id(node.addend)])
+        elif isinstance(node, AddMultiply):
+            addend = slot_of[id(node.addend)]
+            product = apply(MULTIPLICATION, slot_of[id(node.multiplicand)], slot_of[id(node.multiplier)])
+            slot = apply(ADDITION, addend, product)
+        elif isinstance(node, ScaledVariable):
+            operands = [emit((OP_VAR, node.name), (OP_VAR, node.name, 0)),
+                        emit(_constant_key(node.coefficient), (OP_CONST, node.coefficient, 0))]
+            if node.coefficient_first:
+                operands.reverse()
+            slot = apply(MULTIPLICATION, *operands)
+        else:
+            raise InvalidExpressionError(f"Cannot compile node of type {type(node).__name__}")
+        slot_of[id(node)] = slot
+
+    root = slot_of[id(expression)]
+    if optimize:
+        instructions, root = _superinstructions(instructions, root, table)
+    program = _prune(instructions, root, table)
+    if limits is not None:
+        limits.check_program(program)
+    return program
+
+
+def _fold(operator: Operator, left: Tuple, right: Tuple):
+    """
+    Evaluate an operator on two constant instructions at compile time.
+
+    Returns None if an operand is not constant or the operation raises, in
+    which case the error is left to surface at run time.
+    """
+    if left[0] != OP_CONST or right[0] != OP_CONST:
+        return None
+    try:
+        return float(operator.scalar(left[1], right[1]))
+    except (ArithmeticError, InterpreterError):
+        return None
+
+
+def _operand_slots(instruction: Tuple) -> Tuple[int, ...]:
+    op, a, b = instruction
+    if op >= OP_APPLY:
+        return (a, b)
+    if op == OP_MULADD:
+        return (a[0], a[1], b)
+    return ()
+
+
+def _superinstructions(instructions: List[Tuple], root: int, table: List[Operator]):
+    """
+    Combine instruction sequences into superinstructions.
+
+    A multiplication of a variable and a constant becomes OP_SCALE if the
+    variable slot has no other use, and an addition of a product becomes
+    OP_MULADD if the product has no other use. Operand order is kept, so
+    results are unchanged. Replaced instructions are left for _prune.
+
+    Returns:
+        Tuple[List[Tuple], int]: The new instructions and the root slot.
+    """
+    uses = [0] * len(instructions)
+    for index in range(root + 1):
+        for slot in _operand_slots(instructions[index]):
+            uses[slot] += 1
+    uses[root] += 1
+
+    def operator_of(instruction):
+        return table[instruction[0] - OP_APPLY] if instruction[0] >= OP_APPLY else None
+
+    fused = list(instructions)
+    for index in range(root + 1):
+        instruction = fused[index]
+        operator = operator_of(instruction)
+        if operator is MULTIPLICATION:
+            _, a, b = instruction
+            first, second = fused[a], fused[b]
+            if first[0] == OP_VAR and second[0] == OP_CONST and uses[a] == 1:
+                fused[index] = (OP_SCALE, first[1], second[1])
+            elif first[0] == OP_CONST and second[0] == OP_VAR and uses[b] == 1:
+                fused[index] = (OP_SCALE, second[1], first[1])
+        elif operator is ADDITION:
+            _, a, b = instruction
+            if operator_of(fused[a]) is MULTIPLICATION and uses[a] == 1:
+                fused[index] = (OP_MULADD, fused[a][1:], b)
+            elif operator_of(fused[b]) is MULTIPLICATION and uses[b] == 1:
+                # Addition is commutative, so c + a * b equals a * b + c exactly.
+                fused[index] = (OP_MULADD, fused[b][1:], a)
+    return fused, root
+
+
+def _prune(instructions: List[Tuple], root: int, table: List[Operator]) -> Program:
+    """
+    Drop instructions the root does not depend on and renumber the slots.
+    """
+    live = [False] * len(instructions)
+    live[root] = True
+    for index in range(root, -1, -1):
+        if live[index]:
+            for slot in _operand_slots(instructions[index]):
+                live[slot] = True
+
+    renumbered: Dict[int, int] = {}
+    kept: List[Tuple] = []
+    variables: List[str] = []
+    for index in range(root + 1):
+        if not live[index]:
+            continue
+        op, a, b = instructions[index]
+        if op >= OP_APPLY:
+            a, b = renumbered[a], renumbered[b]
+        elif op == OP_MULADD:
+            a, b = (renumbered[a[0]], renumbered[a[1]]), renumbered[b]
+        elif op == OP_VAR or op == OP_SCALE:
+            variables.append(a)
+        renumbered[index] = len(kept)
+        kept.append((op, a, b))
+    return Program(kept, tuple(variables), tuple(table))
+
+
+def structural_key(expression) -> str:
+    """
+    Compute a structural hash of an expression tree.
+
+    Two trees with the same shape, operators, constants and variable names get
+    the same key, regardless of node identity or sharing. The digest of every
+    node is cached on the node, so rehashing a tree that shares most nodes
+    with an already hashed tree only hashes the new nodes.
+
+    Args:
+        expression: The expression to hash.
+
+    Returns:
+        str: A hexadecimal SHA-256 digest.
+
+    Raises:
+        InvalidExpressionError: If the tree contains an unsupported node.
+    """
+    return expression._cached('_structural_digest', _digest).hex()
+
+
+def _digest(node, operands) -> bytes:
+    # Fused nodes hash like the operations they replace.
+    operator = operator_for(node)
+    if operator is not None:
+        return _operation_digest(operator, *operands)
+    if isinstance(node, Constant):
+        return _constant_digest(node.value)
+    if isinstance(node, Variable):
+        return _variable_digest(node.name)
+    if isinstance(node, MultiplyAdd):
+        return _operation_digest(ADDITION, _operation_digest(MULTIPLICATION, *operands[:2]), operands[2])
+    if isinstance(node, AddMultiply):
+        return _operation_digest(ADDITION, operands[0], _operation_digest(MULTIPLICATION, *operands[1:]))
+    if isinstance(node, ScaledVariable):
+        factors = [_variable_digest(node.name), _constant_digest(node.coefficient)]
+        if node.coefficient_first:
+            factors.reverse()
+        return _operation_digest(MULTIPLICATION, *factors)
+    raise InvalidExpressionError(f"Cannot hash node of type {type(node).__name__}")
+
+
+def _operation_digest(operator: Operator, left: bytes, right: bytes) -> bytes:
+    payload = bytes((_DIGEST_APPLY,)) + operator.name.encode('utf-8') + b'\0' + left + right
+    return hashlib.sha256(payload).digest()
+
+
+def _constant_digest(value: float) -> bytes:
+    return hashlib.sha256(bytes((OP_CONST,)) + struct.pack('<d', value)).digest()
+
+
+def _variable_digest(name: str) -> bytes:
+    return hashlib.sha256(bytes((OP_VAR,)) + name.encode('utf-8')).digest()
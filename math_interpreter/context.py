@@ -2,12 +2,35 @@
 Context class for managing variables in the Math Interpreter.
 """
 
-from typing import Dict
+import sys
+from typing import Dict, Mapping
+
+from math_interpreter.exceptions import VariableNotDefinedError
+
+
+_EMPTY: Mapping[str, float] = {}
+
+
+def _undefined(message: str) -> VariableNotDefinedError:
+    # Count the error while metrics are enabled; they can only be enabled
+    # once their module is loaded, so it is never imported here.
+    error = VariableNotDefinedError(message)
+    metrics = sys.modules.get('math_interpreter.metrics')
+    registry = metrics.active() if metrics is not None else None
+    if registry is not None:
+        metrics.record_error(registry, error)
+    return error
 
 
 class Context:
     """
     Context class for storing and retrieving variables during expression interpretation.
+
+    Contexts can be layered: with_variable returns a new snapshot that shares
+    the variables of its parent instead of copying them. A dictionary that has
+    been shared with a snapshot is never mutated again; the owner copies it on
+    its next write, so snapshots stay consistent and can be read from any
+    thread without locking.
     """
     
     def __init__(self):
@@ -15,6 +38,8 @@ class Context:
         Initialize an empty context with no variables.
         """
         self._variables: Dict[str, float] = {}
+        self._base: Mapping[str, float] = _EMPTY
+        self._shared = False
     
     def set_variable(self, name: str, value: float) -> None:
         """
@@ -24,6 +49,9 @@ class Context:
             name: The variable name.
             value: The variable value.
         """
+        if self._shared:
+            self._variables = dict(self._variables)
+            self._shared = False
         self._variables[name] = value
     
     def get_variable(self, name: str) -> float:
@@ -39,12 +67,12 @@ class Context:
         Raises:
             VariableNotDefinedError: If the variable is not defined.
         """
-        from math_interpreter.exceptions import VariableNotDefinedError
-        
-        if name not in self._variables:
-            raise VariableNotDefinedError(f"Variable '{name}' is not defined")
+        if name in self._variables:
+            return self._variables[name]
+        if name not in self._base:
+            raise _undefined(f"Variable '{name}' is not defined")
         
-        return self._variables[name]
+        return self._base[name]
     
     def has_variable(self, name: str) -> bool:
         """
@@ -56,4 +84,74 @@ class Context:
         Returns:
             bool: True if the variable exists, False otherwise.
         """
-        return name in self._variables
\ No newline at end of file
+        return name in self._variables or name in self._base
+
+    def validate(self, expression) -> None:
+        """
+        Check that every variable an expression reads is defined, in one pass.
+
+        Variables read inside opaque nodes, see Expression.is_opaque, cannot
+        be listed; they are checked when the expression is evaluated.
+
+        Args:
+            expression: The expression about to be evaluated.
+
+        Raises:
+            VariableNotDefinedError: Naming every undefined variable, if any.
+        """
+        missing = sorted(name for name in expression.free_variables()
+                         if name not in self._variables and name not in self._base)
+        if missing:
+            names = ", ".join(f"'{name}'" for name in missing)
+            raise _undefined(f"Variables {names} are not defined")
+
+    def with_variable(self, name: str, value: float) -> 'Context':
+        """
+        Create a snapshot of this context with one variable set.
+
+        The snapshot shares this context's variables and stores only the
+        variables changed on top of its root, so creating it costs memory
+        proportional to the changes rather than to the whole context.
+
+        Args:
+            name: The variable name.
+            value: The variable value.
+
+        Returns:
+            Context: A new context; this context is left unchanged.
+        """
+        child = self.snapshot()
+        child._variables[name] = value
+        return child
+
+    def snapshot(self) -> 'Context':
+        """
+        Create a snapshot of this context.
+
+        Later changes to this context are not visible in the snapshot, and
+        changes to the snapshot are not visible in this context.
+
+        Returns:
+            Context: A new context with the same variables.
+        """
+        child = Context()
+        if self._base is _EMPTY:
+            # A root context: share its whole dictionary as the child's base.
+            self._shared = True
+            child._base = self._variables
+        else:
+            # An overlay: share the same base and copy only the changes.
+            child._base = self._base
+            child._variables = dict(self._variables)
+        return child
+
+    def variables(self) -> Dict[str, float]:
+        """
+        Get all variables visible in the context.
+
+        Returns:
+            Dict[str, float]: A new dictionary mapping names to values.
+        """
+        merged = dict(self._base)
+        merged.update(self._variables)
+        return merged
\ No newline at end of file
@@ -15,4 +15,19 @@ class VariableNotDefinedError(InterpreterError):
 
 class InvalidExpressionError(InterpreterError):
     """Raised for malformed expressions."""
+    pass
+
+
+class DivisionByZeroError(InterpreterError):
+    """Raised when dividing by zero."""
+    pass
+
+
+class CircularDependencyError(InterpreterError):
+    """Raised when formulas depend on each other in a cycle."""
+    pass
+
+
+class EvaluationLimitError(InterpreterError):
+    """Raised when an expression exceeds the configured evaluation limits."""
     pass
\ No newline at end of file
@@ -6,12 +6,18 @@ Following the Interpreter Pattern design, all concrete expressions will inherit
 """
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Dict, FrozenSet, Tuple
+
+from math_interpreter.exceptions import InvalidExpressionError
+from math_interpreter.serialization import decode_tree, encode_tree
 
 if TYPE_CHECKING:
     from .context import Context
 
 
+_NO_VARIABLES: FrozenSet[str] = frozenset()
+
+
 class Expression(ABC):
     """
     Abstract base class for all expressions in the interpreter pattern.
@@ -19,7 +25,18 @@ class Expression(ABC):
     This class defines the interface that all expression types must implement.
     It follows requirement 6.1 (classic Interpreter Pattern structure) and
     supports requirement 6.2 (extensibility for new operators).
+
+    Subclasses that override children or _payload describe their structure,
+    so generic walks, pickling and analyses see through them. Other
+    subclasses are treated as opaque, see is_opaque.
     """
+
+    _describes_structure = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._describes_structure = (cls.children is not Expression.children
+                                    or cls._payload is not Expression._payload)
     
     @abstractmethod
     def interpret(self, context: 'Context') -> float:
@@ -48,4 +65,227 @@ class Expression(ABC):
         Returns:
             str: A string representation of the expression.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def __add__(self, other):
+        return _combine('add', self, other)
+
+    def __radd__(self, other):
+        # sum() starts from 0; skip it so sum(expressions) has no extra node.
+        if isinstance(other, (int, float)) and other == 0 and not isinstance(other, bool):
+            return self
+        return _combine('add', other, self)
+
+    def __sub__(self, other):
+        return _combine('sub', self, other)
+
+    def __rsub__(self, other):
+        return _combine('sub', other, self)
+
+    def __mul__(self, other):
+        return _combine('mul', self, other)
+
+    def __rmul__(self, other):
+        return _combine('mul', other, self)
+
+    def __truediv__(self, other):
+        return _combine('div', self, other)
+
+    def __rtruediv__(self, other):
+        return _combine('div', other, self)
+
+    def __pow__(self, other):
+        return _combine('pow', self, other)
+
+    def __rpow__(self, other):
+        return _combine('pow', other, self)
+
+    def __neg__(self):
+        # Negation is multiplication by -1, as the parser builds it.
+        return _combine('mul', -1, self)
+
+    def children(self) -> Tuple['Expression', ...]:
+        """
+        The direct subexpressions of the expression.
+
+        Returns:
+            Tuple[Expression, ...]: The operands, or an empty tuple for terminals.
+        """
+        return ()
+
+    def with_children(self, children) -> 'Expression':
+        """
+        Create a copy of the expression with other direct subexpressions.
+
+        Args:
+            children: The new operands, as many as children() returns.
+
+        Returns:
+            Expression: A new node, or this node if every child is unchanged.
+
+        Raises:
+            InvalidExpressionError: If the number of children does not match.
+        """
+        if len(children) != 0:
+            raise InvalidExpressionError(f"{type(self).__name__} has no children")
+        return self
+
+    def _payload(self) -> Tuple:
+        """
+        The constructor arguments of this node that precede its children.
+
+        A node must be rebuildable as type(node)(*node._payload(), *node.children()).
+        """
+        return ()
+
+    def __reduce_ex__(self, protocol):
+        # Pickle the whole tree as one flat encoding, without recursion.
+        # Nodes that do not describe their structure pickle their attributes.
+        if not self._describes_structure:
+            return super().__reduce_ex__(protocol)
+        return (decode_tree, encode_tree(self))
+
+    def _own_variables(self) -> FrozenSet[str]:
+        """
+        The variable names read by this node itself, not by its children.
+        """
+        return _NO_VARIABLES
+
+    def is_opaque(self) -> bool:
+        """
+        Whether the expression contains a node that does not describe its structure.
+
+        Such a node, an instance of a subclass that overrides neither children
+        nor _payload, may read variables and hold operands that no analysis
+        can see. free_variables, node_count and depth then leave out what is
+        inside it, their results are not cached, and callers that depend on
+        them fall back to evaluating the expression.
+
+        Returns:
+            bool: True if some node of the expression is opaque.
+        """
+        return self._cached('_opaque', _contains_opaque)
+
+    def free_variables(self) -> FrozenSet[str]:
+        """
+        The names of all variables the expression reads.
+
+        The result is computed once per node without recursion and cached on
+        the node, so subtrees shared between several parents are analysed
+        only once. Expressions must not be mutated after this is called.
+        Variables read inside opaque nodes are left out, see is_opaque.
+
+        Returns:
+            FrozenSet[str]: The variable names.
+        """
+        return self._cached('_free_variables', _union_variables)
+
+    def node_count(self) -> int:
+        """
+        The number of nodes in the expression, counting shared subtrees once per use.
+
+        This is the number of interpret calls one evaluation makes. It is
+        cached on every node like free_variables.
+
+        Returns:
+            int: The node count.
+        """
+        return self._cached('_node_count', _count_nodes)
+
+    def depth(self) -> int:
+        """
+        The depth of the expression, where a terminal has depth 1.
+
+        This is the peak number of nested interpret calls one evaluation
+        makes. It is cached on every node like free_variables.
+
+        Returns:
+            int: The depth.
+        """
+        return self._cached('_depth', _measure_depth)
+
+    def _cached(self, attribute: str, combine):
+        """
+        Compute per-node metadata bottom-up without recursion and cache it.
+
+        Values of opaque nodes, and of every node above one, are computed
+        but not cached, as they leave out what the opaque node holds.
+
+        Args:
+            attribute: The instance attribute the value of every node is cached in.
+            combine: A function of a node and the tuple of its children's values.
+
+        Returns:
+            The value for this node.
+        """
+        cached = self.__dict__.get(attribute)
+        if cached is not None:
+            return cached
+        uncached: Dict[int, object] = {}
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if attribute in node.__dict__ or id(node) in uncached:
+                continue
+            children = node.children()
+            if children and not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in children
+                             if attribute not in child.__dict__)
+                continue
+            if not uncached and node._describes_structure:
+                node.__dict__[attribute] = combine(node, tuple(child.__dict__[attribute] for child in children))
+                continue
+            operands = tuple(uncached[id(child)] if id(child) in uncached else child.__dict__[attribute]
+                             for child in children)
+            if node._describes_structure and not any(id(child) in uncached for child in children):
+                node.__dict__[attribute] = combine(node, operands)
+            else:
+                uncached[id(node)] = combine(node, operands)
+        if attribute in self.__dict__:
+            return self.__dict__[attribute]
+        return uncached[id(self)]
+
+
+def _union_variables(node: Expression, operands) -> FrozenSet[str]:
+    result = node._own_variables()
+    for names in operands:
+        # Reuse an operand's set when it already covers the union, so chains
+        # of nodes share one frozenset instead of copying it.
+        if names <= result:
+            continue
+        result = names if result <= names else result | names
+    return result
+
+
+def _contains_opaque(node: Expression, operands) -> bool:
+    return not node._describes_structure or any(operands)
+
+
+def _count_nodes(node: Expression, operands) -> int:
+    return 1 + sum(operands)
+
+
+def _measure_depth(node: Expression, operands) -> int:
+    return 1 + max(operands, default=0)
+
+
+def _combine(name: str, left, right):
+    """
+    Build the operation of a registered operator for the arithmetic operators.
+
+    Numbers are wrapped in Constant nodes; other operands are not supported.
+    """
+    from math_interpreter.non_terminal_expressions import operation_class
+    from math_interpreter.operators import get_operator
+    from math_interpreter.terminal_expressions import Constant
+
+    operands = []
+    for operand in (left, right):
+        if isinstance(operand, Expression):
+            operands.append(operand)
+        elif isinstance(operand, (int, float)) and not isinstance(operand, bool):
+            operands.append(Constant(operand))
+        else:
+            return NotImplemented
+    return operation_class(get_operator(name))(*operands)
@@ -0,0 +1,214 @@
+"""
+Spreadsheet-style formula registry for the Math Interpreter.
+
+A FormulaRegistry holds named formulas that read variables from one shared
+context. It keeps a reverse index from every variable name to the formulas
+that read it, so changing an input marks only the formulas that depend on
+it as dirty. Dirty formulas are recomputed lazily, in dependency order, when
+they are next read. A formula can read the result of another formula by
+using its name as a variable.
+"""
+
+from typing import Dict, List, Optional, Set
+
+from math_interpreter.context import Context
+from math_interpreter.exceptions import CircularDependencyError, InvalidExpressionError
+from math_interpreter.metrics import instrumented
+from math_interpreter.parser import parse
+
+
+class FormulaRegistry:
+    """
+    Named formulas over a shared context with incremental recalculation.
+
+    Formula results are stored in the context under the formula names, so
+    formulas and other code read them like any other variable. Inputs must
+    be changed through set_variable; changes made to the context directly
+    are not tracked.
+    """
+
+    def __init__(self, context: Optional[Context] = None):
+        """
+        Initialize an empty registry.
+
+        Args:
+            context: The context holding the inputs. A new one is created if none is given.
+        """
+        self.context = context if context is not None else Context()
+        self.recomputations = 0
+        self._formulas: Dict[str, object] = {}
+        self._readers: Dict[str, Set[str]] = {}
+        self._dirty: Set[str] = set()
+
+    def define(self, name: str, formula) -> None:
+        """
+        Define or redefine a named formula.
+
+        Args:
+            name: The formula name, under which other formulas can read its result.
+            formula: The formula, as an Expression or as formula text.
+
+        Raises:
+            InvalidExpressionError: If the name is already used by an input
+                variable, the formula text cannot be parsed, or the formula has
+                opaque nodes whose dependencies cannot be tracked.
+            CircularDependencyError: If the formula would depend on itself.
+        """
+        expression = parse(formula) if isinstance(formula, str) else formula
+        if name not in self._formulas and self.context.has_variable(name):
+            raise InvalidExpressionError(f"'{name}' is already an input variable")
+        if expression.is_opaque():
+            raise InvalidExpressionError(f"Formula '{name}' has nodes whose dependencies cannot be tracked")
+        self._check_acyclic(name, expression.free_variables())
+
+        previous = self._formulas.get(name)
+        if previous is not None:
+            for variable in previous.free_variables():
+                self._readers[variable].discard(name)
+        self._formulas[name] = expression
+        for variable in expression.free_variables():
+            self._readers.setdefault(variable, set()).add(name)
+        self._mark_dirty([name])
+
+    def _check_acyclic(self, name: str, variables) -> None:
+        stack = list(variables)
+        seen = set()
+        while stack:
+            variable = stack.pop()
+            if variable == name:
+                raise CircularDependencyError(f"Formula '{name}' depends on itself")
+            if variable in seen or variable not in self._formulas:
+                continue
+            seen.add(variable)
+            stack.extend(self._formulas[variable].free_variables())
+
+    def set_variable(self, name: str, value: float) -> None:
+        """
+        Set an input variable and mark the formulas that depend on it dirty.
+
+        Args:
+            name: The variable name.
+            value: The variable value.
+
+        Raises:
+            InvalidExpressionError: If the name belongs to a formula.
+        """
+        if name in self._formulas:
+            raise InvalidExpressionError(f"'{name}' is a formula and cannot be set")
+        self.context.set_variable(name, value)
+        self._mark_dirty(self._readers.get(name, ()))
+
+    def _mark_dirty(self, names) -> None:
+        # A dirty formula's readers are already dirty, so the walk stops there.
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name in self._dirty:
+                continue
+            self._dirty.add(name)
+            stack.extend(self._readers.get(name, ()))
+
+    def is_dirty(self, name: str) -> bool:
+        """
+        Check whether a formula will be recomputed when it is next read.
+        """
+        return name in self._dirty
+
+    def readers(self, variable: str) -> Set[str]:
+        """
+        Get the formulas that read a variable or formula result directly.
+
+        Args:
+            variable: The variable or formula name.
+
+        Returns:
+            Set[str]: The formula names.
+        """
+        return set(self._readers.get(variable, ()))
+
+    @instrumented
+    def get(self, name: str) -> float:
+        """
+        Get the result of a formula, recomputing it and its dirty dependencies first.
+
+        Args:
+            name: The formula name.
+
+        Returns:
+            float: The result.
+
+        Raises:
+            InvalidExpressionError: If no formula has that name.
+            InterpreterError: If evaluating the formula or a dependency fails;
+                the failed formulas stay dirty.
+        """
+        if name not in self._formulas:
+            raise InvalidExpressionError(f"Unknown formula '{name}'")
+        if name in self._dirty:
+            self._recompute(self._order([name], dirty_only=True))
+        return self.context.get_variable(name)
+
+    def recalculate(self, limits=None) -> List[str]:
+        """
+        Recompute every dirty formula in dependency order.
+
+        Args:
+            limits: Optional EvaluationLimits every dirty formula must meet.
+                They are checked before any formula is recomputed.
+
+        Returns:
+            List[str]: The names of the recomputed formulas, in the order they were computed.
+
+        Raises:
+            EvaluationLimitError: If a dirty formula exceeds the limits.
+        """
+        order = self._order(sorted(self._dirty), dirty_only=True)
+        if limits is not None:
+            for name in order:
+                limits.check(self._formulas[name])
+        self._recompute(order)
+        return order
+
+    def evaluation_order(self) -> List[str]:
+        """
+        Get every formula name ordered so that each formula follows the formulas it reads.
+
+        Returns:
+            List[str]: The formula names in topological order.
+        """
+        return self._order(list(self._formulas), dirty_only=False)
+
+    def _order(self, names, dirty_only: bool) -> List[str]:
+        # Iterative depth-first post-order over formula dependencies; the
+        # registry is acyclic because define rejects cycles.
+        order = []
+        done = set()
+        for root in names:
+            stack = [(root, False)]
+            while stack:
+                name, expanded = stack.pop()
+                if name in done:
+                    continue
+                if expanded:
+                    done.add(name)
+                    order.append(name)
+                    continue
+                stack.append((name, True))
+                for variable in self._formulas[name].free_variables():
+                    if variable in self._formulas and (not dirty_only or variable in self._dirty):
+                        stack.append((variable, False))
+        return order
+
+    def _recompute(self, order: List[str]) -> None:
+        for name in order:
+            value = self._formulas[name].interpret(self.context)
+            self.context.set_variable(name, value)
+            self._dirty.discard(name)
+            self.recomputations += 1
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._formulas
+
+    def __len__(self) -> int:
+        return len(self._formulas)
+
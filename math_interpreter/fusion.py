@@ -0,0 +1,339 @@
+"""
+Fused expression nodes for the Math Interpreter.
+
+Most nodes of generated formulas are products added to something,
+((a * b) + c), and variables scaled by a constant, (x * 2). Interpreting
+these takes one interpret call per node. The fuse pass replaces them with
+fused nodes that evaluate the whole pattern in one call:
+
+- MultiplyAdd for ((a * b) + c) and AddMultiply for (c + (a * b));
+- ScaledVariable for (x * k) and (k * x).
+
+Fused nodes render, evaluate and hash exactly like the subtrees they
+replace, and unfuse turns them back into binary operations for analyses
+that only understand binary operations.
+"""
+
+from typing import Dict
+
+from math_interpreter.exceptions import InvalidExpressionError
+from math_interpreter.expression import Expression
+from math_interpreter.metrics import instrumented
+from math_interpreter.non_terminal_expressions import Addition, Multiplication
+from math_interpreter.operators import ADDITION, MULTIPLICATION, operator_for
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+class MultiplyAdd(Expression):
+    """
+    A fused node computing ((multiplicand * multiplier) + addend).
+    """
+
+    def __init__(self, multiplicand, multiplier, addend):
+        """
+        Initialize a multiply-add with its three operands.
+
+        Args:
+            multiplicand: The left factor (Expression).
+            multiplier: The right factor (Expression).
+            addend: The expression added to the product.
+        """
+        self.multiplicand = multiplicand
+        self.multiplier = multiplier
+        self.addend = addend
+
+    def children(self):
+        """
+        The operands in evaluation order.
+
+        Returns:
+            tuple: The multiplicand, multiplier and addend.
+        """
+        return (self.multiplicand, self.multiplier, self.addend)
+
+    def with_children(self, children):
+        """
+        Create a copy of the node with other operands.
+
+        Args:
+            children: The new multiplicand, multiplier and addend.
+
+        Returns:
+            MultiplyAdd: A new node, or this node if every operand is unchanged.
+
+        Raises:
+            InvalidExpressionError: If not exactly three operands are given.
+        """
+        return _with_children(self, children)
+
+    def interpret(self, context):
+        """
+        Interpret the multiply-add.
+
+        Args:
+            context: The context containing variable definitions.
+
+        Returns:
+            float: The product of the factors plus the addend.
+        """
+        return self.multiplicand.interpret(context) * self.multiplier.interpret(context) \
+            + self.addend.interpret(context)
+
+    def unfused(self):
+        """
+        The equivalent binary operations.
+
+        Returns:
+            Addition: The sum of the product and the addend.
+        """
+        return Addition(Multiplication(self.multiplicand, self.multiplier), self.addend)
+
+    def __str__(self):
+        """
+        String representation of the multiply-add.
+
+        Returns:
+            str: The rendering of the unfused operations.
+        """
+        product = MULTIPLICATION.render(str(self.multiplicand), str(self.multiplier))
+        return ADDITION.render(product, str(self.addend))
+
+
+class AddMultiply(Expression):
+    """
+    A fused node computing (addend + (multiplicand * multiplier)).
+    """
+
+    def __init__(self, addend, multiplicand, multiplier):
+        """
+        Initialize an add-multiply with its three operands.
+
+        Args:
+            addend: The expression the product is added to.
+            multiplicand: The left factor (Expression).
+            multiplier: The right factor (Expression).
+        """
+        self.addend = addend
+        self.multiplicand = multiplicand
+        self.multiplier = multiplier
+
+    def children(self):
+        """
+        The operands in evaluation order.
+
+        Returns:
+            tuple: The addend, multiplicand and multiplier.
+        """
+        return (self.addend, self.multiplicand, self.multiplier)
+
+    def with_children(self, children):
+        """
+        Create a copy of the node with other operands.
+
+        Args:
+            children: The new addend, multiplicand and multiplier.
+
+        Returns:
+            AddMultiply: A new node, or this node if every operand is unchanged.
+
+        Raises:
+            InvalidExpressionError: If not exactly three operands are given.
+        """
+        return _with_children(self, children)
+
+    def interpret(self, context):
+        """
+        Interpret the add-multiply.
+
+        Args:
+            context: The context containing variable definitions.
+
+        Returns:
+            float: The addend plus the product of the factors.
+        """
+        return self.addend.interpret(context) \
+            + self.multiplicand.interpret(context) * self.multiplier.interpret(context)
+
+    def unfused(self):
+        """
+        The equivalent binary operations.
+
+        Returns:
+            Addition: The sum of the addend and the product.
+        """
+        return Addition(self.addend, Multiplication(self.multiplicand, self.multiplier))
+
+    def __str__(self):
+        """
+        String representation of the add-multiply.
+
+        Returns:
+            str: The rendering of the unfused operations.
+        """
+        product = MULTIPLICATION.render(str(self.multiplicand), str(self.multiplier))
+        return ADDITION.render(str(self.addend), product)
+
+
+class ScaledVariable(Expression):
+    """
+    A fused terminal computing a variable times a constant coefficient.
+    """
+
+    def __init__(self, name, coefficient, coefficient_first=False):
+        """
+        Initialize a scaled variable.
+
+        Args:
+            name: The variable name.
+            coefficient: The constant factor.
+            coefficient_first: Whether the coefficient is the left factor,
+                as in (2 * x), rather than the right one, as in (x * 2).
+        """
+        self.name = name
+        self.coefficient = float(coefficient)
+        self.coefficient_first = coefficient_first
+
+    def interpret(self, context):
+        """
+        Interpret the scaled variable.
+
+        Args:
+            context: The context containing variable definitions.
+
+        Returns:
+            float: The variable value times the coefficient.
+
+        Raises:
+            VariableNotDefinedError: If the variable is not defined in the context.
+        """
+        return context.get_variable(self.name) * self.coefficient
+
+    def _own_variables(self):
+        """
+        The variable read by this node.
+
+        Returns:
+            frozenset: A set holding the variable name.
+        """
+        return frozenset((self.name,))
+
+    def _payload(self):
+        """
+        The constructor arguments of the scaled variable.
+
+        Returns:
+            tuple: The name, coefficient and operand order.
+        """
+        return (self.name, self.coefficient, self.coefficient_first)
+
+    def unfused(self):
+        """
+        The equivalent binary operation.
+
+        Returns:
+            Multiplication: The product of the variable and the constant.
+        """
+        if self.coefficient_first:
+            return Multiplication(Constant(self.coefficient), Variable(self.name))
+        return Multiplication(Variable(self.name), Constant(self.coefficient))
+
+    def __str__(self):
+        """
+        String representation of the scaled variable.
+
+        Returns:
+            str: The rendering of the unfused multiplication.
+        """
+        coefficient = str(Constant(self.coefficient))
+        if self.coefficient_first:
+            return MULTIPLICATION.render(coefficient, self.name)
+        return MULTIPLICATION.render(self.name, coefficient)
+
+
+def _with_children(node, children):
+    if len(children) != 3:
+        raise InvalidExpressionError(f"{type(node).__name__} takes 3 operands, got {len(children)}")
+    if all(new is old for new, old in zip(children, node.children())):
+        return node
+    return type(node)(*children)
+
+
+def _is_product(node) -> bool:
+    return operator_for(node) is MULTIPLICATION
+
+
+def _fuse_node(node):
+    """
+    Fuse a node whose children have already been fused.
+    """
+    operator = operator_for(node)
+    if operator is MULTIPLICATION:
+        left, right = node.left, node.right
+        if isinstance(left, Variable) and isinstance(right, Constant):
+            return ScaledVariable(left.name, right.value)
+        if isinstance(left, Constant) and isinstance(right, Variable):
+            return ScaledVariable(right.name, left.value, coefficient_first=True)
+    elif operator is ADDITION:
+        left, right = node.left, node.right
+        if _is_product(left):
+            return MultiplyAdd(left.left, left.right, right)
+        if _is_product(right):
+            return AddMultiply(left, right.left, right.right)
+    return node
+
+
+def _rebuild(expression, rewrite):
+    # Post-order without recursion, memoized by node so shared subtrees are
+    # rewritten once and stay shared.
+    results: Dict[int, object] = {}
+    stack = [(expression, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in results:
+            continue
+        children = node.children()
+        if children and not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children) if id(child) not in results)
+            continue
+        rebuilt = node.with_children(tuple(results[id(child)] for child in children)) if children else node
+        results[id(node)] = rewrite(rebuilt)
+    return results[id(expression)]
+
+
+@instrumented
+def fuse(expression):
+    """
+    Replace common patterns with fused nodes.
+
+    Products of a variable and a constant become ScaledVariable nodes, and
+    remaining products that are an operand of an addition become
+    MultiplyAdd or AddMultiply nodes. Results are unchanged: the fused
+    nodes apply the same floating-point operations in the same order.
+    Subtrees shared by several parents stay shared.
+
+    Args:
+        expression: The expression to fuse; it is not changed.
+
+    Returns:
+        Expression: The fused expression, sharing every unchanged subtree.
+    """
+    return _rebuild(expression, _fuse_node)
+
+
+def unfuse(expression):
+    """
+    Replace every fused node with the equivalent binary operations.
+
+    Args:
+        expression: The expression to unfuse; it is not changed.
+
+    Returns:
+        Expression: An expression of terminals and binary operations only.
+    """
+    return _rebuild(expression, _unfuse_node)
+
+
+def _unfuse_node(node):
+    unfused = getattr(node, 'unfused', None)
+    return node if unfused is None else unfused()
@@ -0,0 +1,194 @@
+"""
+Interval-bound analysis for the Math Interpreter.
+
+Given a (low, high) range for every variable, such as the minimum and
+maximum of each column of a data partition, the analysis computes bounds
+that every result of an expression is guaranteed to lie within, without
+evaluating any rows. Bounds come from the interval functions of the
+registered operators and are rounded outwards, so they hold despite
+floating-point rounding. Fused nodes are bounded through the operations
+they stand for. Operators without an interval function give unbounded
+results.
+
+The bounds let batch evaluation skip partitions whose results cannot pass
+a threshold filter, and write float32 results when no intermediate value
+can overflow or underflow float32.
+"""
+
+import math
+from typing import Dict, Iterable, List, Mapping, Sequence
+
+from math_interpreter.exceptions import VariableNotDefinedError
+from math_interpreter.operators import Bounds, operator_for
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+FLOAT32_MAX = 3.4028234663852886e38
+FLOAT32_MIN_NORMAL = 1.1754943508222875e-38
+_UNBOUNDED: Bounds = (-math.inf, math.inf)
+_SMALLEST_SUBNORMAL = 5e-324
+
+
+def column_ranges(columns: Mapping[str, Iterable[float]]) -> Dict[str, Bounds]:
+    """
+    Compute the range of every column.
+
+    Args:
+        columns: Column values by variable name.
+
+    Returns:
+        Dict[str, Bounds]: (minimum, maximum) by variable name. Empty columns
+        and columns containing NaN are unbounded.
+    """
+    ranges = {}
+    for name, values in columns.items():
+        low = math.inf
+        high = -math.inf
+        for value in values:
+            if value != value:
+                low, high = _UNBOUNDED
+                break
+            if value < low:
+                low = value
+            if value > high:
+                high = value
+        ranges[name] = (low, high) if low <= high else _UNBOUNDED
+    return ranges
+
+
+def _widen(bounds: Bounds) -> Bounds:
+    # Round outwards by one unit in the last place; NaN bounds become infinite.
+    low, high = bounds
+    low = -math.inf if low != low else math.nextafter(low, -math.inf)
+    high = math.inf if high != high else math.nextafter(high, math.inf)
+    return (low, high)
+
+
+def node_bounds(expression, ranges: Mapping[str, Bounds]) -> Dict[int, Bounds]:
+    """
+    Compute the bounds of every distinct node of an expression, without recursion.
+
+    Args:
+        expression: The expression to analyse.
+        ranges: The (low, high) range of every variable the expression reads.
+
+    Returns:
+        Dict[int, Bounds]: Bounds by node id, including the intermediate
+        operations of fused nodes.
+
+    Raises:
+        VariableNotDefinedError: If a variable has no range.
+    """
+    results: Dict[int, Bounds] = {}
+    # The unfused form of each fused node, kept alive so its node ids stay unique.
+    unfused: Dict[int, object] = {}
+    stack = [(expression, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in results:
+            continue
+        operator = operator_for(node)
+        if operator is None:
+            if isinstance(node, Constant):
+                results[id(node)] = _UNBOUNDED if node.value != node.value else (node.value, node.value)
+            elif isinstance(node, Variable):
+                if node.name not in ranges:
+                    raise VariableNotDefinedError(f"Variable '{node.name}' has no range")
+                results[id(node)] = tuple(ranges[node.name])
+            elif id(node) in unfused:
+                results[id(node)] = results[id(unfused[id(node)])]
+            elif hasattr(node, 'unfused'):
+                unfused[id(node)] = node.unfused()
+                stack.append((node, True))
+                stack.append((unfused[id(node)], False))
+            else:
+                results[id(node)] = _UNBOUNDED
+        elif not expanded:
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+        elif operator.interval is None:
+            results[id(node)] = _UNBOUNDED
+        else:
+            results[id(node)] = _widen(operator.interval(results[id(node.left)], results[id(node.right)]))
+    return results
+
+
+def bounds(expression, ranges: Mapping[str, Bounds]) -> Bounds:
+    """
+    Compute guaranteed bounds of an expression's results.
+
+    Args:
+        expression: The expression to analyse.
+        ranges: The (low, high) range of every variable the expression reads.
+
+    Returns:
+        Bounds: (low, high) with low <= result <= high for every assignment
+        of variable values within their ranges that evaluates without error.
+
+    Raises:
+        VariableNotDefinedError: If a variable has no range.
+    """
+    return node_bounds(expression, ranges)[id(expression)]
+
+
+def may_satisfy(expression, ranges: Mapping[str, Bounds],
+                low: float = -math.inf, high: float = math.inf) -> bool:
+    """
+    Check whether any result of an expression can fall within [low, high].
+
+    Args:
+        expression: The expression to analyse.
+        ranges: The (low, high) range of every variable the expression reads.
+        low: The lower end of the accepted results.
+        high: The upper end of the accepted results.
+
+    Returns:
+        bool: False if no result can be accepted, so the rows can be skipped.
+    """
+    result_low, result_high = bounds(expression, ranges)
+    return result_low <= high and result_high >= low
+
+
+def prune_partitions(expression, partitions: Sequence[Mapping[str, Bounds]],
+                     low: float = -math.inf, high: float = math.inf) -> List[int]:
+    """
+    Select the data partitions in which some row may pass a threshold filter.
+
+    Args:
+        expression: The filter expression.
+        partitions: The variable ranges of every partition.
+        low: The lower end of the accepted results.
+        high: The upper end of the accepted results.
+
+    Returns:
+        List[int]: The indices of the partitions that must be evaluated.
+    """
+    return [index for index, ranges in enumerate(partitions)
+            if may_satisfy(expression, ranges, low, high)]
+
+
+def select_typecode(expression, ranges: Mapping[str, Bounds]) -> str:
+    """
+    Choose the column typecode for the results of an expression.
+
+    float32 is chosen when the inputs, every intermediate value and the
+    result are bounded within the finite float32 range, so nothing can
+    overflow, and no nonzero bound is smaller in magnitude than the smallest
+    normal float32, which float32 would flush towards zero. float32 keeps about 7 significant digits; callers that need
+    more precision should not use it.
+
+    Args:
+        expression: The expression to analyse.
+        ranges: The (low, high) range of every variable the expression reads.
+
+    Returns:
+        str: 'f' for float32 or 'd' for float64.
+    """
+    for low, high in node_bounds(expression, ranges).values():
+        if not (-FLOAT32_MAX <= low and high <= FLOAT32_MAX):
+            return 'd'
+        # Outward rounding turns a zero bound into the smallest subnormal.
+        if any(_SMALLEST_SUBNORMAL < abs(bound) < FLOAT32_MIN_NORMAL for bound in (low, high)):
+            return 'd'
+    return 'f'
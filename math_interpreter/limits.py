@@ -0,0 +1,110 @@
+"""
+Evaluation limits for untrusted formulas in the Math Interpreter.
+
+EvaluationLimits bounds the node count, depth and number of evaluation steps
+of an expression. Every evaluation step of interpret is one node visit and
+every step of a compiled Program is one instruction per row, which constant
+folding and fusion make fewer than the nodes. All limits are checked before evaluation starts, from
+metadata cached on the nodes or the program length, instead of by counting
+during evaluation.
+"""
+
+from typing import Optional
+
+from math_interpreter.exceptions import EvaluationLimitError
+from math_interpreter.metrics import instrumented
+
+
+class EvaluationLimits:
+    """
+    Upper bounds on the size and cost of evaluating an expression.
+
+    A limit of None is not enforced. Node counts count a subtree shared by
+    several parents once per use, as interpret evaluates it once per use.
+    """
+
+    def __init__(self, max_nodes: Optional[int] = None, max_depth: Optional[int] = None,
+                 max_steps: Optional[int] = None):
+        """
+        Initialize limits.
+
+        Args:
+            max_nodes: The maximum number of nodes in an expression.
+            max_depth: The maximum depth of an expression, where a terminal has depth 1.
+            max_steps: The maximum number of evaluation steps: node visits when
+                interpreted, instructions per row of a compiled program.
+        """
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.max_steps = max_steps
+
+    def __repr__(self) -> str:
+        return (f"EvaluationLimits(max_nodes={self.max_nodes!r}, max_depth={self.max_depth!r}, "
+                f"max_steps={self.max_steps!r})")
+
+    def check(self, expression) -> None:
+        """
+        Check an expression against the node, depth and step limits of interpret.
+
+        Interpreting an expression takes one step per node visit, so its
+        steps are its node count.
+
+        Args:
+            expression: The expression to check.
+
+        Raises:
+            EvaluationLimitError: If the expression exceeds a limit.
+        """
+        self.check_structure(expression)
+        if self.max_steps is not None and expression.node_count() > self.max_steps:
+            raise EvaluationLimitError(
+                f"Expression takes {expression.node_count()} steps, more than the limit of {self.max_steps}")
+
+    def check_structure(self, expression) -> None:
+        """
+        Check an expression against the node and depth limits only.
+
+        Args:
+            expression: The expression to check.
+
+        Raises:
+            EvaluationLimitError: If the expression has too many nodes or is too deep.
+        """
+        if self.max_nodes is not None and expression.node_count() > self.max_nodes:
+            raise EvaluationLimitError(
+                f"Expression has {expression.node_count()} nodes, more than the limit of {self.max_nodes}")
+        if self.max_depth is not None and expression.depth() > self.max_depth:
+            raise EvaluationLimitError(
+                f"Expression has depth {expression.depth()}, more than the limit of {self.max_depth}")
+
+    def check_program(self, program) -> None:
+        """
+        Check the step limit of a compiled program.
+
+        Args:
+            program: The compiled Program.
+
+        Raises:
+            EvaluationLimitError: If the program takes more steps per row than allowed.
+        """
+        if self.max_steps is not None and len(program) > self.max_steps:
+            raise EvaluationLimitError(
+                f"Program takes {len(program)} steps per row, more than the limit of {self.max_steps}")
+
+    @instrumented
+    def evaluate(self, expression, context) -> float:
+        """
+        Check an expression against the limits and interpret it.
+
+        Args:
+            expression: The expression to evaluate.
+            context: The context containing variable definitions.
+
+        Returns:
+            float: The result.
+
+        Raises:
+            EvaluationLimitError: If the expression exceeds a limit.
+        """
+        self.check(expression)
+        return expression.interpret(context)
@@ -0,0 +1,312 @@
+"""
+Linear-form evaluation for the Math Interpreter.
+
+Many formulas are linear in their variables: sums of coefficients times
+variables plus a constant. linear_form detects such trees and reduces them
+to a LinearForm, a coefficient vector over the variables plus an intercept,
+so evaluating them against a context is one dot product instead of one
+interpret call per node. A LinearSystem stacks many forms into a matrix and
+evaluates all of them over a dataset as one matrix product, using NumPy
+when it is installed.
+
+Coefficients are combined while the form is built, so results can differ
+from interpret in the last bits.
+"""
+
+from array import array
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from math_interpreter.compiler import compile_expression
+from math_interpreter.context import Context
+from math_interpreter.exceptions import InterpreterError, VariableNotDefinedError
+from math_interpreter.metrics import instrumented
+from math_interpreter.operators import ADDITION, DIVISION, MULTIPLICATION, POWER, SUBTRACTION, operator_for
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+_PartialForm = Tuple[Dict[str, float], float]
+
+
+class LinearForm:
+    """
+    An affine function of variables: intercept + sum of coefficient * variable.
+    """
+
+    def __init__(self, coefficients: Mapping[str, float], intercept: float = 0.0):
+        """
+        Initialize a linear form.
+
+        Args:
+            coefficients: The coefficient of every variable, in variable order.
+                Variables with a zero coefficient are kept, so evaluation
+                still requires them, as evaluating the tree would.
+            intercept: The constant term.
+        """
+        self.names = tuple(coefficients)
+        self.coefficients = array('d', coefficients.values())
+        self.intercept = float(intercept)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __repr__(self) -> str:
+        terms = ", ".join(f"{name!r}: {coefficient!r}"
+                          for name, coefficient in zip(self.names, self.coefficients))
+        return f"LinearForm({{{terms}}}, {self.intercept!r})"
+
+    def evaluate(self, context: Context) -> float:
+        """
+        Evaluate the form against a context as a dot product.
+
+        Args:
+            context: The context containing variable definitions.
+
+        Returns:
+            float: The value of the form.
+
+        Raises:
+            VariableNotDefinedError: If a variable is not defined in the context.
+        """
+        get_variable = context.get_variable
+        total = self.intercept
+        for name, coefficient in zip(self.names, self.coefficients):
+            total += coefficient * get_variable(name)
+        return total
+
+    def evaluate_batch(self, columns: Mapping[str, Sequence[float]], rows: int) -> List[float]:
+        """
+        Evaluate the form over many rows at once.
+
+        Args:
+            columns: One sequence of row values per variable name.
+            rows: The number of rows.
+
+        Returns:
+            List[float]: The value for every row.
+
+        Raises:
+            VariableNotDefinedError: If a variable has no column.
+            ValueError: If a column has fewer than rows values.
+        """
+        return LinearSystem([self]).evaluate_batch(columns, rows)[0]
+
+
+def linear_form(expression) -> Optional[LinearForm]:
+    """
+    Reduce an expression to a linear form, if it is linear in its variables.
+
+    Sums, differences, products with a variable-free factor and quotients
+    by a variable-free nonzero divisor of linear subexpressions are linear,
+    as is a linear base raised to the power 1. Fused nodes are recognised
+    like the operations they replace. The tree is walked without recursion
+    and the partial form of every distinct node is built once from the forms
+    of its operands, so shared subtrees do not multiply the work.
+
+    Args:
+        expression: The expression to reduce.
+
+    Returns:
+        Optional[LinearForm]: The equivalent linear form, or None if the
+        expression is not linear, contains an unknown or opaque node, or has a
+        variable-free part whose evaluation raises.
+    """
+    if expression.is_opaque():
+        return None
+    # Partial forms by node id: (coefficients, intercept). Variable-free
+    # nodes have no coefficients.
+    forms: Dict[int, _PartialForm] = {}
+    # The unfused form of each fused node, kept alive so its node ids stay unique.
+    unfused: Dict[int, object] = {}
+    stack = [(expression, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in forms:
+            continue
+        if isinstance(node, Variable):
+            forms[id(node)] = ({node.name: 1.0}, 0.0)
+            continue
+        if not node.free_variables():
+            value = _constant_value(node)
+            if value is None:
+                return None
+            forms[id(node)] = ({}, value)
+            continue
+        operator = operator_for(node)
+        if operator is None:
+            if id(node) in unfused:
+                forms[id(node)] = forms[id(unfused[id(node)])]
+            elif hasattr(node, 'unfused'):
+                unfused[id(node)] = node.unfused()
+                stack.append((node, True))
+                stack.append((unfused[id(node)], False))
+            else:
+                return None
+            continue
+        if not expanded:
+            if operator is MULTIPLICATION:
+                linear = not (node.left.free_variables() and node.right.free_variables())
+            elif operator in (DIVISION, POWER):
+                linear = not node.right.free_variables()
+            else:
+                linear = operator is ADDITION or operator is SUBTRACTION
+            if not linear:
+                return None
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+            continue
+        left, right = forms[id(node.left)], forms[id(node.right)]
+        if operator is ADDITION:
+            forms[id(node)] = _combine(left, right, 1.0)
+        elif operator is SUBTRACTION:
+            forms[id(node)] = _combine(left, right, -1.0)
+        elif operator is MULTIPLICATION:
+            term, factor = (right, left[1]) if not left[0] else (left, right[1])
+            forms[id(node)] = ({name: factor * coefficient for name, coefficient in term[0].items()},
+                               factor * term[1])
+        elif operator is DIVISION:
+            divisor = right[1]
+            if not divisor:
+                # Zero divisors keep their error for interpret.
+                return None
+            forms[id(node)] = ({name: coefficient / divisor for name, coefficient in left[0].items()},
+                               left[1] / divisor)
+        else:
+            if right[1] != 1.0:
+                return None
+            forms[id(node)] = left
+    coefficients, intercept = forms[id(expression)]
+    return LinearForm(coefficients, intercept)
+
+
+def _combine(left: _PartialForm, right: _PartialForm, sign: float) -> _PartialForm:
+    # The form of left + sign * right, keeping the variables in first-use order.
+    coefficients = dict(left[0])
+    for name, coefficient in right[0].items():
+        coefficients[name] = coefficients.get(name, 0.0) + sign * coefficient
+    return coefficients, left[1] + sign * right[1]
+
+
+def _constant_value(node) -> Optional[float]:
+    # The value of a variable-free subtree, or None if evaluating it raises.
+    if isinstance(node, Constant):
+        return node.value
+    try:
+        return float(compile_expression(node).run(Context()))
+    except InterpreterError:
+        return None
+
+
+class LinearSystem:
+    """
+    Many linear forms over a shared variable list, as a coefficient matrix.
+    """
+
+    def __init__(self, forms: Sequence[LinearForm]):
+        """
+        Stack linear forms into a matrix.
+
+        Args:
+            forms: The forms, one matrix row each.
+        """
+        index_of: Dict[str, int] = {}
+        for form in forms:
+            for name in form.names:
+                index_of.setdefault(name, len(index_of))
+        self.names = tuple(index_of)
+        self.intercepts = array('d', (form.intercept for form in forms))
+        # Each row keeps only its own terms, so sparse forms stay cheap.
+        self.rows = [(tuple(index_of[name] for name in form.names), form.coefficients)
+                     for form in forms]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def matrix(self) -> List[array]:
+        """
+        Build the dense coefficient matrix.
+
+        Returns:
+            List[array]: One row of coefficients per form, with one column
+            per variable in the order of names.
+        """
+        width = len(self.names)
+        dense = []
+        for indices, coefficients in self.rows:
+            row = array('d', bytes(8 * width))
+            for index, coefficient in zip(indices, coefficients):
+                row[index] += coefficient
+            dense.append(row)
+        return dense
+
+    @instrumented
+    def evaluate(self, context: Context) -> List[float]:
+        """
+        Evaluate every form against one context, looking up each variable once.
+
+        Args:
+            context: The context containing variable definitions.
+
+        Returns:
+            List[float]: The value of every form, in order.
+
+        Raises:
+            VariableNotDefinedError: If a variable is not defined in the context.
+        """
+        values = [context.get_variable(name) for name in self.names]
+        results = []
+        for (indices, coefficients), intercept in zip(self.rows, self.intercepts):
+            total = intercept
+            for index, coefficient in zip(indices, coefficients):
+                total += coefficient * values[index]
+            results.append(total)
+        return results
+
+    @instrumented
+    def evaluate_batch(self, columns: Mapping[str, Sequence[float]], rows: int):
+        """
+        Evaluate every form over many rows as one matrix product.
+
+        With NumPy installed and no column given as a list, the product is
+        computed by NumPy and one array per form is returned. Otherwise
+        each form adds its scaled columns element by element.
+
+        Args:
+            columns: One sequence of row values per variable name.
+            rows: The number of rows.
+
+        Returns:
+            The values of every form, one list or array of rows per form.
+
+        Raises:
+            VariableNotDefinedError: If a variable has no column.
+            ValueError: If a column has fewer than rows values.
+        """
+        for name in self.names:
+            if name not in columns:
+                raise VariableNotDefinedError(f"Variable '{name}' is not defined")
+            if len(columns[name]) < rows:
+                raise ValueError(f"Column '{name}' has fewer than {rows} rows")
+        data = [columns[name] for name in self.names]
+        if not any(isinstance(column, list) for column in data):
+            try:
+                import numpy
+            except ImportError:
+                numpy = None
+            if numpy is not None:
+                return self._evaluate_numpy(numpy, data, rows)
+        results = []
+        for (indices, coefficients), intercept in zip(self.rows, self.intercepts):
+            total = [intercept] * rows
+            for index, coefficient in zip(indices, coefficients):
+                total = [value + coefficient * x for value, x in zip(total, data[index])]
+            results.append(total)
+        return results
+
+    def _evaluate_numpy(self, numpy, data, rows: int):
+        values = numpy.empty((len(self.names), rows))
+        for index, column in enumerate(data):
+            values[index] = numpy.asarray(column, dtype=float)[:rows]
+        weights = numpy.array(self.matrix()).reshape(len(self.rows), len(self.names))
+        intercepts = numpy.frombuffer(self.intercepts, dtype=float)
+        return list(weights @ values + intercepts[:, None])
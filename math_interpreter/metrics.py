@@ -0,0 +1,380 @@
+"""
+Metrics for the Math Interpreter.
+
+A MetricsRegistry holds counters, gauges and histograms, renders them in
+Prometheus text exposition format and as a plain snapshot dictionary.
+Recording is off by default. After enable, the library's entry points
+record evaluation counts, latencies, tree sizes, errors by type and cache
+hits into the active registry. Calls and errors are counted on every call,
+while latencies and tree sizes are observed on one call in SAMPLE_INTERVAL
+per entry point, which keeps the overhead on small expressions low. While
+metrics are disabled an instrumented call costs one global lookup.
+Undefined variables are also counted where the context raises them, so
+failures of plain interpret calls show up.
+"""
+
+import functools
+import itertools
+import threading
+import time
+from bisect import bisect_left
+from threading import get_ident
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+SAMPLE_INTERVAL = 16
+
+
+class Counter:
+    """
+    A monotonically increasing, thread-safe count.
+
+    Every thread increments its own cell without locking, and the cells are
+    summed when the count is read.
+    """
+
+    def __init__(self):
+        self._cells: Dict[int, float] = {}
+
+    def inc(self, amount: float = 1) -> None:
+        """
+        Increase the count.
+
+        Args:
+            amount: The non-negative increment.
+        """
+        cells = self._cells
+        ident = get_ident()
+        cells[ident] = cells.get(ident, 0) + amount
+
+    @property
+    def value(self) -> float:
+        """
+        The current count.
+        """
+        return sum(list(self._cells.values()))
+
+    def _samples(self, name: str, labels: str) -> List[Tuple[str, float]]:
+        return [(f"{name}{labels}", self.value)]
+
+    def _snapshot(self):
+        return self.value
+
+
+class Gauge:
+    """
+    A value computed by a callback whenever the metrics are read.
+    """
+
+    def __init__(self, function: Callable[[], float]):
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        """
+        The current value.
+        """
+        return self._function()
+
+    def _samples(self, name: str, labels: str) -> List[Tuple[str, float]]:
+        return [(f"{name}{labels}", self.value)]
+
+    def _snapshot(self):
+        return self.value
+
+
+class Histogram:
+    """
+    A cumulative histogram of observed values, such as latencies in seconds.
+
+    Like a Counter, every thread records into its own cell without locking.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            buckets: The increasing upper bounds of the buckets; +Inf is implied.
+        """
+        self.buckets = tuple(buckets)
+        # Per thread: the count of every bucket and of +Inf, then the sum.
+        self._cells: Dict[int, List[float]] = {}
+
+    def observe(self, value: float) -> None:
+        """
+        Record one observation.
+        """
+        index = bisect_left(self.buckets, value)
+        ident = get_ident()
+        cell = self._cells.get(ident)
+        if cell is None:
+            cell = self._cells[ident] = [0] * (len(self.buckets) + 1) + [0.0]
+        cell[index] += 1
+        cell[-1] += value
+
+    @property
+    def count(self) -> int:
+        """
+        The number of observations.
+        """
+        return self._cumulative()[0][-1]
+
+    def _cumulative(self) -> Tuple[List[int], float]:
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+        for cell in list(self._cells.values()):
+            cell = list(cell)
+            total += cell.pop()
+            counts = [count + own for count, own in zip(counts, cell)]
+        cumulative = []
+        running = 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total
+
+    def _samples(self, name: str, labels: str) -> List[Tuple[str, float]]:
+        cumulative, total = self._cumulative()
+        prefix = labels[1:-1] + ',' if labels else ''
+        samples = [(f'{name}_bucket{{{prefix}le="{bound}"}}', count)
+                   for bound, count in zip(self.buckets, cumulative)]
+        samples.append((f'{name}_bucket{{{prefix}le="+Inf"}}', cumulative[-1]))
+        samples.append((f"{name}_sum{labels}", total))
+        samples.append((f"{name}_count{labels}", cumulative[-1]))
+        return samples
+
+    def _snapshot(self):
+        cumulative, total = self._cumulative()
+        buckets = dict(zip(self.buckets, cumulative))
+        buckets[float('inf')] = cumulative[-1]
+        return {'count': cumulative[-1], 'sum': total, 'buckets': buckets}
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{labels[key]}"' for key in sorted(labels)) + '}'
+
+
+class MetricsRegistry:
+    """
+    A thread-safe collection of named metric families.
+
+    A family has one metric per distinct set of label values. Asking for a
+    metric that exists returns it, so call sites need not keep references.
+    """
+
+    def __init__(self):
+        self._families: Dict[str, Tuple[str, str, Dict[str, object]]] = {}
+        self._lock = threading.Lock()
+
+    def _metric(self, kind: str, name: str, help: str, labels: Dict[str, str], create: Callable):
+        key = _format_labels(labels)
+        family = self._families.get(name)
+        if family is not None and key in family[2]:
+            metric = family[2][key]
+        else:
+            with self._lock:
+                family = self._families.setdefault(name, (kind, help, {}))
+                metric = family[2].get(key)
+                if metric is None:
+                    metric = family[2][key] = create()
+        if family[0] != kind:
+            raise ValueError(f"Metric '{name}' is a {family[0]}, not a {kind}")
+        return metric
+
+    def counter(self, name: str, help: str = '', **labels: str) -> Counter:
+        """
+        Get or create a counter.
+
+        Args:
+            name: The metric family name.
+            help: The description rendered with the family.
+            **labels: The label values of the counter within its family.
+
+        Returns:
+            Counter: The counter.
+        """
+        return self._metric('counter', name, help, labels, Counter)
+
+    def gauge(self, name: str, function: Callable[[], float], help: str = '', **labels: str) -> Gauge:
+        """
+        Get or create a gauge whose value is computed by a callback.
+
+        Args:
+            name: The metric family name.
+            function: The callback returning the current value.
+            help: The description rendered with the family.
+            **labels: The label values of the gauge within its family.
+
+        Returns:
+            Gauge: The gauge.
+        """
+        return self._metric('gauge', name, help, labels, lambda: Gauge(function))
+
+    def histogram(self, name: str, help: str = '', buckets=LATENCY_BUCKETS, **labels: str) -> Histogram:
+        """
+        Get or create a histogram.
+
+        Args:
+            name: The metric family name.
+            help: The description rendered with the family.
+            buckets: The bucket upper bounds, used when the histogram is created.
+            **labels: The label values of the histogram within its family.
+
+        Returns:
+            Histogram: The histogram.
+        """
+        return self._metric('histogram', name, help, labels, lambda: Histogram(buckets))
+
+    def _items(self):
+        with self._lock:
+            return [(name, kind, help, list(metrics.items()))
+                    for name, (kind, help, metrics) in self._families.items()]
+
+    def render(self) -> str:
+        """
+        Render all metrics in Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, one sample per line.
+        """
+        lines = []
+        for name, kind, help, metrics in self._items():
+            if help:
+                lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in metrics:
+                lines.extend(f"{sample} {value}" for sample, value in metric._samples(name, labels))
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def snapshot(self) -> Dict[str, object]:
+        """
+        Get the current value of every metric.
+
+        Returns:
+            Dict[str, object]: Values keyed by family name plus labels, such as
+            'math_interpreter_evaluations_total{entry="evaluate_many"}'.
+            Counters and gauges map to numbers, histograms to dictionaries
+            with 'count', 'sum' and cumulative 'buckets'.
+        """
+        return {name + labels: metric._snapshot()
+                for name, _, _, metrics in self._items() for labels, metric in metrics}
+
+
+_active: Optional[MetricsRegistry] = None
+
+
+def enable(registry: Optional[MetricsRegistry] = None) -> MetricsRegistry:
+    """
+    Start recording library metrics.
+
+    Args:
+        registry: The registry to record into. A new one is created if none is given.
+
+    Returns:
+        MetricsRegistry: The active registry.
+    """
+    global _active
+    _active = registry if registry is not None else MetricsRegistry()
+    return _active
+
+
+def disable() -> None:
+    """
+    Stop recording library metrics.
+    """
+    global _active
+    _active = None
+
+
+def active() -> Optional[MetricsRegistry]:
+    """
+    Get the registry library metrics are recorded into.
+
+    Returns:
+        Optional[MetricsRegistry]: The active registry, or None if metrics are disabled.
+    """
+    return _active
+
+
+def record_error(registry: MetricsRegistry, error: Exception) -> None:
+    """
+    Count an evaluation error by its type.
+
+    An error is counted once, however many entry points it passes through.
+    """
+    if getattr(error, '_metrics_recorded', False):
+        return
+    error._metrics_recorded = True
+    registry.counter('math_interpreter_evaluation_errors_total', 'Evaluation errors by type',
+                     type=type(error).__name__).inc()
+
+
+def record_cache(registry: MetricsRegistry, cache: str, hit: bool) -> None:
+    """
+    Count a cache lookup.
+
+    Args:
+        registry: The registry to record into.
+        cache: The name of the cache.
+        hit: Whether the lookup was a hit.
+    """
+    registry.counter('math_interpreter_cache_requests_total', 'Cache lookups by result',
+                     cache=cache, result='hit' if hit else 'miss').inc()
+
+
+def instrumented(function: Callable) -> Callable:
+    """
+    Decorate an entry point to record its calls, latency, errors and tree size.
+
+    Every call and error is counted. The latency and tree size are observed
+    on the first call and then on one call in SAMPLE_INTERVAL; the tree size
+    is recorded when the first argument, or the first after self for
+    methods, is an expression. The metrics of the entry point are looked up
+    once per registry and kept by the wrapper.
+    """
+    entry = function.__qualname__
+    resolved = (None, None, None, None, None)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        nonlocal resolved
+        registry = _active
+        if registry is None:
+            return function(*args, **kwargs)
+        owner, calls, sequence, sizes, seconds = resolved
+        if owner is not registry:
+            calls = registry.counter('math_interpreter_evaluations_total', 'Calls of library entry points',
+                                     entry=entry)
+            sequence = itertools.count()
+            sizes = registry.histogram('math_interpreter_tree_nodes', 'Node counts of sampled expressions',
+                                       SIZE_BUCKETS, entry=entry)
+            seconds = registry.histogram('math_interpreter_evaluation_seconds',
+                                         'Sampled latency of library entry points', entry=entry)
+            resolved = (registry, calls, sequence, sizes, seconds)
+        calls.inc()
+        if next(sequence) % SAMPLE_INTERVAL:
+            try:
+                return function(*args, **kwargs)
+            except Exception as error:
+                record_error(registry, error)
+                raise
+        expression = args[0] if args else None
+        if not hasattr(expression, 'node_count') and len(args) > 1:
+            expression = args[1]
+        if hasattr(expression, 'node_count'):
+            sizes.observe(expression.node_count())
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except Exception as error:
+            record_error(registry, error)
+            raise
+        finally:
+            seconds.observe(time.perf_counter() - started)
+
+    return wrapper
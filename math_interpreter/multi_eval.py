@@ -0,0 +1,109 @@
+"""
+Evaluation of many expressions against one context for the Math Interpreter.
+
+Evaluating hundreds of formulas one by one looks up the same variables in
+the context hundreds of times. evaluate_many resolves every referenced
+variable once into a local table and evaluates all expressions in one pass,
+computing a node shared between several expressions only once.
+"""
+
+from typing import Dict, List, Sequence, Union
+
+from math_interpreter import metrics
+from math_interpreter.context import Context
+from math_interpreter.exceptions import InterpreterError, VariableNotDefinedError
+from math_interpreter.operators import operator_for
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+def resolve_variables(expressions: Sequence, context: Context) -> Dict[str, float]:
+    """
+    Look up every variable the expressions read, once each.
+
+    Args:
+        expressions: The expressions.
+        context: The context containing variable definitions.
+
+    Returns:
+        Dict[str, float]: The values of the variables defined in the context;
+        undefined variables are left out.
+    """
+    names = set()
+    for expression in expressions:
+        names |= expression.free_variables()
+    return {name: context.get_variable(name) for name in names if context.has_variable(name)}
+
+
+@metrics.instrumented
+def evaluate_many(expressions: Sequence, context: Context,
+                  limits=None) -> List[Union[float, InterpreterError]]:
+    """
+    Evaluate several expressions against one context.
+
+    An expression that fails does not stop the others: its error is
+    returned in its place.
+
+    Args:
+        expressions: The expressions to evaluate.
+        context: The context containing variable definitions.
+        limits: Optional EvaluationLimits every expression must meet. An
+            expression exceeding them gets an EvaluationLimitError in its place.
+
+    Returns:
+        List[Union[float, InterpreterError]]: For every expression, in input
+        order, its result or the InterpreterError its evaluation raised.
+    """
+    table = resolve_variables(expressions, context)
+    values: Dict[int, object] = {}
+    results = []
+    for expression in expressions:
+        if limits is not None:
+            try:
+                limits.check(expression)
+            except InterpreterError as error:
+                results.append(error)
+                continue
+        stack = [(expression, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in values:
+                continue
+            operator = operator_for(node)
+            if operator is None:
+                values[id(node)] = _terminal_value(node, table, context)
+            elif not expanded:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            else:
+                left = values[id(node.left)]
+                right = values[id(node.right)]
+                if isinstance(left, InterpreterError):
+                    values[id(node)] = left
+                elif isinstance(right, InterpreterError):
+                    values[id(node)] = right
+                else:
+                    try:
+                        values[id(node)] = operator.scalar(left, right)
+                    except InterpreterError as error:
+                        values[id(node)] = error
+        results.append(values[id(expression)])
+    registry = metrics.active()
+    if registry is not None:
+        for result in results:
+            if isinstance(result, InterpreterError):
+                metrics.record_error(registry, result)
+    return results
+
+
+def _terminal_value(node, table: Dict[str, float], context: Context):
+    if isinstance(node, Constant):
+        return node.value
+    if isinstance(node, Variable):
+        if node.name in table:
+            return table[node.name]
+        return VariableNotDefinedError(f"Variable '{node.name}' is not defined")
+    try:
+        return node.interpret(context)
+    except InterpreterError as error:
+        return error
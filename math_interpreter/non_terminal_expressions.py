@@ -2,80 +2,142 @@
 Non-terminal expressions for the Math Interpreter.
 """
 
+from math_interpreter.exceptions import InvalidExpressionError
 from math_interpreter.expression import Expression
+from math_interpreter.operators import ADDITION, DIVISION, MULTIPLICATION, POWER, SUBTRACTION
 
 
-class Addition(Expression):
+class BinaryOperation(Expression):
     """
-    A non-terminal expression representing addition operation.
+    A non-terminal expression applying a registered binary operator.
+
+    Subclasses only set the operator class attribute; evaluation and
+    rendering are looked up in the operator registry.
     """
-    
+
+    operator = None
+
     def __init__(self, left, right):
         """
-        Initialize an addition expression with left and right operands.
-        
+        Initialize a binary expression with left and right operands.
+
         Args:
             left: The left operand (Expression).
             right: The right operand (Expression).
         """
         self.left = left
         self.right = right
-    
-    def interpret(self, context):
-        """
-        Interpret the addition expression.
-        
-        Args:
-            context: The context containing variable definitions.
-            
-        Returns:
-            float: The sum of the left and right operands.
-        """
-        return self.left.interpret(context) + self.right.interpret(context)
-    
-    def __str__(self):
+
+    def children(self):
         """
-        String representation of the addition expression.
-        
+        The operands of the binary expression.
+
         Returns:
-            str: A string representation of the addition operation.
+            tuple: The left and right operands.
         """
-        return f"({self.left} + {self.right})"
-
+        return (self.left, self.right)
 
-class Multiplication(Expression):
-    """
-    A non-terminal expression representing multiplication operation.
-    """
-    
-    def __init__(self, left, right):
+    def with_children(self, children):
         """
-        Initialize a multiplication expression with left and right operands.
-        
+        Create a copy of the operation with other operands.
+
         Args:
-            left: The left operand (Expression).
-            right: The right operand (Expression).
+            children: The new left and right operands.
+
+        Returns:
+            BinaryOperation: A new node of the same class, or this node if
+            both operands are unchanged.
+
+        Raises:
+            InvalidExpressionError: If not exactly two operands are given.
         """
-        self.left = left
-        self.right = right
-    
+        if len(children) != 2:
+            raise InvalidExpressionError(f"{type(self).__name__} takes 2 operands, got {len(children)}")
+        left, right = children
+        if left is self.left and right is self.right:
+            return self
+        return type(self)(left, right)
+
     def interpret(self, context):
         """
-        Interpret the multiplication expression.
-        
+        Interpret the binary expression.
+
         Args:
             context: The context containing variable definitions.
-            
+
         Returns:
-            float: The product of the left and right operands.
+            float: The operator applied to the left and right operands.
         """
-        return self.left.interpret(context) * self.right.interpret(context)
-    
+        return self.operator.scalar(self.left.interpret(context), self.right.interpret(context))
+
     def __str__(self):
         """
-        String representation of the multiplication expression.
-        
+        String representation of the binary expression.
+
         Returns:
-            str: A string representation of the multiplication operation.
+            str: A string representation of the operation.
         """
-        return f"({self.left} * {self.right})"
\ No newline at end of file
+        return self.operator.render(str(self.left), str(self.right))
+
+
+class Addition(BinaryOperation):
+    """
+    A non-terminal expression representing addition operation.
+    """
+
+    operator = ADDITION
+
+
+class Multiplication(BinaryOperation):
+    """
+    A non-terminal expression representing multiplication operation.
+    """
+
+    operator = MULTIPLICATION
+
+
+class Subtraction(BinaryOperation):
+    """
+    A non-terminal expression representing subtraction operation.
+    """
+
+    operator = SUBTRACTION
+
+
+class Division(BinaryOperation):
+    """
+    A non-terminal expression representing division operation.
+
+    Dividing by zero raises DivisionByZeroError.
+    """
+
+    operator = DIVISION
+
+
+class Power(BinaryOperation):
+    """
+    A non-terminal expression representing exponentiation, rendered as '^'.
+    """
+
+    operator = POWER
+
+
+def operation_class(operator):
+    """
+    Get the BinaryOperation subclass that applies an operator.
+
+    Args:
+        operator: A registered Operator.
+
+    Returns:
+        type: The least derived subclass whose operator it is.
+
+    Raises:
+        InvalidExpressionError: If no expression class uses the operator.
+    """
+    pending = [BinaryOperation]
+    for cls in pending:
+        if cls.operator is operator:
+            return cls
+        pending.extend(cls.__subclasses__())
+    raise InvalidExpressionError(f"No expression class for operator '{operator.name}'")
@@ -0,0 +1,309 @@
+"""
+Operator registry for the Math Interpreter.
+
+Every binary operator declares its scalar function, the name of its NumPy
+array kernel, its identity and absorbing elements and its rendering in one
+Operator record. Expression classes and evaluation backends look operators
+up here instead of hard-coding them, so a newly registered operator works
+everywhere at once.
+"""
+
+import math
+import operator as _builtin_operator
+from typing import Callable, Dict, Optional, Tuple
+
+from math_interpreter.exceptions import DivisionByZeroError, InvalidExpressionError
+
+
+Bounds = Tuple[float, float]
+
+
+class Operator:
+    """
+    A binary operator and everything the evaluation backends need to know about it.
+    """
+
+    def __init__(self, name: str, symbol: str, scalar: Callable[[float, float], float],
+                 kernel: Optional[str] = None, identity: Optional[float] = None,
+                 absorbing: Optional[float] = None, commutative: bool = False,
+                 associative: bool = False, precedence: int = 1,
+                 right_associative: bool = False, interval: Optional[Callable] = None):
+        """
+        Initialize an operator.
+
+        Args:
+            name: The unique registry name of the operator.
+            symbol: The symbol used to render and parse the operator.
+            scalar: The function applied to two floats. It must be a picklable
+                module-level function so programs can be shipped to workers.
+            kernel: The name of the NumPy ufunc applied to arrays, if any.
+            identity: The value e with x op e == x, if any. For commutative
+                operators e op x == x holds as well.
+            absorbing: The value z with x op z == z and z op x == z for every
+                finite x, if any.
+            commutative: Whether x op y == y op x.
+            associative: Whether (x op y) op z == x op (y op z), up to rounding.
+            precedence: The binding strength used when parsing; higher binds tighter.
+            right_associative: Whether a op b op c parses as a op (b op c).
+            interval: A function of the (low, high) bounds of both operands
+                giving bounds of the result, if bounds can be derived.
+        """
+        self.name = name
+        self.symbol = symbol
+        self.scalar = scalar
+        self.kernel = kernel
+        self.identity = identity
+        self.absorbing = absorbing
+        self.commutative = commutative
+        self.associative = associative
+        self.precedence = precedence
+        self.right_associative = right_associative
+        self.interval = interval
+
+    def __repr__(self) -> str:
+        return f"Operator({self.name!r})"
+
+    def __reduce__(self):
+        # Operators are pickled by name and resolved against the registry.
+        return (get_operator, (self.name,))
+
+    def render(self, left: str, right: str) -> str:
+        """
+        Render the operator applied to two rendered operands.
+
+        Args:
+            left: The rendering of the left operand.
+            right: The rendering of the right operand.
+
+        Returns:
+            str: The rendering of the operation.
+        """
+        return f"({left} {self.symbol} {right})"
+
+    def array_kernel(self):
+        """
+        Get the NumPy ufunc of the operator.
+
+        Returns:
+            The ufunc, or None if the operator has no kernel or NumPy is not installed.
+        """
+        if self.kernel is None:
+            return None
+        try:
+            import numpy
+        except ImportError:
+            return None
+        return getattr(numpy, self.kernel)
+
+    def apply(self, a, b):
+        """
+        Apply the operator to scalars, lists or NumPy arrays, broadcasting scalars.
+
+        NumPy arrays are combined with the array kernel, which follows IEEE
+        semantics (for example, division by zero gives inf). Lists are
+        combined element by element with the scalar function.
+
+        Args:
+            a: The left operand.
+            b: The right operand.
+
+        Returns:
+            The result, of the same kind as the non-scalar operand.
+        """
+        a_scalar = isinstance(a, (int, float))
+        b_scalar = isinstance(b, (int, float))
+        scalar = self.scalar
+        if a_scalar and b_scalar:
+            return scalar(a, b)
+        if not isinstance(a, list) and not isinstance(b, list):
+            kernel = self.array_kernel()
+            if kernel is not None:
+                return kernel(a, b)
+        if a_scalar:
+            return [scalar(a, y) for y in b]
+        if b_scalar:
+            return [scalar(x, b) for x in a]
+        return [scalar(x, y) for x, y in zip(a, b)]
+
+
+def divide(a: float, b: float) -> float:
+    """
+    Divide two floats.
+
+    Raises:
+        DivisionByZeroError: If the divisor is zero.
+    """
+    if b == 0:
+        raise DivisionByZeroError(f"Division of {a} by zero")
+    return a / b
+
+
+def power(a: float, b: float) -> float:
+    """
+    Raise a float to a float power.
+
+    Negative bases with fractional exponents give NaN, as the array kernel does.
+
+    Raises:
+        DivisionByZeroError: If zero is raised to a negative power.
+    """
+    if a == 0 and b < 0:
+        raise DivisionByZeroError(f"Zero raised to the negative power {b}")
+    try:
+        return math.pow(a, b)
+    except ValueError:
+        return math.nan
+    except OverflowError:
+        return math.inf if a > 0 or b % 2 == 0 else -math.inf
+
+
+def _product(a: float, b: float) -> float:
+    # In interval arithmetic a zero bound times an infinite bound is zero.
+    return 0.0 if a == 0 or b == 0 else a * b
+
+
+def _quotient(a: float, b: float) -> float:
+    # An infinite bound over an infinite bound is taken as zero; the other
+    # corners then cover every quotient of the two ranges.
+    return 0.0 if math.isinf(a) and math.isinf(b) else a / b
+
+
+def interval_add(a: Bounds, b: Bounds) -> Bounds:
+    """
+    Bounds of the sum of two bounded values.
+    """
+    return (a[0] + b[0], a[1] + b[1])
+
+
+def interval_subtract(a: Bounds, b: Bounds) -> Bounds:
+    """
+    Bounds of the difference of two bounded values.
+    """
+    return (a[0] - b[1], a[1] - b[0])
+
+
+def interval_multiply(a: Bounds, b: Bounds) -> Bounds:
+    """
+    Bounds of the product of two bounded values.
+    """
+    products = (_product(a[0], b[0]), _product(a[0], b[1]), _product(a[1], b[0]), _product(a[1], b[1]))
+    return (min(products), max(products))
+
+
+def interval_divide(a: Bounds, b: Bounds) -> Bounds:
+    """
+    Bounds of the quotient of two bounded values; unbounded if the divisor may be zero.
+    """
+    if b[0] <= 0 <= b[1]:
+        return (-math.inf, math.inf)
+    # Quotients of the corners directly, as the reciprocals of a tiny divisor overflow.
+    quotients = (_quotient(a[0], b[0]), _quotient(a[0], b[1]), _quotient(a[1], b[0]), _quotient(a[1], b[1]))
+    return (min(quotients), max(quotients))
+
+
+def interval_power(a: Bounds, b: Bounds) -> Bounds:
+    """
+    Bounds of a bounded value raised to a bounded power.
+
+    Bounds are derived for positive bases and for constant integer
+    exponents; otherwise the result is unbounded.
+    """
+    if b[0] == b[1] and math.isfinite(b[0]) and b[0] == int(b[0]):
+        exponent = int(b[0])
+        if exponent < 0 and a[0] <= 0 <= a[1]:
+            return (-math.inf, math.inf)
+        ends = (power(a[0], exponent), power(a[1], exponent))
+        if exponent % 2 == 0 and a[0] <= 0 <= a[1]:
+            return (0.0 if exponent else 1.0, max(ends))
+        return (min(ends), max(ends))
+    if a[0] > 0:
+        # x ** y is monotonic in each argument for x > 0, so the extremes are at corners.
+        corners = (power(a[0], b[0]), power(a[0], b[1]), power(a[1], b[0]), power(a[1], b[1]))
+        return (min(corners), max(corners))
+    return (-math.inf, math.inf)
+
+
+_REGISTRY: Dict[str, Operator] = {}
+
+
+def register_operator(operator: Operator) -> Operator:
+    """
+    Add an operator to the registry.
+
+    Args:
+        operator: The operator to register.
+
+    Returns:
+        Operator: The registered operator.
+
+    Raises:
+        InvalidExpressionError: If another operator with the same name or
+            symbol is already registered.
+    """
+    for existing in _REGISTRY.values():
+        if existing is operator:
+            return operator
+        if existing.name == operator.name or existing.symbol == operator.symbol:
+            raise InvalidExpressionError(f"Operator '{operator.name}' conflicts with '{existing.name}'")
+    _REGISTRY[operator.name] = operator
+    return operator
+
+
+def get_operator(name: str) -> Operator:
+    """
+    Get a registered operator by name.
+
+    Args:
+        name: The operator name.
+
+    Returns:
+        Operator: The operator.
+
+    Raises:
+        InvalidExpressionError: If no operator has that name.
+    """
+    if name not in _REGISTRY:
+        raise InvalidExpressionError(f"Unknown operator '{name}'")
+    return _REGISTRY[name]
+
+
+def operators() -> Dict[str, Operator]:
+    """
+    Get all registered operators.
+
+    Returns:
+        Dict[str, Operator]: The operators by name, in registration order.
+    """
+    return dict(_REGISTRY)
+
+
+def operator_for(node) -> Optional[Operator]:
+    """
+    Get the operator of an expression node.
+
+    Args:
+        node: The expression node.
+
+    Returns:
+        Optional[Operator]: The node's operator, or None for terminal nodes.
+    """
+    return getattr(node, 'operator', None)
+
+
+ADDITION = register_operator(Operator(
+    'add', '+', _builtin_operator.add, kernel='add',
+    identity=0.0, commutative=True, associative=True, precedence=1,
+    interval=interval_add))
+MULTIPLICATION = register_operator(Operator(
+    'mul', '*', _builtin_operator.mul, kernel='multiply',
+    identity=1.0, absorbing=0.0, commutative=True, associative=True, precedence=2,
+    interval=interval_multiply))
+SUBTRACTION = register_operator(Operator(
+    'sub', '-', _builtin_operator.sub, kernel='subtract', identity=0.0, precedence=1,
+    interval=interval_subtract))
+DIVISION = register_operator(Operator(
+    'div', '/', divide, kernel='true_divide', identity=1.0, precedence=2,
+    interval=interval_divide))
+POWER = register_operator(Operator(
+    'pow', '^', power, kernel='power', identity=1.0, precedence=3, right_associative=True,
+    interval=interval_power))
@@ -0,0 +1,218 @@
+"""
+Parallel evaluation of a single large expression tree for the Math Interpreter.
+
+The top of the tree is cut into a few independent subtrees of similar size
+per worker, guided by the node counts cached on the nodes. The subtrees are
+evaluated in a process pool and the partial results are combined through
+the remaining upper nodes. Workers created for the call inherit the
+subtrees when processes are forked; an executor passed in receives each
+subtree in its flat pickle encoding. Small trees, and trees such as long chains whose
+top cannot be cut evenly, are evaluated serially; rebalance a chain to
+evaluate it in parallel.
+"""
+
+import heapq
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Mapping, Optional
+
+from math_interpreter.compiler import compile_expression
+from math_interpreter.context import Context
+from math_interpreter.metrics import instrumented
+from math_interpreter.operators import operator_for
+from math_interpreter.terminal_expressions import Constant
+
+
+DEFAULT_SERIAL_THRESHOLD = 100000
+DEFAULT_TASKS_PER_WORKER = 4
+# The most subtrees partition cuts per piece asked for, which bounds the
+# expansions spent on trees that cannot be cut evenly.
+_MAX_SUBTREES_PER_PIECE = 4
+
+
+def partition(expression, pieces: int) -> List:
+    """
+    Cut the top of an expression into about pieces independent subtrees of similar size.
+
+    The largest subtree is expanded first, until every subtree holds at
+    most an even share of the nodes or _MAX_SUBTREES_PER_PIECE subtrees per
+    piece are cut. Sizes are the node counts cached on the nodes, see
+    Expression.node_count, so only the first call on a tree walks all of it.
+
+    Args:
+        expression: The expression to split.
+        pieces: The number of subtrees wanted.
+
+    Returns:
+        List: The distinct subtrees below the cut, largest first. Long
+        chains leave one subtree holding most of the nodes.
+    """
+    target = -(-expression.node_count() // pieces)
+    limit = pieces * _MAX_SUBTREES_PER_PIECE
+    # Pending subtrees as (-size, order, node); order keeps ties stable.
+    pending = [(-expression.node_count(), 0, expression)]
+    seen = {id(expression)}
+    while pending and -pending[0][0] > target and len(pending) < limit:
+        _, _, node = heapq.heappop(pending)
+        for child in node.children():
+            if id(child) not in seen:
+                seen.add(id(child))
+                heapq.heappush(pending, (-child.node_count(), len(seen), child))
+    return [node for _, _, node in sorted(pending)]
+
+
+def _count_nodes(expression, limit: int) -> int:
+    """
+    Count the nodes of an expression, per use, stopping once limit is reached.
+    """
+    count = 0
+    stack = [expression]
+    while stack and count < limit:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children())
+    return count
+
+
+def _evaluate(expression, context: Context) -> float:
+    """
+    Interpret an expression, falling back to its compiled program for trees
+    too deep to interpret recursively.
+    """
+    try:
+        return expression.interpret(context)
+    except RecursionError:
+        return compile_expression(expression).run(context)
+
+
+def _evaluate_subtree(expression, variables: Mapping[str, float]) -> float:
+    """
+    Evaluate a subtree in a worker against the variable values of the call.
+    """
+    context = Context()
+    for name, value in variables.items():
+        context.set_variable(name, value)
+    return _evaluate(expression, context)
+
+
+_installed_tasks: List = []
+
+
+def _install_tasks(tasks: List) -> None:
+    """
+    Keep the subtrees of a call in a worker created for it.
+    """
+    global _installed_tasks
+    _installed_tasks = tasks
+
+
+def _evaluate_installed(index: int, variables: Mapping[str, float]) -> float:
+    """
+    Evaluate a subtree installed in this worker.
+    """
+    return _evaluate_subtree(_installed_tasks[index], variables)
+
+
+def _worker_pool(max_workers: int, tasks: List) -> ProcessPoolExecutor:
+    """
+    Create a process pool whose workers hold the subtrees of a call.
+
+    Forked workers inherit the subtrees without any encoding; under other
+    start methods they are pickled once per worker.
+    """
+    context = None
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                               initializer=_install_tasks, initargs=(tasks,))
+
+
+@instrumented
+def evaluate_parallel(expression, context, max_workers: Optional[int] = None,
+                      serial_threshold: int = DEFAULT_SERIAL_THRESHOLD,
+                      executor: Optional[Executor] = None,
+                      tasks_per_worker: int = DEFAULT_TASKS_PER_WORKER, limits=None) -> float:
+    """
+    Evaluate one large expression using several processes.
+
+    Args:
+        expression: The expression to evaluate.
+        context: The context containing variable definitions.
+        max_workers: The number of workers. Defaults to the max_workers of
+            the executor, or the number of CPUs.
+        serial_threshold: Trees with fewer nodes than this are interpreted
+            serially. Only up to this many nodes are counted.
+        executor: An executor to submit subtrees to. A process pool is
+            created and shut down for this call if none is given.
+        tasks_per_worker: The number of subtrees cut per worker, so uneven
+            subtrees still keep every worker busy.
+        limits: Optional EvaluationLimits the expression must meet.
+
+    Returns:
+        float: The result of the expression.
+
+    Raises:
+        VariableNotDefinedError: If a variable is not defined in the context.
+        EvaluationLimitError: If the expression exceeds the limits.
+    """
+    if limits is not None:
+        limits.check(expression)
+    if _count_nodes(expression, serial_threshold) < serial_threshold:
+        return _evaluate(expression, context)
+    if max_workers is None:
+        max_workers = getattr(executor, '_max_workers', None) or os.cpu_count() or 1
+    tasks = partition(expression, max(2, max_workers * tasks_per_worker))
+    if tasks[0].node_count() * 2 > expression.node_count():
+        # The top cannot be cut evenly, as in a long chain, so workers would
+        # mostly wait for one subtree.
+        return _evaluate(expression, context)
+
+    # Leaves hanging off the upper nodes are not worth shipping, and
+    # evaluating them first reports undefined variables early.
+    results: Dict[int, float] = {}
+    shipped = []
+    for index, task in enumerate(tasks):
+        if not task.children():
+            results[id(task)] = _evaluate(task, context)
+        else:
+            shipped.append(index)
+    variables = context.variables()
+
+    owned = executor is None
+    try:
+        if owned:
+            executor = _worker_pool(max_workers, tasks)
+            futures = [(index, executor.submit(_evaluate_installed, index, variables))
+                       for index in shipped]
+        else:
+            futures = [(index, executor.submit(_evaluate_subtree, tasks[index], variables))
+                       for index in shipped]
+        for index, future in futures:
+            results[id(tasks[index])] = future.result()
+    finally:
+        if owned and executor is not None:
+            executor.shutdown()
+
+    # Combine the partial results through the upper nodes, in post-order.
+    # Nodes without an operator, such as fused nodes, are interpreted over
+    # constants holding the results of their operands.
+    stack = [expression]
+    while stack:
+        node = stack[-1]
+        if id(node) in results:
+            stack.pop()
+            continue
+        children = node.children()
+        pending = [child for child in reversed(children) if id(child) not in results]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        operator = operator_for(node)
+        if operator is not None:
+            results[id(node)] = operator.scalar(results[id(node.left)], results[id(node.right)])
+        else:
+            operands = tuple(Constant(results[id(child)]) for child in children)
+            results[id(node)] = node.with_children(operands).interpret(context)
+    return results[id(expression)]
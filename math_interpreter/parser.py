@@ -0,0 +1,125 @@
+"""
+Parser for the Math Interpreter.
+
+Converts formula text such as "2 * (x + y) ^ 2" into an expression tree.
+Operators and their precedence come from the operator registry, and the
+parser uses an explicit operator stack (the shunting-yard algorithm), so
+deeply nested formulas do not hit the recursion limit. Parsing the string
+representation of an expression gives back an equivalent tree.
+"""
+
+import re
+from typing import Dict, List
+
+from math_interpreter.exceptions import InvalidExpressionError
+from math_interpreter.non_terminal_expressions import Multiplication, operation_class
+from math_interpreter.operators import operators
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)"
+    r"|(?P<name>[A-Za-z_][A-Za-z_0-9]*)"
+    r"|(?P<symbol>\S))"
+)
+
+_OPEN = '('
+_NEGATE = 'neg'
+
+
+def parse(text: str):
+    """
+    Parse formula text into an expression tree.
+
+    A minus sign directly before a number is part of the number, so "-2 ^ 2"
+    is (-2) ^ 2, matching how negative constants are rendered. Before any
+    other operand it negates the operand.
+
+    Args:
+        text: The formula text.
+
+    Returns:
+        Expression: The parsed expression. Repeated variable names share
+        one Variable node.
+
+    Raises:
+        InvalidExpressionError: If the text is not a well-formed formula.
+    """
+    by_symbol = {operator.symbol: operator for operator in operators().values()}
+    negate_precedence = max((operator.precedence for operator in by_symbol.values()), default=0)
+    variables: Dict[str, Variable] = {}
+    output: List = []
+    pending: List = []
+
+    def reduce():
+        top = pending.pop()
+        if top == _NEGATE:
+            output.append(Multiplication(Constant(-1), output.pop()))
+            return
+        right = output.pop()
+        left = output.pop()
+        output.append(operation_class(top)(left, right))
+
+    position = 0
+    expect_operand = True
+    length = len(text)
+    while position < length:
+        match = _TOKEN.match(text, position)
+        if match is None:
+            break
+        kind = match.lastgroup
+        token = match.group(kind)
+        start = match.start(kind)
+        position = match.end()
+
+        if expect_operand:
+            if kind == 'number':
+                output.append(Constant(float(token)))
+                expect_operand = False
+            elif kind == 'name' and token not in by_symbol:
+                if token not in variables:
+                    variables[token] = Variable(token)
+                output.append(variables[token])
+                expect_operand = False
+            elif token == _OPEN:
+                pending.append(_OPEN)
+            elif token == '-':
+                number = _TOKEN.match(text, position)
+                if number is not None and number.lastgroup == 'number' and number.start('number') == position:
+                    output.append(Constant(-float(number.group('number'))))
+                    position = number.end()
+                    expect_operand = False
+                else:
+                    pending.append(_NEGATE)
+            else:
+                raise InvalidExpressionError(f"Expected an operand at position {start}, found '{token}'")
+            continue
+
+        if token == ')':
+            while pending and pending[-1] != _OPEN:
+                reduce()
+            if not pending:
+                raise InvalidExpressionError(f"Unbalanced ')' at position {start}")
+            pending.pop()
+            continue
+        operator = by_symbol.get(token)
+        if operator is None:
+            raise InvalidExpressionError(f"Expected an operator at position {start}, found '{token}'")
+        while pending and pending[-1] != _OPEN:
+            top = pending[-1]
+            top_precedence = negate_precedence if top == _NEGATE else top.precedence
+            if top_precedence > operator.precedence or (
+                    top_precedence == operator.precedence and not operator.right_associative):
+                reduce()
+            else:
+                break
+        pending.append(operator)
+        expect_operand = True
+
+    if expect_operand:
+        raise InvalidExpressionError("Unexpected end of formula")
+    while pending:
+        if pending[-1] == _OPEN:
+            raise InvalidExpressionError("Unbalanced '('")
+        reduce()
+    return output[0]
@@ -0,0 +1,126 @@
+"""
+Persistent structural updates for the Math Interpreter.
+
+Expression trees are never changed in place. replace returns a new tree in
+which only the nodes on the paths from the root to the replaced subtrees
+are new; every other node is shared with the original tree, together with
+the metadata cached on it, such as free variables and structural hashes.
+An edit at a single path therefore costs one new node per level.
+
+A path is a sequence of child indices from the root, as returned by
+children(): for a binary operation 0 is the left and 1 the right operand.
+"""
+
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+from math_interpreter.exceptions import InvalidExpressionError
+
+
+def node_at(expression, path: Sequence[int]):
+    """
+    Get the subtree at a path.
+
+    Args:
+        expression: The root expression.
+        path: The child indices leading from the root to the subtree.
+
+    Returns:
+        Expression: The subtree.
+
+    Raises:
+        InvalidExpressionError: If the path does not exist in the tree.
+    """
+    node = expression
+    for depth, index in enumerate(path):
+        children = node.children()
+        if not 0 <= index < len(children):
+            raise InvalidExpressionError(f"Path {tuple(path)} does not exist at step {depth}")
+        node = children[index]
+    return node
+
+
+def find_paths(expression, predicate: Callable) -> List[Tuple[int, ...]]:
+    """
+    Find the paths of the outermost subtrees matching a predicate.
+
+    Subtrees inside a match are not searched. A subtree shared by several
+    parents is reported once per path leading to it.
+
+    Args:
+        expression: The root expression.
+        predicate: A function of a node returning whether it matches.
+
+    Returns:
+        List[Tuple[int, ...]]: The paths in left-to-right order.
+    """
+    paths = []
+    stack = [(expression, ())]
+    while stack:
+        node, path = stack.pop()
+        if predicate(node):
+            paths.append(path)
+            continue
+        children = node.children()
+        for index in range(len(children) - 1, -1, -1):
+            stack.append((children[index], path + (index,)))
+    return paths
+
+
+def replace(expression, path_or_predicate: Union[Sequence[int], Callable], new_subtree):
+    """
+    Replace subtrees of an expression, sharing every untouched node.
+
+    Args:
+        expression: The root expression; it is not changed.
+        path_or_predicate: The path of the subtree to replace, or a function
+            of a node selecting every outermost subtree to replace.
+        new_subtree: The replacement expression, or a function of the
+            replaced subtree returning its replacement.
+
+    Returns:
+        Expression: The updated tree, or the original tree if nothing matched.
+
+    Raises:
+        InvalidExpressionError: If the path does not exist in the tree.
+    """
+    make = new_subtree if callable(new_subtree) else (lambda node: new_subtree)
+    if callable(path_or_predicate):
+        return _replace_matching(expression, path_or_predicate, make)
+
+    path = tuple(path_or_predicate)
+    ancestors = []
+    node = expression
+    for depth, index in enumerate(path):
+        children = node.children()
+        if not 0 <= index < len(children):
+            raise InvalidExpressionError(f"Path {path} does not exist at step {depth}")
+        ancestors.append((node, children, index))
+        node = children[index]
+    result = make(node)
+    for parent, children, index in reversed(ancestors):
+        result = parent.with_children(children[:index] + (result,) + children[index + 1:])
+    return result
+
+
+def _replace_matching(expression, predicate: Callable, make: Callable):
+    # Post-order without recursion, memoized by node so a shared subtree is
+    # rebuilt once and stays shared in the result.
+    results: Dict[int, object] = {}
+    stack = [(expression, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in results:
+            continue
+        if not expanded:
+            if predicate(node):
+                results[id(node)] = make(node)
+                continue
+            children = node.children()
+            if children:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(children))
+                continue
+            results[id(node)] = node
+            continue
+        results[id(node)] = node.with_children(tuple(results[id(child)] for child in node.children()))
+    return results[id(expression)]
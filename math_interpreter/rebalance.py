@@ -0,0 +1,185 @@
+"""
+Tree rebalancing by reassociation for the Math Interpreter.
+
+Addition and multiplication are associative, so a chain such as
+(((a + b) + c) + d) can be regrouped as ((a + b) + (c + d)) without changing
+the order of its operands. Balanced trees have logarithmic depth, which
+bounds recursion and stack usage during interpretation.
+
+Regrouping floating-point operations can change results in the last bits,
+because floating-point addition and multiplication are only approximately
+associative.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+from math_interpreter.non_terminal_expressions import Addition, Multiplication
+from math_interpreter.operators import operator_for
+from math_interpreter.terminal_expressions import Constant
+
+
+def combine_pairwise(operands: Sequence, combine):
+    """
+    Combine operands pairwise, level by level, into one balanced tree.
+
+    Args:
+        operands: The operands, in order; there must be at least one.
+        combine: A function of two operands building their combination.
+
+    Returns:
+        The root of a tree of depth about log2(len(operands)) + 1 whose
+        operands keep their order.
+    """
+    level = list(operands)
+    while len(level) > 1:
+        paired = [combine(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0]
+
+
+def balanced_sum(operands: Sequence):
+    """
+    Build a balanced Addition tree from a list of operands.
+
+    Args:
+        operands: The expressions to add, in order.
+
+    Returns:
+        Expression: A tree of depth about log2(len(operands)) + 1, or
+        Constant(0) if there are no operands.
+    """
+    if not operands:
+        return Constant(0)
+    return combine_pairwise(operands, Addition)
+
+
+def balanced_product(operands: Sequence):
+    """
+    Build a balanced Multiplication tree from a list of operands.
+
+    Args:
+        operands: The expressions to multiply, in order.
+
+    Returns:
+        Expression: A tree of depth about log2(len(operands)) + 1, or
+        Constant(1) if there are no operands.
+    """
+    if not operands:
+        return Constant(1)
+    return combine_pairwise(operands, Multiplication)
+
+
+def _reference_counts(expression) -> Dict[int, int]:
+    """
+    Count the parents of every distinct node, without recursion.
+    """
+    counts: Dict[int, int] = {id(expression): 0}
+    stack = [expression]
+    while stack:
+        node = stack.pop()
+        for child in node.children():
+            if id(child) in counts:
+                counts[id(child)] += 1
+            else:
+                counts[id(child)] = 1
+                stack.append(child)
+    return counts
+
+
+def _chain_operands(node, references: Dict[int, int]) -> Tuple[List, Dict[Tuple[int, int], object]]:
+    """
+    Collect the operands of the chain of same-type nodes rooted at node, in order.
+
+    Nodes with more than one parent end the chain, so shared subtrees are
+    collected once as operands instead of once per use. The nodes of the
+    chain itself are returned keyed by the ids of their two operands.
+    """
+    operation = type(node)
+    operands = []
+    links = {}
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if type(current) is operation and (current is node or references[id(current)] <= 1):
+            links[(id(current.left), id(current.right))] = current
+            stack.append(current.right)
+            stack.append(current.left)
+        else:
+            operands.append(current)
+    return operands, links
+
+
+def _existing_shape(operands: List, links: Dict[Tuple[int, int], object]):
+    """
+    Find the chain node combine_pairwise would rebuild from unchanged
+    operands, or None if the chain is grouped differently.
+    """
+    return combine_pairwise(operands, lambda left, right: links.get((id(left), id(right))))
+
+
+def rebalance(expression):
+    """
+    Reassociate chains of associative operators, such as Addition and
+    Multiplication, into balanced trees.
+
+    Operand order is preserved, so the rendering of the result lists the
+    same operands in the same order, only grouped differently. Chains that
+    are already grouped as a balanced rebuild would group them are returned
+    unchanged, with their cached metadata, and remain shared. A subtree
+    shared by several parents is rebalanced once, as its own chain, and
+    stays shared. The operands of every other node, such as a subtraction
+    or a fused node, are rebalanced in place.
+
+    Args:
+        expression: The expression to rebalance.
+
+    Returns:
+        Expression: An equivalent expression of minimal depth per chain.
+    """
+    references = _reference_counts(expression)
+    results: Dict[int, object] = {}
+    stack = [(expression, None)]
+    while stack:
+        node, operands = stack.pop()
+        if id(node) in results:
+            continue
+        operator = operator_for(node)
+        if operator is None or not operator.associative:
+            children = node.children()
+            if operands is None and children:
+                stack.append((node, children))
+                stack.extend((child, None) for child in reversed(children) if id(child) not in results)
+            else:
+                results[id(node)] = node.with_children(tuple(results[id(child)] for child in children))
+            continue
+        if operands is None:
+            chain = _chain_operands(node, references)
+            stack.append((node, chain))
+            stack.extend((operand, None) for operand in reversed(chain[0])
+                         if id(operand) not in results)
+            continue
+        operands, links = operands
+        rebuilt = [results[id(operand)] for operand in operands]
+        if all(new is old for new, old in zip(rebuilt, operands)) and _existing_shape(operands, links) is node:
+            results[id(node)] = node
+        else:
+            results[id(node)] = combine_pairwise(rebuilt, type(node))
+    return results[id(expression)]
+
+
+def tree_depth(expression) -> int:
+    """
+    Compute the depth of an expression tree, where a leaf has depth 1.
+
+    The depth is the peak number of nested interpret calls needed to
+    evaluate the tree. It is cached on every node, see Expression.depth.
+
+    Args:
+        expression: The expression to measure.
+
+    Returns:
+        int: The depth of the tree.
+    """
+    return expression.depth()
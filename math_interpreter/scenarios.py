@@ -0,0 +1,97 @@
+"""
+Scenario fan-out evaluation for the Math Interpreter.
+
+A what-if analysis evaluates one expression under many scenarios, each
+overriding a few variables of a base context. Instead of one full
+evaluation per scenario, evaluate_scenarios evaluates every subtree that
+does not read an overridden variable once, and evaluates only the subtrees
+on the paths to overridden variables for all scenarios together, as lists
+with one value per scenario.
+"""
+
+from typing import Dict, List, Mapping, Sequence
+
+from math_interpreter.context import Context
+from math_interpreter.metrics import instrumented
+from math_interpreter.operators import operator_for
+from math_interpreter.terminal_expressions import Variable
+
+
+def scenario_contexts(base_context: Context, overrides: Sequence[Mapping[str, float]]) -> List[Context]:
+    """
+    Build one snapshot of a base context per scenario.
+
+    Args:
+        base_context: The context shared by all scenarios.
+        overrides: The variables each scenario changes.
+
+    Returns:
+        List[Context]: One context per scenario; the base context is unchanged.
+    """
+    contexts = []
+    for changes in overrides:
+        context = base_context.snapshot()
+        for name, value in changes.items():
+            context.set_variable(name, value)
+        contexts.append(context)
+    return contexts
+
+
+@instrumented
+def evaluate_scenarios(expression, base_context: Context,
+                       overrides: Sequence[Mapping[str, float]], limits=None) -> List[float]:
+    """
+    Evaluate an expression under several scenarios.
+
+    Args:
+        expression: The expression to evaluate.
+        base_context: The context shared by all scenarios.
+        overrides: For every scenario, the variables it changes and their values.
+        limits: Optional EvaluationLimits the expression must meet.
+
+    Returns:
+        List[float]: One result per scenario, in the order of overrides.
+
+    Raises:
+        InterpreterError: If evaluation fails for any scenario.
+        EvaluationLimitError: If the expression exceeds the limits.
+    """
+    if limits is not None:
+        limits.check(expression)
+    count = len(overrides)
+    if not count:
+        return []
+    changed = frozenset().union(*overrides)
+    contexts = None
+    values: Dict[int, object] = {}
+    stack = [(expression, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in values:
+            continue
+        if changed.isdisjoint(node.free_variables()) and not node.is_opaque():
+            # Independent of every override: evaluate once for all scenarios.
+            values[id(node)] = node.interpret(base_context)
+            continue
+        operator = operator_for(node)
+        if operator is None:
+            if isinstance(node, Variable):
+                name = node.name
+                values[id(node)] = [changes[name] if name in changes else base_context.get_variable(name)
+                                    for changes in overrides]
+            else:
+                if contexts is None:
+                    contexts = scenario_contexts(base_context, overrides)
+                values[id(node)] = [node.interpret(context) for context in contexts]
+            continue
+        if not expanded:
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+            continue
+        values[id(node)] = operator.apply(values[id(node.left)], values[id(node.right)])
+
+    result = values[id(expression)]
+    if not isinstance(result, list):
+        return [result] * count
+    return result
@@ -0,0 +1,105 @@
+"""
+Compact flat encoding of expression trees for the Math Interpreter.
+
+Expression.__reduce_ex__ pickles a whole tree through this encoding instead
+of as a nested object graph. The distinct nodes are listed in post-order,
+each as an index into a table of node classes, its constructor payload and
+the indices of its children. Encoding and decoding use explicit loops, so
+trees of any depth can be sent to worker processes, and a subtree shared by
+several parents is encoded once and stays shared after decoding. Metadata
+cached on the nodes is not encoded. A node whose class does not describe
+its structure is embedded as itself, to be pickled from its attributes.
+"""
+
+from array import array
+from typing import Dict, List, Tuple
+
+
+def encode_tree(expression) -> Tuple:
+    """
+    Encode an expression tree as flat sequences.
+
+    Args:
+        expression: The root expression.
+
+    Returns:
+        Tuple: (classes, codes, payloads, links). classes holds one
+        (class, payload length, child count) entry per node class; codes
+        the class index of every node in post-order; payloads the
+        concatenated constructor payloads; and links the concatenated
+        child indices.
+    """
+    classes: List[Tuple] = []
+    class_index: Dict[type, int] = {}
+    codes: List[int] = []
+    payloads: List = []
+    links: List[int] = []
+    index_of: Dict[int, int] = {}
+    stack = [(expression, False)]
+    push = stack.append
+    pop = stack.pop
+    while stack:
+        node, expanded = pop()
+        key = id(node)
+        if key in index_of:
+            continue
+        children = node.children()
+        if children and not expanded:
+            push((node, True))
+            for child in reversed(children):
+                if id(child) not in index_of:
+                    push((child, False))
+            continue
+        if node._describes_structure:
+            cls = type(node)
+            payload = node._payload()
+        else:
+            cls = _embedded
+            payload = (node,)
+        code = class_index.get(cls)
+        if code is None:
+            code = class_index[cls] = len(classes)
+            classes.append((cls, len(payload), len(children)))
+        codes.append(code)
+        payloads += payload
+        for child in children:
+            links.append(index_of[id(child)])
+        index_of[key] = len(index_of)
+    return tuple(classes), array('I', codes), payloads, array('I', links)
+
+
+def _embedded(node):
+    # Decodes a node embedded whole in the encoding.
+    return node
+
+
+def decode_tree(classes: Tuple, codes, payloads: List, links):
+    """
+    Rebuild an expression tree from encode_tree output.
+
+    Every node is built as cls(*payload, *children).
+
+    Returns:
+        Expression: The root expression.
+    """
+    nodes = []
+    append = nodes.append
+    payload_position = 0
+    link_position = 0
+    for code in codes:
+        cls, payload_length, child_count = classes[code]
+        # Fast paths for binary operations and terminals.
+        if child_count == 2 and not payload_length:
+            append(cls(nodes[links[link_position]], nodes[links[link_position + 1]]))
+            link_position += 2
+        elif child_count == 0 and payload_length == 1:
+            append(cls(payloads[payload_position]))
+            payload_position += 1
+        else:
+            arguments = payloads[payload_position:payload_position + payload_length]
+            payload_position += payload_length
+            for link in links[link_position:link_position + child_count]:
+                arguments.append(nodes[link])
+            link_position += child_count
+            append(cls(*arguments))
+    return nodes[-1]
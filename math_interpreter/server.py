@@ -0,0 +1,395 @@
+"""
+Local evaluation server for the Math Interpreter.
+
+Clients register formulas once over JSON-over-HTTP and receive an id.
+Evaluation requests for the same id that arrive within a short window are
+coalesced into one micro-batch and run column-wise through the compiled
+program. Latency histograms and throughput counters are exposed in
+Prometheus text format at /metrics.
+
+Endpoints:
+    POST /formulas   {"formula": "x * 2 + y"}          -> {"id": "..."}
+    POST /evaluate   {"id": "...", "variables": {...}}  -> {"result": 1.0}
+    GET  /formulas/<id>                                 -> {"formula": "..."}
+    GET  /metrics                                       -> Prometheus text
+    GET  /health                                        -> {"status": "ok"}
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from math_interpreter import metrics
+from math_interpreter.compiler import compile_expression, structural_key
+from math_interpreter.context import Context
+from math_interpreter.exceptions import InterpreterError, InvalidExpressionError, VariableNotDefinedError
+from math_interpreter.parser import parse
+
+
+DEFAULT_BATCH_WINDOW = 0.002
+DEFAULT_MAX_BATCH = 1024
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+
+class _Pending:
+    """
+    One evaluation request waiting for its micro-batch.
+    """
+
+    __slots__ = ('variables', 'done', 'result', 'error')
+
+    def __init__(self, variables: Mapping[str, float]):
+        self.variables = variables
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class EvaluationService:
+    """
+    Formula registration and micro-batched evaluation, independent of transport.
+    """
+
+    def __init__(self, batch_window: float = DEFAULT_BATCH_WINDOW,
+                 max_batch: int = DEFAULT_MAX_BATCH, cache=None, limits=None):
+        """
+        Initialize the service and start its batching thread.
+
+        Args:
+            batch_window: How long, in seconds, to collect requests for a batch.
+            max_batch: The maximum number of requests evaluated per batch.
+            cache: An optional ExpressionCache used to compile formulas.
+            limits: Optional EvaluationLimits every registered formula must meet.
+        """
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.cache = cache
+        self.limits = limits
+        self._formulas: Dict[str, Tuple[object, object]] = {}
+        self._queues: Dict[str, List[_Pending]] = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._started = time.monotonic()
+        self.metrics = metrics.MetricsRegistry()
+        self._requests = self.metrics.counter('math_interpreter_requests_total', 'Evaluation requests answered')
+        self._batches = self.metrics.counter('math_interpreter_batches_total', 'Micro-batches run')
+        self._errors = self.metrics.counter('math_interpreter_errors_total', 'Evaluation requests that failed')
+        self.metrics.gauge('math_interpreter_formulas', lambda: len(self._formulas), 'Registered formulas')
+        self.metrics.gauge('math_interpreter_throughput_requests_per_second', self._throughput,
+                           'Requests answered per second since start')
+        self.request_latency = self.metrics.histogram('math_interpreter_request_latency_seconds',
+                                                      'Latency of evaluation requests')
+        self.batch_latency = self.metrics.histogram('math_interpreter_batch_latency_seconds',
+                                                    'Latency of micro-batches')
+        self._thread = threading.Thread(target=self._dispatch, name='math-interpreter-batcher',
+                                        daemon=True)
+        self._thread.start()
+
+    def register(self, formula: str) -> str:
+        """
+        Register a formula and get its id.
+
+        Registering the same formula twice returns the same id.
+
+        Args:
+            formula: The formula text.
+
+        Returns:
+            str: The formula id.
+
+        Raises:
+            InvalidExpressionError: If the formula cannot be parsed.
+            EvaluationLimitError: If the formula exceeds the service limits.
+        """
+        expression = parse(formula)
+        if self.limits is not None:
+            self.limits.check_structure(expression)
+        formula_id = structural_key(expression)[:16]
+        if formula_id in self._formulas:
+            return formula_id
+        # Compile outside the lock so slow formulas and cache I/O do not
+        # hold up other requests; a concurrent registration keeps the first.
+        if self.cache is not None:
+            program = self.cache.get_or_compile(expression)
+        else:
+            program = compile_expression(expression)
+        if self.limits is not None:
+            self.limits.check_program(program)
+        with self._condition:
+            self._formulas.setdefault(formula_id, (expression, program))
+        return formula_id
+
+    def formula(self, formula_id: str) -> str:
+        """
+        Get the rendering of a registered formula.
+
+        Raises:
+            InvalidExpressionError: If the id is unknown.
+        """
+        return str(self._lookup(formula_id)[0])
+
+    def _lookup(self, formula_id: str):
+        with self._condition:
+            if formula_id not in self._formulas:
+                raise InvalidExpressionError(f"Unknown formula id '{formula_id}'")
+            return self._formulas[formula_id]
+
+    def evaluate(self, formula_id: str, variables: Mapping[str, float],
+                 timeout: Optional[float] = None) -> float:
+        """
+        Evaluate a registered formula, waiting for its micro-batch to run.
+
+        Args:
+            formula_id: The formula id returned by register.
+            variables: The variable values for this evaluation.
+            timeout: The maximum time to wait, in seconds, or None to wait forever.
+
+        Returns:
+            float: The result.
+
+        Raises:
+            InterpreterError: If the formula id is unknown or evaluation fails.
+            TypeError: If a variable value is not a number.
+            TimeoutError: If the result is not ready within the timeout.
+        """
+        started = time.perf_counter()
+        self._lookup(formula_id)
+        pending = _Pending(variables)
+        with self._condition:
+            if self._closed:
+                raise InterpreterError("The evaluation service is closed")
+            self._queues.setdefault(formula_id, []).append(pending)
+            self._condition.notify()
+        if not pending.done.wait(timeout):
+            raise TimeoutError(f"Evaluation of formula '{formula_id}' timed out")
+        self.request_latency.observe(time.perf_counter() - started)
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queues and not self._closed:
+                    self._condition.wait()
+                if self._closed and not self._queues:
+                    return
+            # Let more requests for the same formulas arrive before running.
+            time.sleep(self.batch_window)
+            with self._condition:
+                queues = self._queues
+                self._queues = {}
+            for formula_id, pending in queues.items():
+                for start in range(0, len(pending), self.max_batch):
+                    batch = pending[start:start + self.max_batch]
+                    try:
+                        self._run_batch(formula_id, batch)
+                    except Exception as error:
+                        # Never let one batch stop the batcher or leave its requests waiting.
+                        for waiting in batch:
+                            if not waiting.done.is_set():
+                                waiting.error = error
+                                waiting.done.set()
+
+    def _run_batch(self, formula_id: str, batch: List[_Pending]) -> None:
+        started = time.perf_counter()
+        expression, program = self._lookup(formula_id)
+        names = expression.free_variables()
+        ready = []
+        for pending in batch:
+            # Reject rows with missing variables before any evaluation work.
+            missing = sorted(name for name in names if name not in pending.variables)
+            if missing:
+                pending.error = VariableNotDefinedError(f"Variables {missing} are not defined")
+            else:
+                ready.append(pending)
+
+        try:
+            columns = {name: [pending.variables[name] for pending in ready] for name in names}
+            results = program.run_batch(columns, len(ready))
+            for pending, result in zip(ready, results):
+                pending.result = result
+        except Exception:
+            # One row failed; evaluate row by row so only that row reports it.
+            for pending in ready:
+                context = Context()
+                for name, value in pending.variables.items():
+                    context.set_variable(name, value)
+                try:
+                    pending.result = program.run(context)
+                except Exception as error:
+                    pending.error = error
+
+        self.batch_latency.observe(time.perf_counter() - started)
+        self._batches.inc()
+        self._requests.inc(len(batch))
+        self._errors.inc(sum(1 for pending in batch if pending.error is not None))
+        registry = metrics.active()
+        if registry is not None:
+            for pending in batch:
+                if pending.error is not None:
+                    metrics.record_error(registry, pending.error)
+        for pending in batch:
+            pending.done.set()
+
+    @property
+    def requests_total(self) -> int:
+        """
+        The number of evaluation requests answered.
+        """
+        return self._requests.value
+
+    @property
+    def batches_total(self) -> int:
+        """
+        The number of micro-batches run.
+        """
+        return self._batches.value
+
+    @property
+    def errors_total(self) -> int:
+        """
+        The number of evaluation requests that failed.
+        """
+        return self._errors.value
+
+    def _throughput(self) -> float:
+        uptime = time.monotonic() - self._started
+        return self.requests_total / uptime if uptime else 0.0
+
+    def metrics_text(self) -> str:
+        """
+        Render the service metrics in Prometheus text exposition format.
+
+        The library metrics are included while recording is enabled, see
+        math_interpreter.metrics.enable.
+
+        Returns:
+            str: The metrics.
+        """
+        text = self.metrics.render()
+        registry = metrics.active()
+        if registry is not None:
+            text += registry.render()
+        return text
+
+    def close(self) -> None:
+        """
+        Stop the batching thread after it has answered every queued request.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Translates HTTP requests into EvaluationService calls.
+    """
+
+    server_version = 'MathInterpreter'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = 'application/json') -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload) -> None:
+        self._send(status, json.dumps(payload).encode('utf-8'))
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == '/metrics':
+            self._send(200, service.metrics_text().encode('utf-8'), 'text/plain; version=0.0.4')
+        elif self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path.startswith('/formulas/'):
+            try:
+                self._send_json(200, {'formula': service.formula(self.path[len('/formulas/'):])})
+            except InterpreterError as error:
+                self._send_json(404, {'error': str(error)})
+        else:
+            self._send_json(404, {'error': f"Unknown path '{self.path}'"})
+
+    def do_POST(self):
+        service = self.server.service
+        try:
+            payload = self._read_json()
+            if self.path == '/formulas':
+                self._send_json(200, {'id': service.register(str(payload['formula']))})
+            elif self.path == '/evaluate':
+                variables = dict(payload.get('variables', {}))
+                for name, value in variables.items():
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        raise ValueError(f"variable '{name}' is not a number")
+                result = service.evaluate(str(payload['id']), variables, self.server.request_timeout)
+                self._send_json(200, {'result': result})
+            else:
+                self._send_json(404, {'error': f"Unknown path '{self.path}'"})
+        except TimeoutError as error:
+            self._send_json(504, {'error': str(error)})
+        except (ValueError, KeyError, TypeError) as error:
+            self._send_json(400, {'error': f"Malformed request: {error}"})
+        except InterpreterError as error:
+            self._send_json(422, {'error': str(error), 'type': type(error).__name__})
+
+
+def make_server(host: str = '127.0.0.1', port: int = 8765,
+                service: Optional[EvaluationService] = None,
+                request_timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT) -> ThreadingHTTPServer:
+    """
+    Create an HTTP server for an evaluation service without starting it.
+
+    Args:
+        host: The interface to bind.
+        port: The port to bind, or 0 to pick a free one.
+        service: The service to expose. A new one is created if none is given.
+        request_timeout: How long, in seconds, an evaluation request may wait
+            for its result before it is answered with 504, or None to wait
+            forever.
+
+    Returns:
+        ThreadingHTTPServer: The server; call serve_forever to run it. The
+        service is available as its service attribute.
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service if service is not None else EvaluationService()
+    server.request_timeout = request_timeout
+    return server
+
+
+def serve(host: str = '127.0.0.1', port: int = 8765, batch_window: float = DEFAULT_BATCH_WINDOW,
+          max_batch: int = DEFAULT_MAX_BATCH, cache=None, limits=None) -> None:
+    """
+    Run an evaluation server until interrupted.
+
+    Args:
+        host: The interface to bind.
+        port: The port to bind.
+        batch_window: How long, in seconds, to collect requests for a batch.
+        max_batch: The maximum number of requests evaluated per batch.
+        cache: An optional ExpressionCache used to compile formulas.
+        limits: Optional EvaluationLimits every registered formula must meet.
+    """
+    service = EvaluationService(batch_window, max_batch, cache, limits)
+    server = make_server(host, port, service)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
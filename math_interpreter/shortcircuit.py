@@ -0,0 +1,179 @@
+"""
+Short-circuit evaluation for the Math Interpreter.
+
+Expression.interpret always evaluates both operands of an operation. For
+sparse formulas, where many products have a zero factor, the evaluator in
+this module evaluates the cheaper operand of an operation with an absorbing
+element (such as multiplication with zero) first. If that operand gives the
+absorbing element and the other operand cannot give inf or NaN, the other
+operand is skipped.
+"""
+
+import math
+from typing import Optional, Tuple
+
+from math_interpreter.metrics import instrumented
+from math_interpreter.non_terminal_expressions import BinaryOperation
+from math_interpreter.operators import ADDITION, MULTIPLICATION, SUBTRACTION
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+_EVALUATE = 0
+_CHECK = 1
+_COMBINE = 2
+
+
+# Products and sums whose bound stays below 2 ** 1023 cannot overflow, even
+# after the rounding of a very long chain of operations.
+_LARGEST_BOUND_EXPONENT = 1023.0
+
+
+def _combine_magnitude(node, operands) -> Optional[Tuple[float, int]]:
+    operator = getattr(node, 'operator', None)
+    if operator is not None:
+        if operator not in (ADDITION, SUBTRACTION, MULTIPLICATION) or None in operands:
+            return None
+        (left, left_degree), (right, right_degree) = operands
+        if operator is MULTIPLICATION:
+            return left * right, left_degree + right_degree
+        return left + right, max(left_degree, right_degree)
+    if isinstance(node, Constant):
+        return (abs(node.value), 0) if math.isfinite(node.value) else None
+    return (1.0, 1) if isinstance(node, Variable) else None
+
+
+def magnitude_bound(expression) -> Optional[Tuple[float, int]]:
+    """
+    Bound the magnitude of an expression in terms of its variables.
+
+    For expressions made of constants, variables, sums, differences and
+    products, the bound (c, d) guarantees abs(value) <= c * max(1, m) ** d
+    whenever every variable has abs(value) <= m. The result is cached on
+    every node.
+
+    Args:
+        expression: The expression to bound.
+
+    Returns:
+        Optional[Tuple[float, int]]: The factor c and degree d, or None if the
+        expression uses other operators, other nodes or infinite constants.
+    """
+    return expression._cached('_magnitude_bound', _combine_magnitude)
+
+
+class ShortCircuitEvaluator:
+    """
+    Evaluates expressions, skipping operands that cannot change the result.
+
+    The cost of an operand is estimated by its node count. An operand is
+    skipped only if it is made of sums, differences and products whose
+    magnitude_bound, given the values of its variables in the context,
+    proves it cannot overflow to inf or NaN. A skipped product may give 0.0
+    where full evaluation gives -0.0. Errors an operand would raise, such as an undefined variable, are
+    never hidden: operands reading undefined variables are not skipped.
+
+    The counters accumulate over calls until reset. An evaluator must not
+    be shared between threads.
+    """
+
+    def __init__(self, limits=None):
+        """
+        Initialize an evaluator with zeroed counters.
+
+        Args:
+            limits: Optional EvaluationLimits every evaluated expression must meet.
+        """
+        self.limits = limits
+        self.evaluated_nodes = 0
+        self.skipped_nodes = 0
+        self.short_circuits = 0
+
+    def reset(self) -> None:
+        """
+        Zero the counters.
+        """
+        self.evaluated_nodes = 0
+        self.skipped_nodes = 0
+        self.short_circuits = 0
+
+    @instrumented
+    def evaluate(self, expression, context) -> float:
+        """
+        Evaluate an expression with short-circuiting.
+
+        The tree is walked with an explicit stack, so deep trees do not hit
+        the recursion limit.
+
+        Args:
+            expression: The expression to evaluate.
+            context: The context containing variable definitions.
+
+        Returns:
+            float: The result, equal to expression.interpret(context) up to
+            the caveats described on the class.
+
+        Raises:
+            EvaluationLimitError: If the expression exceeds the limits.
+        """
+        if self.limits is not None:
+            self.limits.check(expression)
+        values = []
+        stack = [(expression, _EVALUATE, False)]
+        evaluated = skipped = short_circuits = 0
+        try:
+            while stack:
+                node, state, swapped = stack.pop()
+                if state == _EVALUATE:
+                    if not isinstance(node, BinaryOperation):
+                        values.append(node.interpret(context))
+                        evaluated += node.node_count()
+                        continue
+                    evaluated += 1
+                    left, right = node.left, node.right
+                    if node.operator.absorbing is None:
+                        stack.append((node, _COMBINE, False))
+                        stack.append((right, _EVALUATE, False))
+                        stack.append((left, _EVALUATE, False))
+                        continue
+                    swapped = node.operator.commutative and right.node_count() < left.node_count()
+                    stack.append((node, _CHECK, swapped))
+                    stack.append((right if swapped else left, _EVALUATE, False))
+                elif state == _CHECK:
+                    other = node.left if swapped else node.right
+                    absorbing = node.operator.absorbing
+                    if values[-1] == absorbing and self._skippable(other, context):
+                        values[-1] = absorbing
+                        short_circuits += 1
+                        skipped += other.node_count()
+                        continue
+                    stack.append((node, _COMBINE, swapped))
+                    stack.append((other, _EVALUATE, False))
+                else:
+                    second = values.pop()
+                    first = values.pop()
+                    if swapped:
+                        first, second = second, first
+                    values.append(node.operator.scalar(first, second))
+        finally:
+            self.evaluated_nodes += evaluated
+            self.skipped_nodes += skipped
+            self.short_circuits += short_circuits
+        return values[0]
+
+    @staticmethod
+    def _skippable(node, context) -> bool:
+        bound = magnitude_bound(node)
+        if bound is None:
+            return False
+        largest = 1.0
+        for name in node.free_variables():
+            if not context.has_variable(name):
+                return False
+            value = abs(context.get_variable(name))
+            if not math.isfinite(value):
+                return False
+            largest = max(largest, value)
+        factor, degree = bound
+        if factor == 0.0:
+            return True
+        return math.log2(factor) + degree * math.log2(largest) < _LARGEST_BOUND_EXPONENT
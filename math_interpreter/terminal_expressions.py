@@ -31,6 +31,15 @@ class Constant(Expression):
             float: The constant value.
         """
         return self.value
+
+    def _payload(self):
+        """
+        The constructor arguments of the constant.
+
+        Returns:
+            tuple: A tuple holding the value.
+        """
+        return (self.value,)
     
     def __str__(self):
         """
@@ -73,6 +82,24 @@ class Variable(Expression):
             VariableNotDefinedError: If the variable is not defined in the context.
         """
         return context.get_variable(self.name)
+
+    def _own_variables(self):
+        """
+        The variable read by this node.
+
+        Returns:
+            frozenset: A set holding the variable name.
+        """
+        return frozenset((self.name,))
+
+    def _payload(self):
+        """
+        The constructor arguments of the variable.
+
+        Returns:
+            tuple: A tuple holding the name.
+        """
+        return (self.name,)
     
     def __str__(self):
         """
@@ -0,0 +1,106 @@
+"""
+Tests for batch evaluation of formula files over data files.
+"""
+
+import io
+import math
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from math_interpreter.__main__ import main
+from math_interpreter.batch_eval import evaluate_files, load_formulas
+from math_interpreter.columnar import ColumnStore, read_column
+from math_interpreter.exceptions import InvalidExpressionError, VariableNotDefinedError
+
+
+class TestBatchEval(unittest.TestCase):
+    """Test cases for evaluate_files and the eval command."""
+
+    def setUp(self):
+        """Write a formula file and matching CSV and column inputs."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+        self.formulas = self._write("formulas.txt", "# two formulas\ntotal = x * 2 + y\n\nx / y\n")
+        rows = ["x,y,unused"] + [f"{i},{i % 3},0" for i in range(25)]
+        self.csv = self._write("data.csv", "\n".join(rows) + "\n")
+        self.columns = os.path.join(self.directory, "columns")
+        os.makedirs(self.columns)
+        store = ColumnStore(self.columns)
+        store.write("x", [float(i) for i in range(25)])
+        store.write("y", [float(i % 3) for i in range(25)])
+
+    def tearDown(self):
+        """Remove the temporary files."""
+        self._tmp.cleanup()
+
+    def _write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as handle:
+            handle.write(text)
+        return path
+
+    def test_load_formulas(self):
+        """Test named, unnamed and comment lines in a formula file."""
+        self.assertEqual(load_formulas(self.formulas), [("total", "x * 2 + y"), ("f2", "x / y")])
+        with self.assertRaises(InvalidExpressionError):
+            load_formulas(self._write("empty.txt", "# nothing\n"))
+
+    def test_csv_to_csv(self):
+        """Test CSV input produces one output column per formula."""
+        output = io.StringIO()
+        summary = evaluate_files(self.formulas, csv_path=self.csv, output=output, chunk_size=4)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], "total,f2")
+        self.assertEqual(lines[5], "9.0,4.0")
+        self.assertEqual(lines[1], "0.0,nan")
+        self.assertEqual((summary.rows, summary.errors), (25, 9))
+
+    def test_columns_to_columns_with_workers(self):
+        """Test column input with worker processes produces binary result columns."""
+        outputs = os.path.join(self.directory, "out")
+        summary = evaluate_files(self.formulas, columns_dir=self.columns, output_columns=outputs,
+                                 workers=2, chunk_size=4)
+        self.assertEqual(summary.rows, 25)
+        totals = read_column(ColumnStore(outputs).path_for("total"))
+        self.assertEqual(list(totals), [i * 2.0 + i % 3 for i in range(25)])
+        self.assertTrue(math.isnan(read_column(ColumnStore(outputs).path_for("f2"))[0]))
+
+    def test_missing_variable(self):
+        """Test a formula referencing a missing column is rejected up front."""
+        formulas = self._write("missing.txt", "x + z\n")
+        with self.assertRaises(VariableNotDefinedError):
+            evaluate_files(formulas, csv_path=self.csv, output=io.StringIO())
+
+    def test_command_line(self):
+        """Test the eval command writes results and reports throughput."""
+        output = os.path.join(self.directory, "out.csv")
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            status = main(["eval", self.formulas, "--csv", self.csv, "--output", output,
+                           "--workers", "1"])
+        self.assertEqual(status, 0)
+        self.assertIn("rows/s", stderr.getvalue())
+        with open(output) as handle:
+            self.assertEqual(len(handle.read().splitlines()), 26)
+
+    def test_command_line_error(self):
+        """Test the eval command reports errors with a non-zero status."""
+        with redirect_stderr(io.StringIO()):
+            status = main(["eval", self._write("bad.txt", "x +\n"), "--csv", self.csv,
+                           "--output", os.path.join(self.directory, "out.csv")])
+        self.assertEqual(status, 1)
+
+    def test_short_csv_row(self):
+        """Test a CSV row with fewer fields than the header is reported with its line number."""
+        short = self._write("short.csv", "x,y\n1,2\n1\n")
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            status = main(["eval", self.formulas, "--csv", short, "--workers", "1",
+                           "--output", os.path.join(self.directory, "out.csv")])
+        self.assertEqual(status, 1)
+        self.assertIn("error: Line 3", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
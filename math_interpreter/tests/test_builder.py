@@ -0,0 +1,122 @@
+"""
+Tests for the arithmetic operator overloads and the expression builder.
+"""
+
+import unittest
+from math_interpreter.builder import ExpressionBuilder
+from math_interpreter.compiler import compile_expression
+from math_interpreter.context import Context
+from math_interpreter.exceptions import DivisionByZeroError
+from math_interpreter.non_terminal_expressions import Addition, Division, Multiplication
+from math_interpreter.terminal_expressions import Variable
+
+
+class TestOperatorOverloads(unittest.TestCase):
+    """Test cases for building expressions with Python operators."""
+
+    def setUp(self):
+        """Set up variables and a context for testing."""
+        self.x = Variable("x")
+        self.y = Variable("y")
+        self.context = Context()
+        self.context.set_variable("x", 3)
+        self.context.set_variable("y", 4)
+
+    def test_operators_build_nodes(self):
+        """Test each operator builds the matching operation."""
+        self.assertEqual(str(self.x + 1), "(x + 1)")
+        self.assertEqual(str(2 * self.x - self.y), "((2 * x) - y)")
+        self.assertEqual(str(1 - self.x), "(1 - x)")
+        self.assertEqual(str(self.x ** 2 / self.y), "((x ^ 2) / y)")
+        self.assertEqual(str(2 ** self.x), "(2 ^ x)")
+        self.assertEqual((-self.x).interpret(self.context), -3.0)
+        self.assertEqual((self.x * self.y + 1 / self.y).interpret(self.context), 12.25)
+
+    def test_builtin_sum(self):
+        """Test sum() does not add a node for its start value."""
+        total = sum([self.x, self.y, self.x])
+        self.assertEqual(str(total), "((x + y) + x)")
+
+    def test_unsupported_operands(self):
+        """Test other operand types are rejected."""
+        with self.assertRaises(TypeError):
+            self.x + "a"
+        with self.assertRaises(TypeError):
+            self.x * True
+
+
+class TestExpressionBuilder(unittest.TestCase):
+    """Test cases for ExpressionBuilder."""
+
+    def setUp(self):
+        """Set up a builder and a context for testing."""
+        self.builder = ExpressionBuilder()
+        self.context = Context()
+        for index in range(16):
+            self.context.set_variable(f"v{index}", index + 1)
+
+    def test_interning(self):
+        """Test equal leaves and operations are shared."""
+        b = self.builder
+        self.assertIs(b.variable("x"), b.variable("x"))
+        self.assertIs(b.constant(2), b.constant(2.0))
+        self.assertIsNot(b.constant(0.0), b.constant(-0.0))
+        first = b.apply('div', "x", 2)
+        second = b.apply('div', b.variable("x"), 2.0)
+        self.assertIs(first, second)
+        self.assertIsInstance(first, Division)
+
+    def test_constant_folding(self):
+        """Test operations on constants are evaluated while building."""
+        b = self.builder
+        self.assertEqual(b.power(2, 10).value, 1024.0)
+        self.assertEqual(b.subtract(5, b.divide(6, 3)).value, 3.0)
+        unfolded = b.divide(1, 0)
+        self.assertIsInstance(unfolded, Division)
+        with self.assertRaises(DivisionByZeroError):
+            unfolded.interpret(self.context)
+
+    def test_sum_is_flattened_folded_and_balanced(self):
+        """Test sums combine constants, drop zeros and are balanced."""
+        b = self.builder
+        names = [f"v{index}" for index in range(16)]
+        total = b.add(1, b.sum(names[:8]), 0, b.sum(names[8:]), 2.5)
+        self.assertEqual(total.interpret(self.context), sum(range(1, 17)) + 3.5)
+        # 16 variables and one folded constant.
+        self.assertEqual(total.node_count(), 33)
+        self.assertEqual(total.depth(), 6)
+        self.assertIs(b.sum(["v1", "v2"]), b.sum(["v1", "v2"]))
+        self.assertIs(b.add("v1", 0), b.variable("v1"))
+        self.assertIs(b.sum([]), b.constant(0))
+
+    def test_product_leads_with_coefficient(self):
+        """Test products fold their constants into a leading coefficient."""
+        b = self.builder
+        product = b.multiply(2, "v1", b.multiply(3, "v2"), 1)
+        self.assertIsInstance(product, Multiplication)
+        self.assertEqual(str(product), "((6 * v1) * v2)")
+        self.assertEqual(product.interpret(self.context), 36.0)
+        self.assertIs(b.product([1, 1]), b.constant(1))
+
+    def test_shared_operands_are_flattened_once(self):
+        """Test repeatedly doubling a sum keeps the tree small and the value exact."""
+        b = self.builder
+        total = b.add("v0", "v1")
+        doubled = Variable("v0") + Variable("v1")
+        for _ in range(60):
+            total = b.add(total, total)
+            doubled = doubled + doubled
+        self.assertEqual(compile_expression(total).run(self.context), 3.0 * 2 ** 60)
+        self.assertLess(len(compile_expression(total, optimize=False)), 100)
+        self.assertEqual(compile_expression(b.add(doubled, 1)).run(self.context), 3.0 * 2 ** 60 + 1)
+
+    def test_other_operations_are_not_flattened(self):
+        """Test only operands built with the same operator are flattened."""
+        b = self.builder
+        total = b.add(b.multiply("v1", "v2"), "v3")
+        self.assertIsInstance(total, Addition)
+        self.assertEqual(total.interpret(self.context), 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
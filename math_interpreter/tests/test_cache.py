@@ -0,0 +1,87 @@
+"""
+Tests for the persistent on-disk expression cache.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from math_interpreter.cache import CACHE_SUFFIX, ExpressionCache
+from math_interpreter.context import Context
+from math_interpreter.non_terminal_expressions import Addition, Multiplication
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+class TestExpressionCache(unittest.TestCase):
+    """Test cases for the ExpressionCache class."""
+
+    def setUp(self):
+        """Create a temporary cache directory."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+        self.expr = Addition(Multiplication(Variable("x"), Constant(2)), Constant(1))
+
+    def tearDown(self):
+        """Remove the temporary cache directory."""
+        self._tmp.cleanup()
+
+    def _entries(self):
+        return [name for name in os.listdir(self.directory) if name.endswith(CACHE_SUFFIX)]
+
+    def test_miss_then_hit(self):
+        """Test the first lookup compiles and the second loads from disk."""
+        cache = ExpressionCache(self.directory)
+        cache.get_or_compile(self.expr)
+        program = cache.get_or_compile(Addition(Multiplication(Variable("x"), Constant(2)), Constant(1)))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        context = Context()
+        context.set_variable("x", 4)
+        self.assertEqual(program.run(context), 9.0)
+
+    def test_warm_start_skips_compilation(self):
+        """Test a new cache over the same directory does not recompile."""
+        ExpressionCache(self.directory).get_or_compile(self.expr)
+        warm = ExpressionCache(self.directory)
+        with mock.patch("math_interpreter.cache.compile_expression") as compile_mock:
+            warm.get_or_compile(self.expr)
+        compile_mock.assert_not_called()
+        self.assertEqual(warm.hits, 1)
+
+    def test_version_change_invalidates(self):
+        """Test entries written by another library version are ignored."""
+        ExpressionCache(self.directory, version="0.0.1").get_or_compile(self.expr)
+        cache = ExpressionCache(self.directory, version="0.0.2")
+        cache.get_or_compile(self.expr)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_corrupt_entry_is_a_miss(self):
+        """Test an unreadable entry is recompiled instead of raising."""
+        cache = ExpressionCache(self.directory)
+        cache.get_or_compile(self.expr)
+        with open(os.path.join(self.directory, self._entries()[0]), "wb") as handle:
+            handle.write(b"not a pickle")
+        cache.get_or_compile(self.expr)
+        self.assertEqual(cache.misses, 2)
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted over budget."""
+        cache = ExpressionCache(self.directory)
+        first = Variable("a")
+        second = Variable("b")
+        cache.get_or_compile(first)
+        cache.get_or_compile(second)
+        entry_size = cache.size() // 2
+
+        old = os.path.join(self.directory, cache.key_for(first) + CACHE_SUFFIX)
+        os.utime(old, ns=(0, 0))
+        cache.max_bytes = entry_size * 2
+        cache.get_or_compile(Variable("c"))
+
+        self.assertEqual(len(self._entries()), 2)
+        self.assertIsNone(cache.load(cache.key_for(first)))
+        self.assertIsNotNone(cache.load(cache.key_for(second)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+Tests for memory-mapped columnar batch evaluation.
+"""
+
+import os
+import tempfile
+import unittest
+from math_interpreter.columnar import ColumnStore, evaluate_columns, read_column, write_column
+from math_interpreter.context import Context
+from math_interpreter.exceptions import VariableNotDefinedError
+from math_interpreter.expression import Expression
+from math_interpreter.fusion import fuse
+from math_interpreter.non_terminal_expressions import Addition, Multiplication
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+class _Negation(Expression):
+    """A user node that does not describe its structure."""
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def interpret(self, context):
+        return -self.operand.interpret(context)
+
+    def __str__(self):
+        return f"-{self.operand}"
+
+
+class TestColumnar(unittest.TestCase):
+    """Test cases for evaluating expressions over column files."""
+
+    def setUp(self):
+        """Create a temporary column store with two columns."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+        self.store = ColumnStore(self.directory)
+        self.xs = [float(i) for i in range(10)]
+        self.ys = [float(i) * 0.5 for i in range(10)]
+        self.store.write("x", self.xs)
+        self.store.write("y", self.ys)
+        self.output = os.path.join(self.directory, "out.col")
+
+    def tearDown(self):
+        """Remove the temporary column store."""
+        self._tmp.cleanup()
+
+    def test_opaque_nodes_read_every_column(self):
+        """Test opaque nodes are interpreted row by row with every column of the store."""
+        expr = Multiplication(_Negation(Variable("x")), Variable("y"))
+        self.assertEqual(evaluate_columns(expr, self.store, self.output, window_size=3), len(self.xs))
+        self.assertEqual(list(read_column(self.output)), [-x * y for x, y in zip(self.xs, self.ys)])
+        evaluate_columns(_Negation(Variable("x")), self.store, self.output)
+        self.assertEqual(list(read_column(self.output)), [-x for x in self.xs])
+
+    def test_write_and_read_column(self):
+        """Test a column round-trips through its file."""
+        path = os.path.join(self.directory, "z.col")
+        self.assertEqual(write_column(path, [1, 2.5, -3]), 3)
+        self.assertEqual(list(read_column(path)), [1.0, 2.5, -3.0])
+
+    def test_matches_interpret_row_by_row(self):
+        """Test windowed evaluation agrees with interpret for every row."""
+        shared = Multiplication(Variable("x"), Constant(2))
+        expr = Addition(Addition(shared, Variable("y")), shared)
+        rows = evaluate_columns(expr, self.store, self.output, window_size=3)
+        self.assertEqual(rows, 10)
+
+        results = read_column(self.output)
+        for x, y, result in zip(self.xs, self.ys, results):
+            context = Context()
+            context.set_variable("x", x)
+            context.set_variable("y", y)
+            self.assertEqual(result, expr.interpret(context))
+
+    def test_fused_expression(self):
+        """Test fused nodes are evaluated column-wise."""
+        expr = fuse(Addition(Multiplication(Variable("x"), Variable("y")), Multiplication(Variable("x"), Constant(2))))
+        evaluate_columns(expr, self.store, self.output, window_size=4)
+        self.assertEqual(list(read_column(self.output)), [x * y + x * 2 for x, y in zip(self.xs, self.ys)])
+
+    def test_only_referenced_columns_are_needed(self):
+        """Test columns not referenced by the expression are never opened."""
+        os.remove(self.store.path_for("y"))
+        evaluate_columns(Variable("x"), self.directory, self.output)
+        self.assertEqual(list(read_column(self.output)), self.xs)
+
+    def test_missing_column(self):
+        """Test a referenced variable without a column raises an error."""
+        with self.assertRaises(VariableNotDefinedError):
+            evaluate_columns(Variable("missing"), self.store, self.output)
+
+    def test_mismatched_lengths(self):
+        """Test columns of different lengths are rejected."""
+        self.store.write("y", [1.0])
+        with self.assertRaises(ValueError):
+            evaluate_columns(Addition(Variable("x"), Variable("y")), self.store, self.output)
+
+    def test_empty_columns(self):
+        """Test evaluating over empty columns produces an empty output."""
+        self.store.write("x", [])
+        self.assertEqual(evaluate_columns(Variable("x"), self.store, self.output), 0)
+        self.assertEqual(len(read_column(self.output)), 0)
+
+
+    def test_float32_columns_keep_their_typecode(self):
+        """Test float32 input columns are read as float32 and outputs record their typecode."""
+        self.store.write("x", self.xs, 'f')
+        self.assertEqual(self.store.open("x").typecode, 'f')
+        evaluate_columns(Multiplication(Variable("x"), Variable("y")), self.store, self.output)
+        self.assertEqual(list(read_column(self.output)), [x * y for x, y in zip(self.xs, self.ys)])
+        self.store.write("x", self.xs)
+        self.assertEqual(self.store.open("x").typecode, 'd')
+
+    def test_automatic_output_typecode(self):
+        """Test the output typecode is chosen from the ranges of the input columns."""
+        expr = Addition(Variable("x"), Variable("y"))
+        evaluate_columns(expr, self.store, self.output, output_typecode='auto')
+        self.assertEqual(os.path.getsize(self.output), 4 * len(self.xs))
+        self.assertEqual(list(read_column(self.output)), [x + y for x, y in zip(self.xs, self.ys)])
+        self.store.write("y", [1e300] * len(self.xs))
+        evaluate_columns(Multiplication(expr, Variable("y")), self.store, self.output, output_typecode='auto')
+        self.assertEqual(os.path.getsize(self.output), 8 * len(self.xs))
+        self.store.write("y", [1e-50] * len(self.xs))
+        evaluate_columns(Multiplication(Variable("x"), Variable("y")), self.store, self.output,
+                         output_typecode='auto')
+        self.assertEqual(list(read_column(self.output)), [x * 1e-50 for x in self.xs])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Tests for lowering expressions into flat programs.
+"""
+
+import unittest
+from math_interpreter.compiler import OP_CONST, compile_expression, structural_key
+from math_interpreter.context import Context
+from math_interpreter.exceptions import VariableNotDefinedError
+from math_interpreter.non_terminal_expressions import Addition, Multiplication
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+class TestCompiler(unittest.TestCase):
+    """Test cases for compile_expression and structural_key."""
+
+    def setUp(self):
+        """Set up a context with common variables for testing."""
+        self.context = Context()
+        self.context.set_variable("x", 5)
+        self.context.set_variable("y", 3)
+
+    def test_program_matches_interpret(self):
+        """Test a compiled program evaluates to the same result as interpret."""
+        expr = Addition(
+            Multiplication(Variable("x"), Variable("y")),
+            Multiplication(Constant(2), Variable("x"))
+        )
+        program = compile_expression(expr)
+        self.assertEqual(program.run(self.context), expr.interpret(self.context))
+
+    def test_constant_folding(self):
+        """Test constant subtrees are folded into a single constant."""
+        expr = Multiplication(Addition(Constant(2), Constant(3)), Constant(4))
+        program = compile_expression(expr)
+        self.assertEqual(program.instructions, [(OP_CONST, 20.0, 0)])
+
+    def test_common_subexpressions_are_merged(self):
+        """Test structurally identical subtrees are evaluated once."""
+        expr = Addition(
+            Multiplication(Variable("x"), Variable("y")),
+            Multiplication(Variable("x"), Variable("y"))
+        )
+        self.assertEqual(len(compile_expression(expr)), 4)
+        self.assertEqual(len(compile_expression(expr, optimize=False)), 7)
+        self.assertEqual(compile_expression(expr).run(self.context), 30.0)
+
+    def test_deep_tree_without_recursion(self):
+        """Test a tree deeper than the recursion limit can be compiled and run."""
+        expr = Variable("x")
+        for _ in range(5000):
+            expr = Addition(expr, Constant(1))
+        self.assertEqual(compile_expression(expr).run(self.context), 5005.0)
+
+    def test_undefined_variable(self):
+        """Test running a program with an undefined variable raises an error."""
+        program = compile_expression(Addition(Variable("z"), Constant(1)))
+        self.assertEqual(program.variables, ("z",))
+        with self.assertRaises(VariableNotDefinedError):
+            program.run(self.context)
+
+    def test_run_batch(self):
+        """Test column-wise evaluation matches row-by-row evaluation."""
+        expr = Addition(Multiplication(Variable("x"), Constant(2)), Variable("y"))
+        program = compile_expression(expr)
+        self.assertEqual(program.run_batch({"x": [1, 2, 3], "y": [0.5, 0.5, 0.5]}, 3), [2.5, 4.5, 6.5])
+        self.assertEqual(compile_expression(Constant(4)).run_batch({}, 2), [4.0, 4.0])
+        with self.assertRaises(VariableNotDefinedError):
+            program.run_batch({"x": [1]}, 1)
+
+    def test_structural_key(self):
+        """Test structural keys depend on structure only, not node identity."""
+        a = Addition(Variable("x"), Constant(1))
+        b = Addition(Variable("x"), Constant(1))
+        c = Addition(Constant(1), Variable("x"))
+        self.assertEqual(structural_key(a), structural_key(b))
+        self.assertNotEqual(structural_key(a), structural_key(c))
+        self.assertNotEqual(structural_key(Constant(0.0)), structural_key(Constant(-0.0)))
+
+
+if __name__ == "__main__":
+    unittest.main()
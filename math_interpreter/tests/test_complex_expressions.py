@@ -244,5 +244,32 @@ class TestComplexExpressions(unittest.TestCase):
         self.assertEqual(str(expr), "(a * (b + x))")
 
 
+class TestFreeVariables(unittest.TestCase):
+    """Test cases for free-variable analysis."""
+
+    def test_free_variables(self):
+        """Test free_variables collects every variable name once."""
+        expr = Addition(Multiplication(Variable("x"), Constant(2)),
+                        Multiplication(Variable("y"), Variable("x")))
+        self.assertEqual(expr.free_variables(), frozenset({"x", "y"}))
+        self.assertEqual(Constant(1).free_variables(), frozenset())
+
+    def test_free_variables_are_cached_and_shared(self):
+        """Test results are cached per node and shared along chains."""
+        shared = Addition(Variable("x"), Variable("y"))
+        expr = Multiplication(Addition(shared, Constant(1)), shared)
+        names = expr.free_variables()
+        self.assertIs(expr.free_variables(), names)
+        self.assertIs(shared.free_variables(), names)
+        self.assertIs(expr.left.free_variables(), names)
+
+    def test_free_variables_of_deep_tree(self):
+        """Test free_variables works on trees deeper than the recursion limit."""
+        expr = Variable("x")
+        for index in range(5000):
+            expr = Addition(expr, Variable(f"v{index % 3}"))
+        self.assertEqual(expr.free_variables(), frozenset({"x", "v0", "v1", "v2"}))
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -5,6 +5,22 @@ Tests for the Context class.
 import unittest
 from math_interpreter.context import Context
 from math_interpreter.exceptions import VariableNotDefinedError
+from math_interpreter.expression import Expression
+from math_interpreter.non_terminal_expressions import Addition, Multiplication
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+class _Negation(Expression):
+    """A user node that does not describe its structure."""
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def interpret(self, context):
+        return -self.operand.interpret(context)
+
+    def __str__(self):
+        return f"-{self.operand}"
 
 
 class TestContext(unittest.TestCase):
@@ -39,6 +55,89 @@ class TestContext(unittest.TestCase):
         self.context.set_variable("a", 10)
         self.assertEqual(self.context.get_variable("a"), 10)
 
+    def test_validate(self):
+        """Test validate accepts expressions whose variables are all defined."""
+        self.context.set_variable("x", 1)
+        self.context.validate(Addition(Variable("x"), Constant(2)))
+        self.context.with_variable("y", 2).validate(Multiplication(Variable("x"), Variable("y")))
+
+    def test_validate_reports_all_missing_variables(self):
+        """Test validate names every undefined variable in one error."""
+        self.context.set_variable("x", 1)
+        expr = Addition(Variable("b"), Multiplication(Variable("x"), Variable("a")))
+        with self.assertRaises(VariableNotDefinedError) as caught:
+            self.context.validate(expr)
+        self.assertIn("'a', 'b'", str(caught.exception))
+
+
+    def test_validate_leaves_opaque_nodes_to_evaluation(self):
+        """Test variables inside opaque nodes are not listed, cached or validated."""
+        expr = Addition(_Negation(Variable("x")), Variable("y"))
+        self.assertTrue(expr.is_opaque())
+        self.assertFalse(Addition(Variable("x"), Constant(1)).is_opaque())
+        self.assertEqual(expr.free_variables(), frozenset({"y"}))
+        self.assertNotIn("_free_variables", expr.__dict__)
+        self.assertIn("_free_variables", expr.right.__dict__)
+        self.context.set_variable("y", 1)
+        self.context.validate(expr)
+        with self.assertRaises(VariableNotDefinedError):
+            expr.interpret(self.context)
+
+
+class TestContextSnapshots(unittest.TestCase):
+    """Test cases for copy-on-write Context snapshots."""
+
+    def setUp(self):
+        """Set up a base context with two variables."""
+        self.base = Context()
+        self.base.set_variable("x", 1)
+        self.base.set_variable("y", 2)
+
+    def test_with_variable_leaves_parent_unchanged(self):
+        """Test with_variable returns a new context and keeps the parent intact."""
+        child = self.base.with_variable("x", 10)
+        self.assertEqual(child.get_variable("x"), 10)
+        self.assertEqual(child.get_variable("y"), 2)
+        self.assertEqual(self.base.get_variable("x"), 1)
+        self.assertFalse(self.base.has_variable("z"))
+
+    def test_snapshot_shares_parent_variables(self):
+        """Test a snapshot stores only its own changes."""
+        child = self.base.with_variable("z", 3)
+        self.assertIs(child._base, self.base._variables)
+        self.assertEqual(child._variables, {"z": 3})
+
+        grandchild = child.with_variable("w", 4)
+        self.assertIs(grandchild._base, self.base._variables)
+        self.assertEqual(grandchild._variables, {"z": 3, "w": 4})
+
+    def test_parent_writes_are_copy_on_write(self):
+        """Test writes to a parent after a snapshot are not visible in the snapshot."""
+        child = self.base.snapshot()
+        self.base.set_variable("x", 100)
+        self.base.set_variable("z", 5)
+        self.assertEqual(child.get_variable("x"), 1)
+        self.assertFalse(child.has_variable("z"))
+        self.assertEqual(self.base.get_variable("x"), 100)
+
+    def test_child_writes_do_not_leak(self):
+        """Test writes to a snapshot are not visible in its parent or siblings."""
+        first = self.base.snapshot()
+        second = self.base.snapshot()
+        first.set_variable("x", 7)
+        self.assertEqual(second.get_variable("x"), 1)
+        self.assertEqual(self.base.get_variable("x"), 1)
+
+    def test_undefined_variable_in_snapshot(self):
+        """Test a snapshot still raises for undefined variables."""
+        with self.assertRaises(VariableNotDefinedError):
+            self.base.with_variable("x", 3).get_variable("undefined")
+
+    def test_variables(self):
+        """Test variables merges the snapshot's changes over its parent."""
+        child = self.base.with_variable("y", 20)
+        self.assertEqual(child.variables(), {"x": 1, "y": 20})
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
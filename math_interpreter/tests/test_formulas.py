@@ -0,0 +1,113 @@
+"""
+Tests for the formula registry.
+"""
+
+import unittest
+from math_interpreter.exceptions import CircularDependencyError, InvalidExpressionError, VariableNotDefinedError
+from math_interpreter.expression import Expression
+from math_interpreter.formulas import FormulaRegistry
+from math_interpreter.non_terminal_expressions import Multiplication
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+class _Negation(Expression):
+    """A user node that does not describe its structure."""
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def interpret(self, context):
+        return -self.operand.interpret(context)
+
+    def __str__(self):
+        return f"-{self.operand}"
+
+
+class TestFormulaRegistry(unittest.TestCase):
+    """Test cases for FormulaRegistry."""
+
+    def setUp(self):
+        """Set up a registry with inputs and dependent formulas."""
+        self.registry = FormulaRegistry()
+        self.registry.set_variable("price", 10)
+        self.registry.set_variable("quantity", 3)
+        self.registry.set_variable("rate", 0.5)
+        self.registry.define("revenue", "price * quantity")
+        self.registry.define("tax", Multiplication(Variable("revenue"), Variable("rate")))
+        self.registry.define("shipping", "quantity + 1")
+
+    def test_formulas_read_other_formulas(self):
+        """Test formula results feed other formulas."""
+        self.assertEqual(self.registry.get("tax"), 15.0)
+        self.assertEqual(self.registry.get("revenue"), 30.0)
+
+    def test_only_affected_formulas_recomputed(self):
+        """Test changing an input recomputes only the formulas that read it."""
+        self.assertEqual(sorted(self.registry.recalculate()), ["revenue", "shipping", "tax"])
+        self.registry.set_variable("rate", 0.1)
+        self.assertTrue(self.registry.is_dirty("tax"))
+        self.assertFalse(self.registry.is_dirty("revenue"))
+        self.assertFalse(self.registry.is_dirty("shipping"))
+        before = self.registry.recomputations
+        self.assertEqual(self.registry.get("tax"), 3.0)
+        self.assertEqual(self.registry.recomputations - before, 1)
+
+    def test_dirty_marking_is_transitive_and_lazy(self):
+        """Test dependents of dependents are marked and recomputed in order on read."""
+        self.registry.recalculate()
+        self.registry.set_variable("price", 20)
+        self.assertTrue(self.registry.is_dirty("revenue"))
+        self.assertTrue(self.registry.is_dirty("tax"))
+        self.assertEqual(self.registry.get("tax"), 30.0)
+        self.assertEqual(self.registry.recalculate(), [])
+
+    def test_evaluation_order(self):
+        """Test the topological order puts dependencies first."""
+        order = self.registry.evaluation_order()
+        self.assertLess(order.index("revenue"), order.index("tax"))
+        self.assertEqual(self.registry.readers("revenue"), {"tax"})
+
+    def test_cycles_rejected(self):
+        """Test definitions that would create a cycle raise and leave the registry unchanged."""
+        with self.assertRaises(CircularDependencyError):
+            self.registry.define("revenue", "tax * 2")
+        with self.assertRaises(CircularDependencyError):
+            self.registry.define("loop", "loop + 1")
+        self.assertEqual(self.registry.get("tax"), 15.0)
+        self.assertNotIn("loop", self.registry)
+
+    def test_redefinition(self):
+        """Test redefining a formula updates the index and its dependents."""
+        self.registry.recalculate()
+        self.registry.define("revenue", Multiplication(Variable("price"), Constant(2)))
+        self.assertEqual(self.registry.get("tax"), 10.0)
+        self.registry.set_variable("quantity", 100)
+        self.assertFalse(self.registry.is_dirty("revenue"))
+        self.assertEqual(self.registry.readers("quantity"), {"shipping"})
+
+    def test_name_conflicts(self):
+        """Test formula and input names cannot be mixed up."""
+        with self.assertRaises(InvalidExpressionError):
+            self.registry.set_variable("revenue", 1)
+        with self.assertRaises(InvalidExpressionError):
+            self.registry.define("price", "1 + 1")
+        with self.assertRaises(InvalidExpressionError):
+            self.registry.get("unknown")
+
+    def test_opaque_formulas_rejected(self):
+        """Test formulas whose dependencies cannot be tracked are rejected."""
+        with self.assertRaises(InvalidExpressionError):
+            self.registry.define("refund", _Negation(Variable("revenue")))
+
+    def test_failures_stay_dirty(self):
+        """Test a failed recomputation leaves the formula dirty until its input exists."""
+        self.registry.define("discounted", "revenue - discount")
+        with self.assertRaises(VariableNotDefinedError):
+            self.registry.get("discounted")
+        self.assertTrue(self.registry.is_dirty("discounted"))
+        self.registry.set_variable("discount", 5)
+        self.assertEqual(self.registry.get("discounted"), 25.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
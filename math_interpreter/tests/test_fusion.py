@@ -0,0 +1,127 @@
+"""
+Tests for fused nodes and compiler superinstructions.
+"""
+
+import pickle
+import unittest
+from math_interpreter.compiler import OP_MULADD, OP_SCALE, compile_expression, structural_key
+from math_interpreter.context import Context
+from math_interpreter.exceptions import VariableNotDefinedError
+from math_interpreter.fusion import AddMultiply, MultiplyAdd, ScaledVariable, fuse, unfuse
+from math_interpreter.non_terminal_expressions import Addition, Multiplication
+from math_interpreter.parser import parse
+from math_interpreter.terminal_expressions import Constant, Variable
+from math_interpreter import workloads
+
+
+class TestFusion(unittest.TestCase):
+    """Test cases for fuse and unfuse."""
+
+    def setUp(self):
+        """Set up a context for testing."""
+        self.context = Context()
+        self.context.set_variable("x", 3)
+        self.context.set_variable("y", 4)
+        self.context.set_variable("z", 0.5)
+
+    def test_patterns_are_fused(self):
+        """Test each pattern becomes its fused node with the same rendering."""
+        cases = {
+            "x * y + z": MultiplyAdd,
+            "z + x * y": AddMultiply,
+            "x * 2": ScaledVariable,
+            "2 * x": ScaledVariable,
+        }
+        for text, cls in cases.items():
+            with self.subTest(text=text):
+                expr = parse(text)
+                fused = fuse(expr)
+                self.assertIsInstance(fused, cls)
+                self.assertEqual(str(fused), str(expr))
+                self.assertEqual(fused.interpret(self.context), expr.interpret(self.context))
+                self.assertEqual(str(unfuse(fused)), str(expr))
+
+    def test_scaled_variables_are_fused_first(self):
+        """Test a scaled variable inside a sum is not turned into a multiply-add."""
+        fused = fuse(parse("x * 2 + y"))
+        self.assertIsInstance(fused, Addition)
+        self.assertIsInstance(fused.left, ScaledVariable)
+        self.assertEqual(fused.node_count(), 3)
+
+    def test_random_trees_are_unchanged(self):
+        """Test fused random trees render, evaluate and hash like the originals."""
+        context = workloads.random_context(workloads.variable_names(8), seed=3)
+        for seed in range(5):
+            expr = workloads.random_tree(301, max_depth=40, repetition_rate=0.2, seed=seed)
+            fused = fuse(expr)
+            self.assertLess(fused.node_count(), expr.node_count())
+            self.assertEqual(str(fused), str(expr))
+            self.assertEqual(fused.interpret(context), expr.interpret(context))
+            self.assertEqual(structural_key(fused), structural_key(expr))
+            self.assertEqual(str(unfuse(fused)), str(expr))
+
+    def test_shared_subtrees_stay_shared(self):
+        """Test a shared subtree is fused once."""
+        shared = Addition(Multiplication(Variable("x"), Variable("y")), Constant(1))
+        fused = fuse(Multiplication(shared, shared))
+        self.assertIsInstance(fused.left, MultiplyAdd)
+        self.assertIs(fused.left, fused.right)
+
+    def test_fused_trees_pickle(self):
+        """Test fused nodes survive pickling."""
+        fused = fuse(parse("2 * x + y * z + x * y"))
+        copy = pickle.loads(pickle.dumps(fused))
+        self.assertEqual(str(copy), str(fused))
+        self.assertEqual(copy.interpret(self.context), fused.interpret(self.context))
+
+    def test_undefined_variable(self):
+        """Test a scaled variable reports undefined variables."""
+        with self.assertRaises(VariableNotDefinedError):
+            fuse(parse("w * 2")).interpret(self.context)
+
+
+class TestSuperinstructions(unittest.TestCase):
+    """Test cases for superinstructions in compiled programs."""
+
+    def setUp(self):
+        """Set up a context for testing."""
+        self.context = Context()
+        self.context.set_variable("x", 3)
+        self.context.set_variable("y", 4)
+
+    def test_superinstructions_are_emitted(self):
+        """Test scaled variables and multiply-adds become single instructions."""
+        expr = parse("x * 2 + y * y")
+        program = compile_expression(expr)
+        opcodes = [instruction[0] for instruction in program.instructions]
+        self.assertIn(OP_SCALE, opcodes)
+        self.assertEqual(opcodes[-1], OP_MULADD)
+        self.assertEqual(len(program), 3)
+        self.assertEqual(program.variables, ("x", "y"))
+        self.assertEqual(program.run(self.context), 22.0)
+        self.assertEqual(len(compile_expression(expr, optimize=False)), 6)
+
+    def test_shared_operands_are_not_fused(self):
+        """Test an instruction used more than once keeps its own slot."""
+        program = compile_expression(parse("x * 2 + x"))
+        self.assertNotIn(OP_SCALE, [instruction[0] for instruction in program.instructions])
+        self.assertEqual(program.run(self.context), 9.0)
+
+    def test_fused_trees_compile_like_plain_trees(self):
+        """Test fused and plain trees compile to equivalent programs."""
+        expr = workloads.balanced_tree(64, seed=2)
+        context = workloads.random_context(workloads.variable_names(8), seed=2)
+        plain = compile_expression(expr)
+        fused = compile_expression(fuse(expr))
+        self.assertEqual(len(fused), len(plain))
+        self.assertEqual(fused.run(context), plain.run(context))
+        self.assertEqual(fused.run(context), expr.interpret(context))
+
+    def test_run_batch(self):
+        """Test superinstructions evaluate column-wise."""
+        program = compile_expression(parse("x * 2 + y * x"))
+        self.assertEqual(program.run_batch({"x": [1, 2], "y": [3, 4]}, 2), [5.0, 12.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Tests for interval-bound analysis.
+"""
+
+import math
+import os
+import random
+import tempfile
+import unittest
+from math_interpreter.columnar import ColumnStore, evaluate_columns, read_column
+from math_interpreter.context import Context
+from math_interpreter.exceptions import InterpreterError, VariableNotDefinedError
+from math_interpreter.fusion import fuse
+from math_interpreter.intervals import (
+    bounds, column_ranges, may_satisfy, prune_partitions, select_typecode,
+)
+from math_interpreter.non_terminal_expressions import Division, Power
+from math_interpreter.parser import parse
+from math_interpreter.terminal_expressions import Constant, Variable
+from math_interpreter import workloads
+
+
+class TestIntervals(unittest.TestCase):
+    """Test cases for bounds and the analyses built on it."""
+
+    def test_simple_bounds(self):
+        """Test bounds of sums and products include exactly the reachable range."""
+        low, high = bounds(parse("x * y + 1"), {"x": (-2, 3), "y": (4, 5)})
+        self.assertAlmostEqual(low, -9.0)
+        self.assertAlmostEqual(high, 16.0)
+        self.assertLessEqual(low, -9.0)
+        self.assertGreaterEqual(high, 16.0)
+
+    def test_bounds_contain_sampled_results(self):
+        """Test results of random trees at random points lie within their bounds."""
+        rng = random.Random(7)
+        for seed in range(10):
+            expr = workloads.random_tree(60, seed=seed, multiplication_rate=0.5)
+            ranges = {}
+            for name in expr.free_variables():
+                a, b = rng.uniform(-10, 10), rng.uniform(-10, 10)
+                ranges[name] = (min(a, b), max(a, b))
+            low, high = bounds(expr, ranges)
+            for _ in range(20):
+                context = Context()
+                for name, (a, b) in ranges.items():
+                    context.set_variable(name, rng.uniform(a, b))
+                self.assertTrue(low <= expr.interpret(context) <= high)
+
+    def test_division_and_power(self):
+        """Test divisors spanning zero are unbounded and even powers are non-negative."""
+        self.assertEqual(bounds(Division(Constant(1), Variable("x")), {"x": (-1, 1)}), (-math.inf, math.inf))
+        low, high = bounds(Division(Constant(1), Variable("x")), {"x": (2, 4)})
+        self.assertTrue(low <= 0.25 and high >= 0.5)
+        for expr, ranges, value in ((parse("1e-300 / z"), {"z": (1e-310, 2e-310)}, 1e-300 / 1.5e-310),
+                                    (parse("z / z"), {"z": (1e-320, 1e-320)}, 1.0)):
+            with self.subTest(expr=str(expr)):
+                low, high = bounds(expr, ranges)
+                self.assertTrue(low <= value <= high)
+                self.assertLess(high, math.inf)
+        low, high = bounds(Power(Variable("x"), Constant(2)), {"x": (-3, 2)})
+        self.assertEqual(low, -5e-324)
+        self.assertGreaterEqual(high, 9.0)
+
+    def test_missing_range(self):
+        """Test variables without a range raise an InterpreterError."""
+        with self.assertRaises(VariableNotDefinedError):
+            bounds(parse("x + y"), {"x": (0, 1)})
+        self.assertTrue(issubclass(VariableNotDefinedError, InterpreterError))
+
+    def test_partition_pruning(self):
+        """Test partitions whose results cannot pass a filter are skipped."""
+        expr = parse("price * quantity")
+        partitions = [{"price": (1, 2), "quantity": (1, 10)},
+                      {"price": (50, 60), "quantity": (1, 10)},
+                      {"price": (1, 2), "quantity": (100, 200)}]
+        self.assertEqual(prune_partitions(expr, partitions, low=100), [1, 2])
+        self.assertFalse(may_satisfy(expr, partitions[0], low=100))
+
+    def test_column_ranges(self):
+        """Test column ranges, with empty and NaN columns unbounded."""
+        ranges = column_ranges({"x": [3.0, -1.0, 2.0], "y": [], "z": [1.0, math.nan]})
+        self.assertEqual(ranges["x"], (-1.0, 3.0))
+        self.assertEqual(ranges["y"], (-math.inf, math.inf))
+        self.assertEqual(ranges["z"], (-math.inf, math.inf))
+
+    def test_select_typecode(self):
+        """Test float32 is chosen only when nothing can overflow it."""
+        expr = parse("x * y")
+        self.assertEqual(select_typecode(expr, {"x": (-1e10, 1e10), "y": (0, 1e10)}), 'f')
+        self.assertEqual(select_typecode(expr, {"x": (-1e20, 1e20), "y": (0, 1e20)}), 'd')
+        self.assertEqual(select_typecode(parse("x / y"), {"x": (0, 1), "y": (-1, 1)}), 'd')
+        self.assertEqual(select_typecode(expr, {"x": (1, 3), "y": (1e-50, 3)}), 'd')
+        self.assertEqual(select_typecode(parse("x * x"), {"x": (-3, 3)}), 'f')
+
+    def test_fused_nodes(self):
+        """Test fused nodes are bounded through the operations they stand for."""
+        expr = parse("x * y + 1")
+        fused = fuse(expr)
+        self.assertIsNot(type(fused), type(expr))
+        ranges = {"x": (-2, 3), "y": (4, 5)}
+        self.assertEqual(bounds(fused, ranges), bounds(expr, ranges))
+        self.assertEqual(select_typecode(fused, {"x": (-1e20, 1e20), "y": (0, 1e20)}), 'd')
+
+    def test_float32_output_column(self):
+        """Test evaluate_columns writes float32 results when asked to."""
+        expr = parse("x * 2 + y")
+        columns = {"x": [1.0, 2.5, -3.0], "y": [0.5, 0.25, 1.0]}
+        typecode = select_typecode(expr, column_ranges(columns))
+        self.assertEqual(typecode, 'f')
+        with tempfile.TemporaryDirectory() as directory:
+            store = ColumnStore(directory)
+            for name, values in columns.items():
+                store.write(name, values)
+            output = os.path.join(directory, "out.f32")
+            self.assertEqual(evaluate_columns(expr, store, output, output_typecode=typecode), 3)
+            self.assertEqual(os.path.getsize(output), 12)
+            self.assertEqual(list(read_column(output, 'f')), [2.5, 5.25, -5.0])
+            with self.assertRaises(ValueError):
+                evaluate_columns(expr, store, output, output_typecode='i')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Tests for evaluation limits.
+"""
+
+import os
+import tempfile
+import unittest
+from math_interpreter.columnar import ColumnStore, evaluate_columns
+from math_interpreter.compiler import compile_expression
+from math_interpreter.context import Context
+from math_interpreter.exceptions import EvaluationLimitError, InterpreterError
+from math_interpreter.formulas import FormulaRegistry
+from math_interpreter.limits import EvaluationLimits
+from math_interpreter.multi_eval import evaluate_many
+from math_interpreter.non_terminal_expressions import Addition, Multiplication
+from math_interpreter.parallel import evaluate_parallel
+from math_interpreter.scenarios import evaluate_scenarios
+from math_interpreter.shortcircuit import ShortCircuitEvaluator
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+class TestEvaluationLimits(unittest.TestCase):
+    """Test cases for EvaluationLimits."""
+
+    def setUp(self):
+        """Set up a context and a small expression."""
+        self.context = Context()
+        self.context.set_variable("x", 2)
+        self.expr = Addition(Multiplication(Variable("x"), Constant(3)), Constant(1))
+
+    def test_node_count_and_depth_are_cached(self):
+        """Test node counts and depths, counting shared subtrees once per use."""
+        self.assertEqual(self.expr.node_count(), 5)
+        self.assertEqual(self.expr.depth(), 3)
+        shared = Addition(self.expr, self.expr)
+        self.assertEqual(shared.node_count(), 11)
+        self.assertEqual(shared.depth(), 4)
+        self.assertEqual(self.expr.__dict__['_node_count'], 5)
+
+    def test_within_limits(self):
+        """Test expressions within the limits evaluate normally."""
+        limits = EvaluationLimits(max_nodes=5, max_depth=3, max_steps=5)
+        self.assertEqual(limits.evaluate(self.expr, self.context), 7.0)
+
+    def test_each_limit_is_enforced(self):
+        """Test every limit raises the dedicated error, an InterpreterError."""
+        for limits in (EvaluationLimits(max_nodes=4), EvaluationLimits(max_depth=2)):
+            with self.subTest(limits=limits):
+                with self.assertRaises(EvaluationLimitError):
+                    limits.evaluate(self.expr, self.context)
+        self.assertTrue(issubclass(EvaluationLimitError, InterpreterError))
+
+    def test_step_limit_applies_without_compiling(self):
+        """Test the step limit counts node visits on every path that interprets."""
+        limits = EvaluationLimits(max_steps=4)
+        with self.assertRaises(EvaluationLimitError):
+            limits.evaluate(self.expr, self.context)
+        with self.assertRaises(EvaluationLimitError):
+            ShortCircuitEvaluator(limits).evaluate(self.expr, self.context)
+        self.assertIsInstance(evaluate_many([self.expr], self.context, limits=limits)[0], EvaluationLimitError)
+
+    def test_backends_apply_limits(self):
+        """Test every evaluation backend rejects expressions exceeding its limits."""
+        limits = EvaluationLimits(max_nodes=4)
+        with tempfile.TemporaryDirectory() as directory:
+            store = ColumnStore(directory)
+            store.write("x", [1.0, 2.0])
+            with self.assertRaises(EvaluationLimitError):
+                evaluate_columns(self.expr, store, os.path.join(directory, "out"), limits=limits)
+        with self.assertRaises(EvaluationLimitError):
+            evaluate_parallel(self.expr, self.context, limits=limits)
+        with self.assertRaises(EvaluationLimitError):
+            ShortCircuitEvaluator(limits).evaluate(self.expr, self.context)
+        with self.assertRaises(EvaluationLimitError):
+            evaluate_scenarios(self.expr, self.context, [{"x": 1}], limits=limits)
+        results = evaluate_many([self.expr, Variable("x")], self.context, limits=limits)
+        self.assertIsInstance(results[0], EvaluationLimitError)
+        self.assertEqual(results[1], 2)
+        registry = FormulaRegistry(self.context)
+        registry.define("total", self.expr)
+        with self.assertRaises(EvaluationLimitError):
+            registry.recalculate(limits)
+        self.assertTrue(registry.is_dirty("total"))
+
+    def test_deep_tree_rejected_without_recursion(self):
+        """Test a tree deeper than the recursion limit is rejected before evaluation."""
+        expr = Variable("x")
+        for _ in range(10000):
+            expr = Addition(expr, Constant(1))
+        with self.assertRaises(EvaluationLimitError):
+            EvaluationLimits(max_depth=1000).check(expr)
+
+    def test_compile_checks_program_steps(self):
+        """Test the step limit applies to the compiled program, after optimization."""
+        expr = Addition(Multiplication(Constant(2), Constant(3)), Variable("x"))
+        program = compile_expression(expr, limits=EvaluationLimits(max_steps=3))
+        self.assertEqual(program.run(self.context), 8.0)
+        with self.assertRaises(EvaluationLimitError):
+            compile_expression(expr, limits=EvaluationLimits(max_steps=2))
+        with self.assertRaises(EvaluationLimitError):
+            compile_expression(expr, limits=EvaluationLimits(max_depth=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Tests for linear-form detection and evaluation.
+"""
+
+import unittest
+from array import array
+from math_interpreter.compiler import compile_expression
+from math_interpreter.context import Context
+from math_interpreter.exceptions import VariableNotDefinedError
+from math_interpreter.fusion import fuse
+from math_interpreter.linear import LinearForm, LinearSystem, linear_form
+from math_interpreter.parser import parse
+from math_interpreter import workloads
+
+
+class TestLinearForm(unittest.TestCase):
+    """Test cases for linear_form and LinearForm."""
+
+    def setUp(self):
+        """Set up a context for testing."""
+        self.context = Context()
+        self.context.set_variable("x", 2)
+        self.context.set_variable("y", 5)
+
+    def test_linear_expressions(self):
+        """Test linear expressions reduce to their coefficients and intercept."""
+        cases = {
+            "2 * x + 3 * y - 4": ({"x": 2.0, "y": 3.0}, -4.0),
+            "(x + y) * 3 / 2 - x": ({"x": 0.5, "y": 1.5}, 0.0),
+            "(2 + 3) * x - y ^ 1 + 2 ^ 3": ({"x": 5.0, "y": -1.0}, 8.0),
+            "7": ({}, 7.0),
+            "x * 0": ({"x": 0.0}, 0.0),
+        }
+        for text, (coefficients, intercept) in cases.items():
+            with self.subTest(text=text):
+                form = linear_form(parse(text))
+                self.assertEqual(dict(zip(form.names, form.coefficients)), coefficients)
+                self.assertEqual(form.intercept, intercept)
+                self.assertEqual(form.evaluate(self.context), parse(text).interpret(self.context))
+
+    def test_nonlinear_expressions(self):
+        """Test nonlinear or failing expressions are not reduced."""
+        for text in ("x * y", "x / y", "x ^ 2", "2 ^ x", "x / 0", "x / (1 - 1)", "x + 1 / 0"):
+            with self.subTest(text=text):
+                self.assertIsNone(linear_form(parse(text)))
+
+    def test_fused_and_generated_trees(self):
+        """Test fused nodes and generated sums are recognised."""
+        expr = workloads.wide_sum(50, seed=4)
+        context = workloads.random_context(workloads.variable_names(8), seed=4)
+        for tree in (expr, fuse(expr)):
+            form = linear_form(tree)
+            self.assertAlmostEqual(form.evaluate(context), expr.interpret(context))
+
+    def test_shared_subtrees_are_reduced_once(self):
+        """Test a DAG that expands to 2 ** 60 nodes is reduced in linear time."""
+        expr = workloads.shared_subexpressions(60, seed=1, multiplication_rate=0.0)
+        context = workloads.random_context(workloads.variable_names(8), seed=1)
+        expected = compile_expression(expr).run(context)
+        self.assertAlmostEqual(linear_form(expr).evaluate(context), expected, delta=abs(expected) * 1e-9)
+
+    def test_undefined_variable(self):
+        """Test evaluation still requires every variable, even with a zero coefficient."""
+        form = linear_form(parse("x + 0 * z"))
+        with self.assertRaises(VariableNotDefinedError):
+            form.evaluate(self.context)
+
+    def test_evaluate_batch(self):
+        """Test a form evaluates over columns."""
+        form = LinearForm({"x": 2.0, "y": -1.0}, 1.0)
+        self.assertEqual(form.evaluate_batch({"x": [1, 2], "y": [3, 0]}, 2), [0.0, 5.0])
+        self.assertEqual(len(form), 2)
+
+
+class TestLinearSystem(unittest.TestCase):
+    """Test cases for LinearSystem."""
+
+    def setUp(self):
+        """Set up a system of three forms."""
+        self.system = LinearSystem([
+            linear_form(parse("2 * x + 1")),
+            linear_form(parse("y - x")),
+            linear_form(parse("3")),
+        ])
+
+    def test_matrix(self):
+        """Test the forms are stacked over the union of their variables."""
+        self.assertEqual(self.system.names, ("x", "y"))
+        self.assertEqual([list(row) for row in self.system.matrix()], [[2.0, 0.0], [-1.0, 1.0], [0.0, 0.0]])
+        self.assertEqual(list(self.system.intercepts), [1.0, 0.0, 3.0])
+
+    def test_evaluate(self):
+        """Test every form is evaluated against one context."""
+        context = Context()
+        context.set_variable("x", 2)
+        context.set_variable("y", 5)
+        self.assertEqual(self.system.evaluate(context), [5.0, 3.0, 3.0])
+
+    def test_evaluate_batch(self):
+        """Test every form is evaluated over columns of any sequence type."""
+        expected = [[3.0, 5.0], [1.0, -2.0], [3.0, 3.0]]
+        columns = {"x": [1.0, 2.0], "y": [2.0, 0.0]}
+        self.assertEqual(self.system.evaluate_batch(columns, 2), expected)
+        typed = {name: array('d', values) for name, values in columns.items()}
+        self.assertEqual([list(row) for row in self.system.evaluate_batch(typed, 2)], expected)
+        with self.assertRaises(VariableNotDefinedError):
+            self.system.evaluate_batch({"x": [1.0]}, 1)
+
+    def test_evaluate_batch_short_columns(self):
+        """Test columns shorter than the row count are rejected by every path."""
+        columns = {"x": [1.0, 2.0], "y": [2.0]}
+        with self.assertRaises(ValueError):
+            self.system.evaluate_batch(columns, 2)
+        typed = {name: array('d', values) for name, values in columns.items()}
+        with self.assertRaises(ValueError):
+            self.system.evaluate_batch(typed, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
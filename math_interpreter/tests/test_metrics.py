@@ -0,0 +1,145 @@
+"""
+Tests for the metrics registry and library instrumentation.
+"""
+
+import tempfile
+import threading
+import unittest
+from math_interpreter import metrics
+from math_interpreter.cache import ExpressionCache
+from math_interpreter.compiler import compile_expression
+from math_interpreter.context import Context
+from math_interpreter.exceptions import VariableNotDefinedError
+from math_interpreter.limits import EvaluationLimits
+from math_interpreter.multi_eval import evaluate_many
+from math_interpreter.parser import parse
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for MetricsRegistry."""
+
+    def setUp(self):
+        """Set up an empty registry."""
+        self.registry = metrics.MetricsRegistry()
+
+    def test_counters_are_shared_by_name_and_labels(self):
+        """Test asking for a metric twice returns the same metric."""
+        counter = self.registry.counter("hits_total", "Hits", cache="a")
+        self.assertIs(self.registry.counter("hits_total", cache="a"), counter)
+        self.assertIsNot(self.registry.counter("hits_total", cache="b"), counter)
+        with self.assertRaises(ValueError):
+            self.registry.histogram("hits_total", cache="a")
+
+    def test_render_prometheus_text(self):
+        """Test the text exposition format of counters, gauges and histograms."""
+        self.registry.counter("hits_total", "Hits", cache="a").inc(3)
+        self.registry.gauge("size", lambda: 7)
+        self.registry.histogram("latency_seconds", buckets=(0.1, 1.0), entry="x").observe(0.5)
+        text = self.registry.render()
+        self.assertIn("# HELP hits_total Hits\n# TYPE hits_total counter\n", text)
+        self.assertIn('hits_total{cache="a"} 3\n', text)
+        self.assertIn("size 7\n", text)
+        self.assertIn('latency_seconds_bucket{entry="x",le="0.1"} 0\n', text)
+        self.assertIn('latency_seconds_bucket{entry="x",le="1.0"} 1\n', text)
+        self.assertIn('latency_seconds_count{entry="x"} 1\n', text)
+
+    def test_snapshot(self):
+        """Test the snapshot dictionary."""
+        self.registry.counter("hits_total").inc()
+        self.registry.histogram("latency_seconds", buckets=(1.0,)).observe(2.0)
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot["hits_total"], 1)
+        self.assertEqual(snapshot["latency_seconds"]["count"], 1)
+        self.assertEqual(snapshot["latency_seconds"]["buckets"][1.0], 0)
+
+    def test_counter_is_thread_safe(self):
+        """Test concurrent increments are not lost."""
+        counter = self.registry.counter("events_total")
+
+        def work():
+            for _ in range(10000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.value, 40000)
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for metrics recorded by library entry points."""
+
+    def setUp(self):
+        """Enable recording into a fresh registry."""
+        self.registry = metrics.enable()
+        self.context = Context()
+        self.context.set_variable("x", 2)
+
+    def tearDown(self):
+        """Disable recording."""
+        metrics.disable()
+
+    def test_entry_points_record_calls_sizes_and_errors(self):
+        """Test evaluation counts, tree sizes and error rates are recorded."""
+        evaluate_many([parse("x + 1"), parse("x + missing")], self.context)
+        compile_expression(parse("x * 3"))
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot['math_interpreter_evaluations_total{entry="evaluate_many"}'], 1)
+        self.assertEqual(snapshot['math_interpreter_evaluation_errors_total{type="VariableNotDefinedError"}'], 1)
+        self.assertEqual(snapshot['math_interpreter_tree_nodes{entry="compile_expression"}']['sum'], 3)
+        self.assertEqual(
+            snapshot['math_interpreter_evaluation_seconds{entry="compile_expression"}']['count'], 1)
+
+    def test_interpret_errors_are_counted_once(self):
+        """Test undefined variables in plain interpret calls are counted, once per error."""
+        expression = parse("x + missing")
+        with self.assertRaises(VariableNotDefinedError):
+            expression.interpret(self.context)
+        with self.assertRaises(VariableNotDefinedError):
+            EvaluationLimits().evaluate(expression, self.context)
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot['math_interpreter_evaluation_errors_total{type="VariableNotDefinedError"}'], 2)
+
+    def test_latency_and_size_are_sampled(self):
+        """Test every call is counted while latency and size are observed on samples."""
+        expression = parse("x * 3")
+        for _ in range(metrics.SAMPLE_INTERVAL + 1):
+            compile_expression(expression)
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot['math_interpreter_evaluations_total{entry="compile_expression"}'],
+                         metrics.SAMPLE_INTERVAL + 1)
+        self.assertEqual(snapshot['math_interpreter_tree_nodes{entry="compile_expression"}']['count'], 2)
+        self.assertEqual(
+            snapshot['math_interpreter_evaluation_seconds{entry="compile_expression"}']['count'], 2)
+
+    def test_entry_points_follow_the_active_registry(self):
+        """Test an entry point records into whichever registry is active."""
+        compile_expression(parse("x * 3"))
+        other = metrics.enable()
+        compile_expression(parse("x * 3"))
+        key = 'math_interpreter_evaluations_total{entry="compile_expression"}'
+        self.assertEqual(self.registry.snapshot()[key], 1)
+        self.assertEqual(other.snapshot()[key], 1)
+
+    def test_cache_hits(self):
+        """Test expression cache lookups are counted as hits and misses."""
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ExpressionCache(directory)
+            cache.get_or_compile(parse("x + 1"))
+            cache.get_or_compile(parse("x + 1"))
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot['math_interpreter_cache_requests_total{cache="expression",result="hit"}'], 1)
+        self.assertEqual(snapshot['math_interpreter_cache_requests_total{cache="expression",result="miss"}'], 1)
+
+    def test_disabled_records_nothing(self):
+        """Test nothing is recorded while metrics are disabled."""
+        metrics.disable()
+        evaluate_many([parse("x + 1")], self.context)
+        self.assertIsNone(metrics.active())
+        self.assertEqual(self.registry.snapshot(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Tests for evaluating many expressions against one context.
+"""
+
+import unittest
+from math_interpreter.context import Context
+from math_interpreter.exceptions import DivisionByZeroError, VariableNotDefinedError
+from math_interpreter.multi_eval import evaluate_many, resolve_variables
+from math_interpreter.non_terminal_expressions import Addition, Division, Multiplication
+from math_interpreter.parser import parse
+from math_interpreter.terminal_expressions import Constant, Variable
+from math_interpreter import workloads
+
+
+class _CountingContext(Context):
+    """A context that counts variable lookups."""
+
+    def __init__(self):
+        super().__init__()
+        self.lookups = 0
+
+    def get_variable(self, name):
+        self.lookups += 1
+        return super().get_variable(name)
+
+
+class TestEvaluateMany(unittest.TestCase):
+    """Test cases for evaluate_many."""
+
+    def setUp(self):
+        """Set up a counting context for testing."""
+        self.context = _CountingContext()
+        self.context.set_variable("x", 4)
+        self.context.set_variable("y", 2)
+
+    def test_results_in_input_order(self):
+        """Test results match interpret and keep the input order."""
+        expressions = [parse("x + y"), parse("x * y"), parse("x / y"), Constant(7)]
+        self.assertEqual(evaluate_many(expressions, self.context), [6.0, 8.0, 2.0, 7.0])
+
+    def test_each_variable_resolved_once(self):
+        """Test every variable is looked up once, however many expressions read it."""
+        expressions = [Addition(Variable("x"), Constant(i)) for i in range(300)]
+        expressions.append(Multiplication(Variable("x"), Variable("y")))
+        results = evaluate_many(expressions, self.context)
+        self.assertEqual(results[299], 303.0)
+        self.assertEqual(self.context.lookups, 2)
+        self.assertEqual(resolve_variables(expressions, self.context), {"x": 4, "y": 2})
+
+    def test_errors_reported_per_expression(self):
+        """Test failing expressions report their error without stopping the batch."""
+        expressions = [parse("x + missing"), Division(Variable("x"), Constant(0)), parse("x - y")]
+        results = evaluate_many(expressions, self.context)
+        self.assertIsInstance(results[0], VariableNotDefinedError)
+        self.assertIsInstance(results[1], DivisionByZeroError)
+        self.assertEqual(results[2], 2.0)
+
+    def test_matches_interpret_on_random_trees(self):
+        """Test random expressions with shared subtrees give interpret's results."""
+        expressions = [workloads.random_tree(200, seed=seed, repetition_rate=0.2) for seed in range(20)]
+        names = sorted(set().union(*(expression.free_variables() for expression in expressions)))
+        context = workloads.random_context(names, seed=4)
+        for expression, result in zip(expressions, evaluate_many(expressions, context)):
+            self.assertEqual(result, expression.interpret(context))
+
+    def test_empty(self):
+        """Test an empty batch gives no results."""
+        self.assertEqual(evaluate_many([], self.context), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,9 +8,9 @@ This module contains comprehensive tests for the non-terminal expressions
 
 import unittest
 from math_interpreter.terminal_expressions import Constant, Variable
-from math_interpreter.non_terminal_expressions import Addition, Multiplication
+from math_interpreter.non_terminal_expressions import Addition, Multiplication, Subtraction, Division, Power
 from math_interpreter.context import Context
-from math_interpreter.exceptions import VariableNotDefinedError
+from math_interpreter.exceptions import VariableNotDefinedError, DivisionByZeroError
 
 
 class TestAddition(unittest.TestCase):
@@ -326,5 +326,44 @@ class TestMixedOperations(unittest.TestCase):
         self.assertEqual(str(expr), "((x + y) * (a + b))")
 
 
+class TestRegisteredOperations(unittest.TestCase):
+    """Test cases for Subtraction, Division and Power."""
+
+    def setUp(self):
+        """Set up a context with common variables for testing."""
+        self.context = Context()
+        self.context.set_variable("x", 8)
+        self.context.set_variable("y", 2)
+
+    def test_subtraction(self):
+        """Test Subtraction evaluates and renders with '-'."""
+        expr = Subtraction(Variable("x"), Constant(3))
+        self.assertEqual(expr.interpret(self.context), 5.0)
+        self.assertEqual(str(expr), "(x - 3)")
+
+    def test_division(self):
+        """Test Division evaluates and renders with '/'."""
+        expr = Division(Variable("x"), Variable("y"))
+        self.assertEqual(expr.interpret(self.context), 4.0)
+        self.assertEqual(str(expr), "(x / y)")
+
+    def test_division_by_zero(self):
+        """Test Division by zero raises DivisionByZeroError."""
+        with self.assertRaises(DivisionByZeroError):
+            Division(Variable("x"), Constant(0)).interpret(self.context)
+
+    def test_power(self):
+        """Test Power evaluates and renders with '^'."""
+        expr = Power(Variable("y"), Constant(3))
+        self.assertEqual(expr.interpret(self.context), 8.0)
+        self.assertEqual(str(expr), "(y ^ 3)")
+
+    def test_mixed_with_addition(self):
+        """Test new operations nest with Addition and Multiplication."""
+        expr = Addition(Multiplication(Variable("x"), Constant(2)), Division(Variable("x"), Variable("y")))
+        self.assertEqual(expr.interpret(self.context), 20.0)
+        self.assertEqual(str(expr), "((x * 2) + (x / y))")
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""
+Tests for the operator registry.
+"""
+
+import math
+import pickle
+import unittest
+from math_interpreter.compiler import compile_expression
+from math_interpreter.context import Context
+from math_interpreter.exceptions import DivisionByZeroError, InvalidExpressionError
+from math_interpreter.non_terminal_expressions import BinaryOperation, Division, Power, Subtraction
+from math_interpreter.operators import (
+    ADDITION, MULTIPLICATION, Operator, get_operator, operator_for, operators, register_operator,
+)
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+def _maximum(a, b):
+    return a if a >= b else b
+
+
+MAXIMUM = register_operator(Operator('max', 'max', _maximum, kernel='maximum',
+                                     commutative=True, associative=True))
+
+
+class Maximum(BinaryOperation):
+    """The larger of two operands, used to test operator extensibility."""
+
+    operator = MAXIMUM
+
+
+class TestOperators(unittest.TestCase):
+    """Test cases for operator declarations and lookup."""
+
+    def test_builtin_operators_are_registered(self):
+        """Test the five built-in operators are in the registry."""
+        self.assertEqual(list(operators())[:5], ['add', 'mul', 'sub', 'div', 'pow'])
+        self.assertIs(get_operator('add'), ADDITION)
+        self.assertEqual(MULTIPLICATION.identity, 1.0)
+        self.assertEqual(MULTIPLICATION.absorbing, 0.0)
+        self.assertIsNone(ADDITION.absorbing)
+
+    def test_unknown_and_conflicting_operators(self):
+        """Test lookup of unknown operators and duplicate registration fail."""
+        with self.assertRaises(InvalidExpressionError):
+            get_operator('modulo')
+        with self.assertRaises(InvalidExpressionError):
+            register_operator(Operator('plus', '+', _maximum))
+
+    def test_operator_for(self):
+        """Test operator_for returns the operator of binary nodes only."""
+        self.assertIs(operator_for(Subtraction(Constant(1), Constant(2))), get_operator('sub'))
+        self.assertIsNone(operator_for(Variable("x")))
+
+    def test_apply_broadcasts_lists(self):
+        """Test apply combines lists element by element and broadcasts scalars."""
+        self.assertEqual(ADDITION.apply([1.0, 2.0], [3.0, 4.0]), [4.0, 6.0])
+        self.assertEqual(MULTIPLICATION.apply(2.0, [3.0, 4.0]), [6.0, 8.0])
+        self.assertEqual(ADDITION.apply(1.0, 2.0), 3.0)
+
+    def test_scalar_edge_cases(self):
+        """Test division and power edge cases."""
+        with self.assertRaises(DivisionByZeroError):
+            get_operator('div').scalar(1.0, 0.0)
+        with self.assertRaises(DivisionByZeroError):
+            get_operator('pow').scalar(0.0, -1.0)
+        self.assertTrue(math.isnan(get_operator('pow').scalar(-8.0, 0.5)))
+
+    def test_operators_pickle_by_name(self):
+        """Test operators round-trip through pickle as the registered instance."""
+        self.assertIs(pickle.loads(pickle.dumps(ADDITION)), ADDITION)
+
+    def test_new_operator_works_in_every_backend(self):
+        """Test a registered operator works in interpret and compiled programs."""
+        context = Context()
+        context.set_variable("x", 3)
+        expr = Maximum(Variable("x"), Power(Constant(2), Constant(2)))
+        self.assertEqual(str(expr), "(x max (2 ^ 2))")
+        self.assertEqual(expr.interpret(context), 4.0)
+        self.assertEqual(compile_expression(expr).run(context), 4.0)
+
+    def test_compile_does_not_fold_errors(self):
+        """Test constant folding leaves failing operations to run time."""
+        program = compile_expression(Division(Constant(1), Constant(0)))
+        with self.assertRaises(DivisionByZeroError):
+            program.run(Context())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Tests for the lazily loaded package namespace.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+import math_interpreter
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Modules that only optional features may import.
+HEAVY_MODULES = (
+    "concurrent.futures", "hashlib", "http.server", "mmap", "multiprocessing",
+    "numpy", "pickle", "socketserver", "tempfile", "threading",
+    "math_interpreter.cache", "math_interpreter.compiler", "math_interpreter.parallel",
+    "math_interpreter.server",
+)
+
+
+def _imported_modules(code: str):
+    """Run code in a fresh interpreter and return the heavy modules it imported."""
+    script = code + (
+        "\nimport json, sys"
+        f"\nprint(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))"
+    )
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+class TestPackage(unittest.TestCase):
+    """Test cases for lazy attribute loading of the package."""
+
+    def test_every_export_resolves(self):
+        """Test every name in __all__ loads from its submodule."""
+        for name in math_interpreter.__all__:
+            with self.subTest(name=name):
+                self.assertIs(getattr(math_interpreter, name), getattr(math_interpreter, name))
+        self.assertIn("parse", dir(math_interpreter))
+
+    def test_unknown_attribute(self):
+        """Test unknown names raise AttributeError."""
+        with self.assertRaises(AttributeError):
+            math_interpreter.no_such_name
+
+    def test_import_is_light(self):
+        """Test importing the package and evaluating a formula loads no heavy modules."""
+        self.assertEqual(_imported_modules("import math_interpreter"), [])
+        code = ("from math_interpreter import Context, parse\n"
+                "context = Context()\n"
+                "context.set_variable('x', 2)\n"
+                "assert parse('x * 2 + 1').interpret(context) == 5.0")
+        self.assertEqual(_imported_modules(code), [])
+
+    def test_rebalance_is_the_function_in_any_import_order(self):
+        """Test importing the rebalance submodule does not replace the rebalance function."""
+        for code in ("import math_interpreter.rebalance\nfrom math_interpreter import rebalance",
+                     "from math_interpreter import rebalance\nimport math_interpreter.rebalance",
+                     "import math_interpreter.builder\nfrom math_interpreter import rebalance"):
+            with self.subTest(code=code):
+                subprocess.run([sys.executable, "-c", code + "\nassert callable(rebalance), rebalance"
+                                "\nimport math_interpreter\nassert callable(math_interpreter.rebalance)"],
+                               cwd=ROOT, check=True, capture_output=True)
+
+    def test_features_import_their_dependencies(self):
+        """Test an optional feature loads its dependencies when first used."""
+        imported = _imported_modules("from math_interpreter import evaluate_parallel")
+        self.assertIn("concurrent.futures", imported)
+        self.assertIn("math_interpreter.parallel", imported)
+
+
+if __name__ == "__main__":
+    unittest.main()
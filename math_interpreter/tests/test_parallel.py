@@ -0,0 +1,105 @@
+"""
+Tests for parallel evaluation of large expression trees.
+"""
+
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from math_interpreter.exceptions import VariableNotDefinedError
+from math_interpreter.fusion import fuse
+from math_interpreter.non_terminal_expressions import Addition
+from math_interpreter.parallel import evaluate_parallel, partition
+from math_interpreter.rebalance import rebalance
+from math_interpreter.terminal_expressions import Constant, Variable
+from math_interpreter.workloads import left_chain, random_context, random_tree, variable_names
+
+
+class TestParallel(unittest.TestCase):
+    """Test cases for evaluate_parallel and tree partitioning."""
+
+    def setUp(self):
+        """Build a random tree and a matching context."""
+        self.expr = random_tree(4001, variable_count=10, seed=5, multiplication_rate=0.2)
+        self.context = random_context(variable_names(10), seed=5, low=-1, high=1)
+        self.expected = self.expr.interpret(self.context)
+
+    def test_partition_cuts_even_subtrees(self):
+        """Test every subtree holds at most an even share of the nodes, largest first."""
+        tasks = partition(self.expr, 16)
+        sizes = [task.node_count() for task in tasks]
+        self.assertLessEqual(sizes[0], -(-self.expr.node_count() // 16))
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+        self.assertEqual(len({id(task) for task in tasks}), len(tasks))
+
+    def test_partition_lists_shared_subtrees_once(self):
+        """Test a subtree shared by several parents becomes one task."""
+        shared = Addition(Variable("x0"), Constant(1))
+        self.assertEqual(partition(Addition(shared, shared), 2), [shared])
+
+    def test_chain_is_serial(self):
+        """Test a chain that cannot be cut evenly is evaluated without an executor."""
+        chain = left_chain(400, variable_count=10, seed=3, multiplication_rate=0.0)
+        tasks = partition(chain, 16)
+        self.assertGreater(tasks[0].node_count() * 2, chain.node_count())
+        executor = ThreadPoolExecutor(max_workers=1)
+        executor.shutdown()
+        result = evaluate_parallel(chain, self.context, serial_threshold=100, executor=executor)
+        self.assertEqual(result, chain.interpret(self.context))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            result = evaluate_parallel(rebalance(chain), self.context, serial_threshold=100,
+                                       executor=executor)
+        self.assertAlmostEqual(result, chain.interpret(self.context))
+
+    def test_fused_nodes_are_split(self):
+        """Test fused nodes are measured, partitioned and evaluated through their operands."""
+        fused = fuse(self.expr)
+        tasks = partition(fused, 8)
+        self.assertLessEqual(tasks[0].node_count(), -(-fused.node_count() // 8))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            result = evaluate_parallel(fused, self.context, serial_threshold=300, executor=executor)
+        self.assertAlmostEqual(result, self.expected)
+
+    def test_matches_serial_with_threads(self):
+        """Test the parallel result matches serial evaluation."""
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            result = evaluate_parallel(self.expr, self.context, serial_threshold=300, executor=executor)
+        self.assertAlmostEqual(result, self.expected)
+
+    def test_matches_serial_with_processes(self):
+        """Test subtrees shipped to worker processes give the serial result."""
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            result = evaluate_parallel(self.expr, self.context, serial_threshold=500, executor=executor)
+        self.assertAlmostEqual(result, self.expected)
+
+    def test_matches_serial_with_owned_pool(self):
+        """Test a pool created for the call gives the serial result."""
+        result = evaluate_parallel(self.expr, self.context, max_workers=2, serial_threshold=500)
+        self.assertAlmostEqual(result, self.expected)
+
+    def test_deep_tree(self):
+        """Test subtrees too deep to interpret recursively are still evaluated."""
+        expr = Variable("x0")
+        for index in range(20000):
+            expr = Addition(expr, Constant(index % 3))
+        expected = sum(index % 3 for index in range(20000)) + self.context.get_variable("x0")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            result = evaluate_parallel(expr, self.context, serial_threshold=100, executor=executor)
+        self.assertAlmostEqual(result, expected)
+        self.assertAlmostEqual(evaluate_parallel(expr, self.context), expected)
+
+    def test_small_tree_is_serial(self):
+        """Test trees below the threshold are evaluated without an executor."""
+        executor = ThreadPoolExecutor(max_workers=1)
+        executor.shutdown()
+        result = evaluate_parallel(self.expr, self.context, serial_threshold=10000, executor=executor)
+        self.assertEqual(result, self.expected)
+
+    def test_undefined_variable(self):
+        """Test undefined variables are reported before any task is shipped."""
+        expr = Addition(self.expr, Variable("missing"))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            with self.assertRaises(VariableNotDefinedError):
+                evaluate_parallel(expr, self.context, serial_threshold=300, executor=executor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Tests for the formula parser.
+"""
+
+import unittest
+from math_interpreter.context import Context
+from math_interpreter.exceptions import InvalidExpressionError
+from math_interpreter.parser import parse
+from math_interpreter.rebalance import tree_depth
+from math_interpreter.workloads import random_tree
+
+
+class TestParser(unittest.TestCase):
+    """Test cases for parse."""
+
+    def setUp(self):
+        """Set up a context with common variables for testing."""
+        self.context = Context()
+        self.context.set_variable("x", 5)
+        self.context.set_variable("y", 3)
+
+    def test_precedence(self):
+        """Test multiplication binds tighter than addition and power tightest."""
+        self.assertEqual(str(parse("x + y * 2")), "(x + (y * 2))")
+        self.assertEqual(str(parse("2 * (x + y) ^ 2")), "(2 * ((x + y) ^ 2))")
+        self.assertEqual(parse("x + y * 2").interpret(self.context), 11.0)
+
+    def test_associativity(self):
+        """Test subtraction is left-associative and power right-associative."""
+        self.assertEqual(str(parse("x - y - 1")), "((x - y) - 1)")
+        self.assertEqual(str(parse("x ^ y ^ 2")), "(x ^ (y ^ 2))")
+
+    def test_negative_numbers_and_negation(self):
+        """Test negative literals and unary minus."""
+        self.assertEqual(str(parse("-5 + 3")), "(-5 + 3)")
+        self.assertEqual(str(parse("2 * -x")), "(2 * (-1 * x))")
+        self.assertEqual(parse("-x ^ 2").interpret(self.context), -25.0)
+
+    def test_numbers(self):
+        """Test decimal and exponent notation."""
+        self.assertEqual(parse("1e-05 + .5").interpret(self.context), 0.50001)
+
+    def test_variables_are_shared(self):
+        """Test repeated names share one Variable node."""
+        expr = parse("x * x")
+        self.assertIs(expr.left, expr.right)
+
+    def test_round_trip(self):
+        """Test parsing a rendered tree gives back the same rendering."""
+        expr = random_tree(501, seed=3)
+        self.assertEqual(str(parse(str(expr))), str(expr))
+
+    def test_deep_nesting_without_recursion(self):
+        """Test formulas nested deeper than the recursion limit parse."""
+        text = "(" * 3000 + "x" + " + 1)" * 3000
+        self.assertEqual(tree_depth(parse(text)), 3001)
+
+    def test_malformed_formulas(self):
+        """Test malformed formulas raise InvalidExpressionError."""
+        for text in ["", "(x", "x)", "x +", "* x", "x y", "3 $ 4", "()"]:
+            with self.subTest(text=text):
+                with self.assertRaises(InvalidExpressionError):
+                    parse(text)
+
+
+if __name__ == "__main__":
+    unittest.main()
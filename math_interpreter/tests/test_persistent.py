@@ -0,0 +1,85 @@
+"""
+Tests for persistent structural updates.
+"""
+
+import unittest
+from math_interpreter.compiler import structural_key
+from math_interpreter.context import Context
+from math_interpreter.exceptions import InvalidExpressionError
+from math_interpreter.non_terminal_expressions import Addition, Multiplication
+from math_interpreter.persistent import find_paths, node_at, replace
+from math_interpreter.terminal_expressions import Constant, Variable
+from math_interpreter import workloads
+
+
+class TestReplace(unittest.TestCase):
+    """Test cases for replace, node_at and find_paths."""
+
+    def setUp(self):
+        """Set up a context and an expression ((x * 0.3) + (y * 0.7))."""
+        self.context = Context()
+        self.context.set_variable("x", 10)
+        self.context.set_variable("y", 20)
+        self.left = Multiplication(Variable("x"), Constant(0.3))
+        self.right = Multiplication(Variable("y"), Constant(0.7))
+        self.expr = Addition(self.left, self.right)
+
+    def test_replace_by_path(self):
+        """Test replacing one coefficient copies only its ancestors."""
+        updated = replace(self.expr, (0, 1), Constant(0.5))
+        self.assertEqual(str(updated), "((x * 0.5) + (y * 0.7))")
+        self.assertIs(updated.right, self.right)
+        self.assertIs(updated.left.left, self.left.left)
+        self.assertEqual(str(self.expr), "((x * 0.3) + (y * 0.7))")
+        self.assertEqual(updated.interpret(self.context), 19.0)
+
+    def test_replace_by_predicate(self):
+        """Test replacing every matching subtree, with a replacement function."""
+        updated = replace(self.expr, lambda node: isinstance(node, Variable),
+                          lambda node: Variable(node.name.upper()))
+        self.assertEqual(str(updated), "((X * 0.3) + (Y * 0.7))")
+        self.assertIs(replace(self.expr, lambda node: False, Constant(0)), self.expr)
+
+    def test_with_children(self):
+        """Test with_children returns the node itself when nothing changes."""
+        self.assertIs(self.expr.with_children((self.left, self.right)), self.expr)
+        swapped = self.expr.with_children((self.right, self.left))
+        self.assertIsInstance(swapped, Addition)
+        self.assertIs(Variable("x").with_children(()).__class__, Variable)
+        with self.assertRaises(InvalidExpressionError):
+            self.expr.with_children((self.left,))
+
+    def test_paths(self):
+        """Test node_at and find_paths agree."""
+        paths = find_paths(self.expr, lambda node: isinstance(node, Constant))
+        self.assertEqual(paths, [(0, 1), (1, 1)])
+        self.assertEqual(node_at(self.expr, (1, 1)).value, 0.7)
+        with self.assertRaises(InvalidExpressionError):
+            node_at(self.expr, (0, 2))
+        with self.assertRaises(InvalidExpressionError):
+            replace(self.expr, (0, 0, 0), Constant(1))
+
+    def test_cached_metadata_is_reused(self):
+        """Test shared subtrees keep their cached metadata in the updated tree."""
+        expr = workloads.random_tree(2000, seed=5)
+        structural_key(expr)
+        expr.free_variables()
+        path = find_paths(expr, lambda node: isinstance(node, Variable))[0]
+        updated = replace(expr, path, Variable("fresh"))
+        reused = sum(1 for child in updated.children() if '_structural_digest' in child.__dict__)
+        self.assertGreaterEqual(reused, 1)
+        self.assertIn("fresh", updated.free_variables())
+        self.assertNotEqual(structural_key(updated), structural_key(expr))
+
+    def test_deep_path(self):
+        """Test replacing at the bottom of a chain deeper than the recursion limit."""
+        expr = Variable("x")
+        for _ in range(5000):
+            expr = Addition(expr, Constant(1))
+        updated = replace(expr, (0,) * 5000, Constant(0))
+        self.assertEqual(node_at(updated, (0,) * 5000).value, 0.0)
+        self.assertIs(updated.right, expr.right)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for tree rebalancing by reassociation.
+"""
+
+import unittest
+from math_interpreter.compiler import compile_expression
+from math_interpreter.context import Context
+from math_interpreter.fusion import MultiplyAdd
+from math_interpreter.non_terminal_expressions import Addition, Multiplication, Subtraction
+from math_interpreter.rebalance import balanced_product, balanced_sum, rebalance, tree_depth
+from math_interpreter.terminal_expressions import Constant, Variable
+from math_interpreter import workloads
+
+
+class TestRebalance(unittest.TestCase):
+    """Test cases for rebalance and the balanced builders."""
+
+    def setUp(self):
+        """Set up a context with common variables for testing."""
+        self.context = Context()
+        self.context.set_variable("a", 1)
+        self.context.set_variable("b", 2)
+        self.context.set_variable("c", 3)
+        self.context.set_variable("d", 4)
+
+    def test_rebalance_addition_chain(self):
+        """Test a folded sum becomes balanced with the same operand order."""
+        expr = Addition(Addition(Addition(Variable("a"), Variable("b")), Variable("c")), Variable("d"))
+        balanced = rebalance(expr)
+        self.assertEqual(str(balanced), "((a + b) + (c + d))")
+        self.assertEqual(balanced.interpret(self.context), 10.0)
+        self.assertEqual(tree_depth(expr), 4)
+        self.assertEqual(tree_depth(balanced), 3)
+
+    def test_rebalance_mixed_chains(self):
+        """Test sums and products are rebalanced independently."""
+        product = Multiplication(Multiplication(Multiplication(Variable("a"), Variable("b")), Variable("c")),
+                                 Variable("d"))
+        expr = Addition(Addition(product, Constant(1)), Constant(2))
+        balanced = rebalance(expr)
+        self.assertEqual(str(balanced), "((((a * b) * (c * d)) + 1) + 2)")
+        self.assertEqual(balanced.interpret(self.context), expr.interpret(self.context))
+
+    def test_balanced_subtree_is_shared(self):
+        """Test subtrees that need no change are returned as the same objects."""
+        inner = Addition(Variable("a"), Variable("b"))
+        expr = Multiplication(inner, Variable("c"))
+        self.assertIs(rebalance(expr), expr)
+        a, b, c, d = (Variable(name) for name in "abcd")
+        for balanced in (Addition(Addition(a, b), Addition(c, d)), Addition(Addition(a, b), c),
+                         balanced_product([a, b, c, d, Variable("e")]),
+                         Subtraction(Addition(Addition(a, b), c), d)):
+            with self.subTest(expr=str(balanced)):
+                balanced.depth()
+                self.assertIs(rebalance(balanced), balanced)
+                self.assertIn("_depth", balanced.__dict__)
+        self.assertEqual(str(rebalance(Addition(a, Addition(b, c)))), "((a + b) + c)")
+
+    def test_rebalance_deep_chain(self):
+        """Test a chain deeper than the recursion limit gets logarithmic depth."""
+        expr = Variable("a")
+        for _ in range(5000):
+            expr = Addition(expr, Constant(1))
+        balanced = rebalance(expr)
+        self.assertEqual(tree_depth(balanced), 14)
+        self.assertEqual(balanced.interpret(self.context), 5001.0)
+
+    def test_shared_subtrees_are_rebalanced_once(self):
+        """Test a DAG of shared chains is rebalanced in linear time and stays shared."""
+        expr = workloads.shared_subexpressions(60, seed=1, multiplication_rate=0.0)
+        context = workloads.random_context(workloads.variable_names(8), seed=1)
+        balanced = rebalance(expr)
+        # Both expand to 2 ** 60 nodes, so they are evaluated as shared programs.
+        expected = compile_expression(expr).run(context)
+        self.assertAlmostEqual(compile_expression(balanced).run(context), expected,
+                               delta=abs(expected) * 1e-9)
+        shared = Addition(Addition(Variable("a"), Variable("b")), Variable("c"))
+        balanced = rebalance(Addition(Addition(shared, Variable("d")), shared))
+        self.assertIs(balanced.right, balanced.left.left)
+        self.assertEqual(str(balanced.right), str(shared))
+
+    def test_chains_below_other_nodes_are_rebalanced(self):
+        """Test chains below fused nodes and non-associative operations are rebalanced."""
+        chain = Variable("a")
+        for _ in range(5000):
+            chain = Addition(chain, Constant(1))
+        for expr in (MultiplyAdd(Variable("b"), Variable("c"), chain), Subtraction(chain, Variable("d"))):
+            with self.subTest(expr=type(expr).__name__):
+                balanced = rebalance(expr)
+                self.assertIs(type(balanced), type(expr))
+                self.assertLess(tree_depth(balanced), 20)
+                self.assertEqual(compile_expression(balanced).run(self.context),
+                                 compile_expression(expr).run(self.context))
+
+    def test_balanced_builders(self):
+        """Test balanced_sum and balanced_product, including empty operand lists."""
+        operands = [Variable(name) for name in "abcd"]
+        self.assertEqual(str(balanced_sum(operands)), "((a + b) + (c + d))")
+        self.assertEqual(balanced_product(operands).interpret(self.context), 24.0)
+        self.assertEqual(balanced_sum([]).interpret(self.context), 0.0)
+        self.assertEqual(balanced_product([]).interpret(self.context), 1.0)
+        self.assertIs(balanced_sum(operands[:1]), operands[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
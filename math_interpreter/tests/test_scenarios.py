@@ -0,0 +1,97 @@
+"""
+Tests for scenario fan-out evaluation.
+"""
+
+import unittest
+from math_interpreter.context import Context
+from math_interpreter.exceptions import VariableNotDefinedError
+from math_interpreter.expression import Expression
+from math_interpreter.non_terminal_expressions import Addition, Multiplication, Subtraction
+from math_interpreter.scenarios import evaluate_scenarios, scenario_contexts
+from math_interpreter.terminal_expressions import Constant, Variable
+from math_interpreter import workloads
+
+
+class _CountingVariable(Variable):
+    """A variable that counts how often it is read."""
+
+    reads = 0
+
+    def interpret(self, context):
+        type(self).reads += 1
+        return super().interpret(context)
+
+
+class _Negation(Expression):
+    """A user node that does not describe its structure."""
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def interpret(self, context):
+        return -self.operand.interpret(context)
+
+    def __str__(self):
+        return f"-{self.operand}"
+
+
+class TestEvaluateScenarios(unittest.TestCase):
+    """Test cases for evaluate_scenarios."""
+
+    def setUp(self):
+        """Set up a base context for testing."""
+        self.context = Context()
+        self.context.set_variable("x", 2)
+        self.context.set_variable("y", 3)
+        self.context.set_variable("z", 4)
+
+    def test_results_match_per_scenario_interpret(self):
+        """Test each scenario gives the same result as a full evaluation."""
+        expr = Addition(Multiplication(Variable("x"), Variable("y")), Subtraction(Variable("z"), Constant(1)))
+        overrides = [{}, {"x": 10}, {"y": -1, "z": 0}, {"unused": 7}]
+        expected = [expr.interpret(context) for context in scenario_contexts(self.context, overrides)]
+        self.assertEqual(evaluate_scenarios(expr, self.context, overrides), expected)
+        self.assertEqual(expected, [9.0, 33.0, -3.0, 9.0])
+
+    def test_unaffected_subtrees_evaluated_once(self):
+        """Test subtrees that no scenario changes are evaluated once in total."""
+        _CountingVariable.reads = 0
+        expr = Addition(Multiplication(_CountingVariable("y"), _CountingVariable("z")), Variable("x"))
+        results = evaluate_scenarios(expr, self.context, [{"x": value} for value in range(100)])
+        self.assertEqual(results, [12.0 + value for value in range(100)])
+        self.assertEqual(_CountingVariable.reads, 2)
+
+    def test_opaque_nodes_are_evaluated_per_scenario(self):
+        """Test an opaque node is not taken to be independent of the overrides."""
+        expr = Addition(_Negation(Variable("x")), Constant(1))
+        self.assertEqual(evaluate_scenarios(expr, self.context, [{"x": 5}, {"y": 1}]), [-4.0, -1.0])
+
+    def test_base_context_unchanged(self):
+        """Test scenarios do not leak into the base context."""
+        evaluate_scenarios(Variable("x"), self.context, [{"x": 5}])
+        self.assertEqual(self.context.get_variable("x"), 2)
+
+    def test_variable_defined_only_in_scenarios(self):
+        """Test variables missing from the base context can come from overrides."""
+        expr = Addition(Variable("x"), Variable("w"))
+        self.assertEqual(evaluate_scenarios(expr, self.context, [{"w": 1}, {"w": 2}]), [3.0, 4.0])
+        with self.assertRaises(VariableNotDefinedError):
+            evaluate_scenarios(expr, self.context, [{"w": 1}, {}])
+
+    def test_random_trees(self):
+        """Test random trees with shared subtrees against per-scenario evaluation."""
+        expr = workloads.random_tree(400, seed=11, repetition_rate=0.2)
+        names = sorted(expr.free_variables())
+        base = workloads.random_context(names, seed=1)
+        overrides = [{names[0]: float(k), names[-1]: -float(k)} for k in range(8)]
+        expected = [expr.interpret(context) for context in scenario_contexts(base, overrides)]
+        for result, value in zip(evaluate_scenarios(expr, base, overrides), expected):
+            self.assertAlmostEqual(result, value)
+
+    def test_no_scenarios(self):
+        """Test an empty scenario list gives no results."""
+        self.assertEqual(evaluate_scenarios(Variable("x"), self.context, []), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Tests for the flat tree encoding used by pickle.
+"""
+
+import copy
+import pickle
+import unittest
+from math_interpreter.context import Context
+from math_interpreter.expression import Expression
+from math_interpreter.non_terminal_expressions import Addition, Multiplication, Power
+from math_interpreter.serialization import decode_tree, encode_tree
+from math_interpreter.terminal_expressions import Constant, Variable
+from math_interpreter import workloads
+
+
+class Negation(Expression):
+    """A user node with a constructor argument that does not describe its structure."""
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def interpret(self, context):
+        return -self.operand.interpret(context)
+
+    def __str__(self):
+        return f"-{self.operand}"
+
+
+class TestSerialization(unittest.TestCase):
+    """Test cases for encode_tree, decode_tree and pickling of expressions."""
+
+    def setUp(self):
+        """Set up a context for testing."""
+        self.context = Context()
+        self.context.set_variable("x", 3)
+
+    def test_pickle_round_trip(self):
+        """Test a pickled tree renders and evaluates the same."""
+        expr = Addition(Multiplication(Variable("x"), Constant(2.5)), Power(Variable("x"), Constant(2)))
+        restored = pickle.loads(pickle.dumps(expr))
+        self.assertIsNot(restored, expr)
+        self.assertEqual(str(restored), str(expr))
+        self.assertEqual(restored.interpret(self.context), expr.interpret(self.context))
+        self.assertIsInstance(restored.right, Power)
+
+    def test_terminals(self):
+        """Test terminal nodes pickle on their own."""
+        self.assertEqual(pickle.loads(pickle.dumps(Constant(-0.5))).value, -0.5)
+        self.assertEqual(pickle.loads(pickle.dumps(Variable("y"))).name, "y")
+
+    def test_sharing_is_preserved(self):
+        """Test a shared subtree is encoded once and stays shared."""
+        shared = Addition(Variable("x"), Constant(1))
+        expr = Multiplication(shared, shared)
+        classes, codes, payloads, links = encode_tree(expr)
+        self.assertEqual(len(codes), 4)
+        restored = decode_tree(classes, codes, payloads, links)
+        self.assertIs(restored.left, restored.right)
+
+    def test_cached_metadata_not_pickled(self):
+        """Test cached per-node metadata is left out of the payload."""
+        expr = workloads.random_tree(200, seed=2)
+        before = len(pickle.dumps(expr))
+        expr.free_variables()
+        expr.depth()
+        self.assertEqual(len(pickle.dumps(expr)), before)
+
+    def test_user_nodes_pickle_from_their_attributes(self):
+        """Test user nodes without children or _payload pickle alone and inside library trees."""
+        for expr in (Negation(Variable("x")), Addition(Negation(Variable("x")), Constant(1))):
+            with self.subTest(expr=str(expr)):
+                restored = pickle.loads(pickle.dumps(expr))
+                self.assertEqual(str(restored), str(expr))
+                self.assertEqual(restored.interpret(self.context), expr.interpret(self.context))
+
+    def test_deep_chain(self):
+        """Test chains deeper than the recursion limit pickle and copy."""
+        expr = Variable("x")
+        for _ in range(20000):
+            expr = Addition(expr, Constant(1))
+        restored = pickle.loads(pickle.dumps(expr))
+        self.assertEqual(restored.depth(), 20001)
+        self.assertEqual(copy.deepcopy(expr).node_count(), expr.node_count())
+
+
+if __name__ == '__main__':
+    unittest.main()
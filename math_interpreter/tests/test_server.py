@@ -0,0 +1,164 @@
+"""
+Tests for the local evaluation server.
+"""
+
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from math_interpreter.compiler import compile_expression
+from math_interpreter.exceptions import (
+    InvalidExpressionError, VariableNotDefinedError, DivisionByZeroError, EvaluationLimitError,
+)
+from math_interpreter.limits import EvaluationLimits
+from math_interpreter.server import EvaluationService, make_server
+
+
+class TestEvaluationService(unittest.TestCase):
+    """Test cases for registration and micro-batching."""
+
+    def setUp(self):
+        """Start a service with a generous batch window."""
+        self.service = EvaluationService(batch_window=0.05)
+
+    def tearDown(self):
+        """Stop the service."""
+        self.service.close()
+
+    def test_register_is_idempotent(self):
+        """Test the same formula always gets the same id."""
+        first = self.service.register("x * 2 + y")
+        self.assertEqual(self.service.register("(x * 2) + y"), first)
+        self.assertEqual(self.service.formula(first), "((x * 2) + y)")
+
+    def test_register_compiles_outside_the_lock(self):
+        """Test compiling a formula does not block other requests."""
+        service = self.service
+        acquired = []
+
+        class Cache:
+            def get_or_compile(self, expression):
+                def try_lock():
+                    if service._condition.acquire(blocking=False):
+                        acquired.append(True)
+                        service._condition.release()
+                probe = threading.Thread(target=try_lock)
+                probe.start()
+                probe.join()
+                return compile_expression(expression)
+
+        service.cache = Cache()
+        formula_id = service.register("x * 2 + y")
+        self.assertEqual(acquired, [True])
+        self.assertEqual(service.evaluate(formula_id, {"x": 1, "y": 1}), 3.0)
+
+    def test_concurrent_requests_are_batched(self):
+        """Test concurrent requests for one formula are coalesced into one batch."""
+        formula_id = self.service.register("x * 2 + y")
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda i: self.service.evaluate(formula_id, {"x": i, "y": 1}),
+                                    range(8)))
+        self.assertEqual(results, [2.0 * i + 1 for i in range(8)])
+        self.assertEqual(self.service.requests_total, 8)
+        self.assertLess(self.service.batches_total, 8)
+
+    def test_per_request_errors(self):
+        """Test a failing request does not fail the rest of its batch."""
+        formula_id = self.service.register("x / y")
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(self.service.evaluate, formula_id, variables)
+                       for variables in ({"x": 1, "y": 2}, {"x": 1, "y": 0}, {"x": 1})]
+        self.assertEqual(futures[0].result(), 0.5)
+        self.assertIsInstance(futures[1].exception(), DivisionByZeroError)
+        self.assertIsInstance(futures[2].exception(), VariableNotDefinedError)
+        self.assertEqual(self.service.errors_total, 2)
+
+    def test_bad_values_do_not_stop_the_batcher(self):
+        """Test a request that fails outside the interpreter leaves later requests working."""
+        formula_id = self.service.register("x * 2")
+        with self.assertRaises(TypeError):
+            self.service.evaluate(formula_id, {"x": "a"}, timeout=5)
+        self.assertEqual(self.service.evaluate(formula_id, {"x": 3}, timeout=5), 6.0)
+
+    def test_unknown_formula(self):
+        """Test evaluating an unknown id raises an error."""
+        with self.assertRaises(InvalidExpressionError):
+            self.service.evaluate("missing", {})
+
+    def test_limits_reject_large_formulas(self):
+        """Test formulas exceeding the service limits are rejected at registration."""
+        service = EvaluationService(batch_window=0.0, limits=EvaluationLimits(max_depth=3))
+        try:
+            self.assertTrue(service.register("x * 2 + y"))
+            with self.assertRaises(EvaluationLimitError):
+                service.register("((x + 1) * 2) + y")
+        finally:
+            service.close()
+
+    def test_metrics_text(self):
+        """Test metrics are rendered in Prometheus text format."""
+        formula_id = self.service.register("x + 1")
+        self.service.evaluate(formula_id, {"x": 1})
+        text = self.service.metrics_text()
+        self.assertIn("math_interpreter_requests_total 1", text)
+        self.assertIn('math_interpreter_request_latency_seconds_bucket{le="+Inf"} 1', text)
+
+
+class TestHttpServer(unittest.TestCase):
+    """Test cases for the JSON-over-HTTP endpoint on localhost."""
+
+    def setUp(self):
+        """Start a server on a free localhost port."""
+        self.server = make_server("127.0.0.1", 0, EvaluationService(batch_window=0.001))
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.server.service.close()
+
+    def _post(self, path, payload):
+        request = Request(self.base + path, data=json.dumps(payload).encode("utf-8"),
+                          headers={"Content-Type": "application/json"})
+        with urlopen(request, timeout=5) as response:
+            return json.loads(response.read())
+
+    def test_register_and_evaluate(self):
+        """Test a formula can be registered and evaluated over HTTP."""
+        formula_id = self._post("/formulas", {"formula": "a * b + 1"})["id"]
+        result = self._post("/evaluate", {"id": formula_id, "variables": {"a": 2, "b": 3}})
+        self.assertEqual(result, {"result": 7.0})
+
+    def test_errors(self):
+        """Test malformed formulas and failed evaluations return error statuses."""
+        with self.assertRaises(HTTPError) as caught:
+            self._post("/formulas", {"formula": "a +"})
+        self.assertEqual(caught.exception.code, 422)
+        with self.assertRaises(HTTPError) as caught:
+            self._post("/evaluate", {})
+        self.assertEqual(caught.exception.code, 400)
+
+    def test_bad_request_then_good_request(self):
+        """Test non-numeric variable values are rejected and the server keeps answering."""
+        formula_id = self._post("/formulas", {"formula": "x * 2"})["id"]
+        for variables in ({"x": "a"}, {"x": True}, {"x": None}):
+            with self.subTest(variables=variables):
+                with self.assertRaises(HTTPError) as caught:
+                    self._post("/evaluate", {"id": formula_id, "variables": variables})
+                self.assertEqual(caught.exception.code, 400)
+        self.assertEqual(self._post("/evaluate", {"id": formula_id, "variables": {"x": 4}}),
+                         {"result": 8.0})
+
+    def test_metrics_endpoint(self):
+        """Test the metrics endpoint serves Prometheus text."""
+        with urlopen(self.base + "/metrics", timeout=5) as response:
+            self.assertIn(b"math_interpreter_requests_total", response.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Tests for short-circuit evaluation.
+"""
+
+import math
+import unittest
+from math_interpreter.context import Context
+from math_interpreter.exceptions import DivisionByZeroError, VariableNotDefinedError
+from math_interpreter.non_terminal_expressions import Addition, Division, Multiplication, Subtraction
+from math_interpreter.shortcircuit import ShortCircuitEvaluator, magnitude_bound
+from math_interpreter.terminal_expressions import Constant, Variable
+from math_interpreter import workloads
+
+
+class TestShortCircuitEvaluator(unittest.TestCase):
+    """Test cases for ShortCircuitEvaluator."""
+
+    def setUp(self):
+        """Set up a context with a zero weight and an evaluator."""
+        self.context = Context()
+        self.context.set_variable("w", 0)
+        self.context.set_variable("x", 5)
+        self.context.set_variable("y", 3)
+        self.evaluator = ShortCircuitEvaluator()
+
+    def test_zero_factor_skips_other_operand(self):
+        """Test the expensive operand of a product with a zero factor is skipped."""
+        expensive = Addition(Multiplication(Variable("x"), Variable("y")), Subtraction(Variable("x"), Constant(1)))
+        expr = Multiplication(expensive, Variable("w"))
+        self.assertEqual(self.evaluator.evaluate(expr, self.context), 0.0)
+        self.assertEqual(self.evaluator.short_circuits, 1)
+        self.assertEqual(self.evaluator.skipped_nodes, 7)
+        self.assertEqual(self.evaluator.evaluated_nodes, 2)
+
+    def test_nonzero_factor_evaluates_both(self):
+        """Test results match interpret when nothing can be skipped."""
+        expr = Addition(Multiplication(Variable("x"), Variable("y")), Subtraction(Variable("x"), Constant(1)))
+        self.assertEqual(self.evaluator.evaluate(expr, self.context), expr.interpret(self.context))
+        self.assertEqual(self.evaluator.skipped_nodes, 0)
+        self.assertEqual(self.evaluator.evaluated_nodes, expr.node_count())
+
+    def test_non_finite_operand_is_not_skipped(self):
+        """Test operands that may give inf or NaN are always evaluated."""
+        self.context.set_variable("big", math.inf)
+        expr = Multiplication(Variable("w"), Variable("big"))
+        self.assertTrue(math.isnan(self.evaluator.evaluate(expr, self.context)))
+        self.assertEqual(self.evaluator.short_circuits, 0)
+
+    def test_errors_are_not_hidden(self):
+        """Test operands that would raise are evaluated and raise."""
+        with self.assertRaises(DivisionByZeroError):
+            self.evaluator.evaluate(Multiplication(Variable("w"), Division(Variable("x"), Variable("w"))),
+                                    self.context)
+        with self.assertRaises(VariableNotDefinedError):
+            self.evaluator.evaluate(Multiplication(Variable("w"), Variable("missing")), self.context)
+
+    def test_overflowing_operand_is_not_skipped(self):
+        """Test operands that overflow from finite values are evaluated."""
+        self.context.set_variable("big", 1e200)
+        big = Variable("big")
+        overflowing = Subtraction(Multiplication(big, big), Multiplication(big, big))
+        expr = Multiplication(Constant(0), overflowing)
+        self.assertTrue(math.isnan(self.evaluator.evaluate(expr, self.context)))
+        self.assertEqual(self.evaluator.short_circuits, 0)
+        self.context.set_variable("big", 1e100)
+        self.assertEqual(self.evaluator.evaluate(expr, self.context), 0.0)
+        self.assertEqual(self.evaluator.short_circuits, 1)
+
+    def test_magnitude_bound(self):
+        """Test the static magnitude analysis."""
+        x = Variable("x")
+        self.assertEqual(magnitude_bound(Addition(Multiplication(x, x), Constant(-2))), (3.0, 2))
+        self.assertEqual(magnitude_bound(Subtraction(x, Multiplication(Constant(3), x))), (4.0, 1))
+        self.assertIsNone(magnitude_bound(Addition(x, Constant(math.inf))))
+        self.assertIsNone(magnitude_bound(Division(x, Constant(2))))
+
+    def test_matches_interpret_on_random_trees(self):
+        """Test random sparse trees give the same results as interpret."""
+        expr = workloads.random_tree(500, seed=3, multiplication_rate=0.6, constant_rate=0.3)
+        for seed in range(5):
+            context = workloads.random_context(sorted(expr.free_variables()), seed=seed)
+            context.set_variable(sorted(expr.free_variables())[0], 0)
+            self.assertAlmostEqual(self.evaluator.evaluate(expr, context), expr.interpret(context))
+
+    def test_deep_tree(self):
+        """Test trees deeper than the recursion limit are evaluated."""
+        expr = Variable("x")
+        for _ in range(5000):
+            expr = Multiplication(Addition(expr, Constant(1)), Constant(1))
+        self.assertEqual(self.evaluator.evaluate(expr, self.context), 5005.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests for evaluation tracing.
+"""
+
+import unittest
+from math_interpreter.context import Context
+from math_interpreter.exceptions import DivisionByZeroError
+from math_interpreter.non_terminal_expressions import Addition
+from math_interpreter.parser import parse
+from math_interpreter.terminal_expressions import Constant, Variable
+from math_interpreter.tracing import Tracer, format_trace
+from math_interpreter import workloads
+
+
+class TestTracer(unittest.TestCase):
+    """Test cases for Tracer and format_trace."""
+
+    def setUp(self):
+        """Set up a context and an expression for testing."""
+        self.context = Context()
+        self.context.set_variable("x", 2)
+        self.context.set_variable("y", 3)
+        self.expr = parse("x * 2 + (y - 1) / x")
+
+    def test_records_every_node_in_preorder(self):
+        """Test each node evaluation is recorded with its depth and value."""
+        tracer = Tracer()
+        self.assertEqual(tracer.evaluate(self.expr, self.context), 5.0)
+        trace = tracer.trace
+        self.assertEqual(len(trace), 9)
+        self.assertEqual(list(trace.depths[:len(trace)]), [0, 1, 2, 2, 1, 2, 3, 3, 2])
+        self.assertEqual(list(trace.values[:3]), [5.0, 4.0, 2.0])
+        self.assertIs(trace.nodes[trace.node_ids[0]], self.expr)
+        # The shared variable node x is recorded twice under one node id.
+        self.assertEqual(trace.node_ids[2], trace.node_ids[8])
+        self.assertGreaterEqual(trace.elapsed[0], trace.elapsed[1])
+
+    def test_sampling(self):
+        """Test only one in N evaluations is traced."""
+        tracer = Tracer(sample_every=4)
+        for _ in range(10):
+            self.assertEqual(tracer.evaluate(self.expr, self.context), 5.0)
+        self.assertEqual(tracer.evaluations, 10)
+        self.assertEqual(tracer.traced, 3)
+
+    def test_capacity(self):
+        """Test records beyond the capacity are dropped, not allocated."""
+        tracer = Tracer(capacity=4)
+        self.assertEqual(tracer.evaluate(self.expr, self.context), 5.0)
+        self.assertEqual(len(tracer.trace), 4)
+        self.assertEqual(tracer.trace.dropped, 5)
+        self.assertIn("5 more node evaluations not shown", format_trace(tracer.trace))
+
+    def test_copy_survives_next_evaluation(self):
+        """Test a copied trace is not overwritten by later evaluations."""
+        tracer = Tracer()
+        tracer.evaluate(self.expr, self.context)
+        kept = tracer.trace.copy()
+        tracer.evaluate(Constant(1), self.context)
+        self.assertEqual(len(kept), 9)
+        self.assertEqual(kept.values[0], 5.0)
+
+    def test_format_trace(self):
+        """Test the formatted trace shows subexpression renderings and values."""
+        tracer = Tracer()
+        tracer.evaluate(self.expr, self.context)
+        lines = format_trace(tracer.trace).splitlines()
+        self.assertTrue(lines[0].startswith(str(self.expr)))
+        self.assertIn("= 5.0", lines[0])
+        self.assertTrue(lines[5].startswith("    (y - 1)"))
+
+    def test_errors_keep_partial_trace(self):
+        """Test a failing evaluation raises and keeps the records made so far."""
+        tracer = Tracer()
+        with self.assertRaises(DivisionByZeroError):
+            tracer.evaluate(parse("x / (y - 3)"), self.context)
+        self.assertEqual(len(tracer.trace), 5)
+
+    def test_deep_and_random_trees(self):
+        """Test traced results match interpret, also beyond the recursion limit."""
+        expr = workloads.random_tree(300, seed=8)
+        context = workloads.random_context(sorted(expr.free_variables()), seed=1)
+        self.assertEqual(Tracer().evaluate(expr, context), expr.interpret(context))
+        chain = Variable("x")
+        for _ in range(5000):
+            chain = Addition(chain, Constant(1))
+        tracer = Tracer()
+        self.assertEqual(tracer.evaluate(chain, self.context), 5002.0)
+        self.assertEqual(len(format_trace(tracer.trace, limit=None).splitlines()), 10001)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Tests for the seeded workload generators.
+"""
+
+import unittest
+from math_interpreter import workloads
+from math_interpreter.compiler import compile_expression
+from math_interpreter.non_terminal_expressions import Addition, Multiplication
+
+
+def _shape(expr):
+    """Return (depth, node count) of the expanded tree, without recursion."""
+    depth = 0
+    count = 0
+    stack = [(expr, 1)]
+    while stack:
+        node, level = stack.pop()
+        depth = max(depth, level)
+        count += 1
+        if isinstance(node, (Addition, Multiplication)):
+            stack.append((node.left, level + 1))
+            stack.append((node.right, level + 1))
+    return depth, count
+
+
+class TestWorkloads(unittest.TestCase):
+    """Test cases for the workload generators."""
+
+    def test_left_chain_depth_equals_length(self):
+        """Test a left chain is as deep as it is long."""
+        self.assertEqual(_shape(workloads.left_chain(50, seed=1)), (50, 99))
+
+    def test_deep_chain_without_recursion(self):
+        """Test chains deeper than the recursion limit can be generated."""
+        chain = workloads.left_chain(20000, seed=1)
+        self.assertIsInstance(chain, (Addition, Multiplication))
+
+    def test_balanced_tree_depth(self):
+        """Test a balanced tree has logarithmic depth."""
+        self.assertEqual(_shape(workloads.balanced_tree(1024, seed=1)), (11, 2047))
+
+    def test_wide_sum(self):
+        """Test a wide sum is shallow and has one product per term."""
+        depth, count = _shape(workloads.wide_sum(100, seed=1))
+        self.assertEqual(count, 100 * 3 + 99)
+        self.assertLessEqual(depth, 9)
+
+    def test_shared_subexpressions(self):
+        """Test the shared DAG has few distinct nodes but a huge expansion."""
+        expr = workloads.shared_subexpressions(12, seed=1)
+        self.assertLess(len(compile_expression(expr, optimize=False)), 40)
+        self.assertGreater(_shape(expr)[1], 2 ** 12)
+
+    def test_random_tree_size_and_depth(self):
+        """Test random trees have the requested size and respect max_depth."""
+        for max_depth in (None, 11, 15):
+            for repetition_rate in (0.0, 0.3):
+                expr = workloads.random_tree(2001, max_depth=max_depth,
+                                             repetition_rate=repetition_rate, seed=7)
+                depth, count = _shape(expr)
+                self.assertEqual(count, 2001)
+                if max_depth is not None:
+                    self.assertLessEqual(depth, max_depth)
+
+    def test_random_tree_repetition_shares_nodes(self):
+        """Test a repetition rate produces shared subtrees."""
+        plain = workloads.random_tree(2001, repetition_rate=0.0, seed=7)
+        shared = workloads.random_tree(2001, repetition_rate=0.5, seed=7)
+        self.assertLess(len(compile_expression(shared, optimize=False)),
+                        len(compile_expression(plain, optimize=False)))
+
+    def test_random_tree_rejects_impossible_depth(self):
+        """Test max_depth too small for the size raises an error."""
+        with self.assertRaises(ValueError):
+            workloads.random_tree(2001, max_depth=10)
+
+    def test_seeded_generation_is_reproducible(self):
+        """Test the same seed produces the same tree."""
+        first = workloads.random_tree(301, variable_count=20, seed=3)
+        second = workloads.random_tree(301, variable_count=20, seed=3)
+        self.assertEqual(str(first), str(second))
+
+    def test_matching_data(self):
+        """Test generated contexts and columns cover the generated variables."""
+        names = workloads.variable_names(5)
+        expr = workloads.random_tree(101, variable_count=5, seed=3)
+        context = workloads.random_context(names, seed=3)
+        self.assertEqual(compile_expression(expr).run(context), expr.interpret(context))
+
+        columns = workloads.random_columns(names, 10, seed=3)
+        self.assertEqual(sorted(columns), names)
+        self.assertTrue(all(len(column) == 10 for column in columns.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
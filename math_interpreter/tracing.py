@@ -0,0 +1,195 @@
+"""
+Evaluation tracing for the Math Interpreter.
+
+A Tracer evaluates expressions like interpret and records, for every node
+evaluation, the node, its depth, its value and the time spent in it into
+flat arrays allocated once up front. With sampling, only every N-th
+evaluation is traced and the others run through plain interpret, so a
+tracer can stay attached to live traffic. format_trace lays a trace out as
+an indented tree next to the rendering of each subexpression.
+"""
+
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from math_interpreter.metrics import instrumented
+from math_interpreter.non_terminal_expressions import BinaryOperation
+
+
+DEFAULT_CAPACITY = 65536
+
+
+class Trace:
+    """
+    The records of one traced evaluation, in the order the nodes were entered.
+
+    Record i describes nodes[node_ids[i]] at depth depths[i], which evaluated
+    to values[i] in elapsed[i] seconds, including the time of its operands.
+    A trace is overwritten by the next evaluation its tracer records; use
+    copy to keep it.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Allocate the record arrays.
+
+        Args:
+            capacity: The maximum number of records.
+        """
+        self.capacity = capacity
+        self.node_ids = array('I', bytes(4 * capacity))
+        self.depths = array('I', bytes(4 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.elapsed = array('d', bytes(8 * capacity))
+        self.nodes: List = []
+        self.length = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def copy(self) -> 'Trace':
+        """
+        Copy the records into a new trace of exactly their size.
+
+        Returns:
+            Trace: The copy.
+        """
+        trace = Trace(self.length)
+        trace.node_ids[:] = self.node_ids[:self.length]
+        trace.depths[:] = self.depths[:self.length]
+        trace.values[:] = self.values[:self.length]
+        trace.elapsed[:] = self.elapsed[:self.length]
+        trace.nodes = list(self.nodes)
+        trace.length = self.length
+        trace.dropped = self.dropped
+        return trace
+
+
+class Tracer:
+    """
+    Evaluates expressions and traces every sample_every-th evaluation.
+
+    A tracer must not be shared between threads.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, sample_every: int = 1):
+        """
+        Initialize a tracer and allocate its trace buffer.
+
+        Args:
+            capacity: The maximum number of node evaluations recorded per trace;
+                further evaluations are counted as dropped.
+            sample_every: Trace one in this many evaluations.
+        """
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+        self.sample_every = sample_every
+        self.trace = Trace(capacity)
+        self.evaluations = 0
+        self.traced = 0
+
+    @instrumented
+    def evaluate(self, expression, context) -> float:
+        """
+        Evaluate an expression, tracing it if this evaluation is sampled.
+
+        Args:
+            expression: The expression to evaluate.
+            context: The context containing variable definitions.
+
+        Returns:
+            float: The result, as interpret returns it.
+        """
+        self.evaluations += 1
+        if (self.evaluations - 1) % self.sample_every:
+            return expression.interpret(context)
+        self.traced += 1
+        return self._traced(expression, context)
+
+    def _traced(self, expression, context) -> float:
+        trace = self.trace
+        capacity = trace.capacity
+        node_ids, depths, values, elapsed = trace.node_ids, trace.depths, trace.values, trace.elapsed
+        nodes: List = []
+        index_of: Dict[int, int] = {}
+        clock = time.perf_counter
+        results = []
+        count = 0
+        stack = [(expression, 0, None)]
+        try:
+            while stack:
+                node, depth, entered = stack.pop()
+                if entered is None:
+                    slot = count
+                    count += 1
+                    if slot < capacity:
+                        index = index_of.get(id(node))
+                        if index is None:
+                            index = index_of[id(node)] = len(nodes)
+                            nodes.append(node)
+                        node_ids[slot] = index
+                        depths[slot] = depth
+                    started = clock()
+                    if isinstance(node, BinaryOperation):
+                        stack.append((node, depth, (slot, started)))
+                        stack.append((node.right, depth + 1, None))
+                        stack.append((node.left, depth + 1, None))
+                        continue
+                    value = node.interpret(context)
+                else:
+                    slot, started = entered
+                    right = results.pop()
+                    value = node.operator.scalar(results.pop(), right)
+                if slot < capacity:
+                    values[slot] = value
+                    elapsed[slot] = clock() - started
+                results.append(value)
+        finally:
+            trace.nodes = nodes
+            trace.length = min(count, capacity)
+            trace.dropped = max(count - capacity, 0)
+        return results[0]
+
+
+def format_trace(trace: Trace, limit: Optional[int] = 200, width: int = 60) -> str:
+    """
+    Lay out a trace as an indented tree of subexpressions with their values and times.
+
+    Each line shows the rendering of the subexpression as __str__ gives it,
+    shortened to the operator for subexpressions too long to show in full.
+
+    Args:
+        trace: The trace to format.
+        limit: The maximum number of records shown, or None for all.
+        width: The maximum length of a rendered subexpression.
+
+    Returns:
+        str: One line per record.
+    """
+    shown = trace.length if limit is None else min(limit, trace.length)
+    lines = []
+    for record in range(shown):
+        node = trace.nodes[trace.node_ids[record]]
+        indent = '  ' * trace.depths[record]
+        label = _label(node, width - len(indent))
+        lines.append(f"{indent + label:<{width}}  = {trace.values[record]!r:<24}"
+                     f"{trace.elapsed[record] * 1e6:>10.2f} us")
+    hidden = trace.length - shown + trace.dropped
+    if hidden:
+        lines.append(f"... {hidden} more node evaluations not shown")
+    return "\n".join(lines)
+
+
+def _label(node, width: int) -> str:
+    # Rendering is recursive and its size grows with the subtree, so only
+    # small subtrees are rendered in full.
+    if node.node_count() <= max(width // 2, 1):
+        text = str(node)
+        if len(text) <= width:
+            return text
+    operator = getattr(node, 'operator', None)
+    if operator is not None:
+        return operator.render('…', '…')
+    return f"{type(node).__name__}(…)"
@@ -0,0 +1,311 @@
+"""
+Seeded workload generators for the Math Interpreter.
+
+These functions build realistic and pathological Constant, Variable,
+Addition and Multiplication trees for sizing and benchmarking, together
+with matching random Context or column data. Every generator is iterative,
+so trees far deeper than the recursion limit can be produced, and every
+generator takes a seed so workloads are reproducible.
+"""
+
+import random
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+from math_interpreter.context import Context
+from math_interpreter.non_terminal_expressions import Addition, Multiplication
+from math_interpreter.rebalance import combine_pairwise
+from math_interpreter.terminal_expressions import Constant, Variable
+
+
+def variable_names(count: int) -> List[str]:
+    """
+    Get the variable names used by the generators.
+
+    Args:
+        count: The number of variables.
+
+    Returns:
+        List[str]: The names x0, x1, ..., in order.
+    """
+    return [f"x{index}" for index in range(count)]
+
+
+class _LeafFactory:
+    """
+    Produces random leaves and binary nodes from one random generator.
+    """
+
+    def __init__(self, rng, variable_count, constant_rate, multiplication_rate):
+        if variable_count < 1 and constant_rate < 1:
+            raise ValueError("variable_count must be positive unless every leaf is a constant")
+        self.rng = rng
+        self.constant_rate = constant_rate
+        self.multiplication_rate = multiplication_rate
+        # Variables are interned so each name is one node, as a parser would do.
+        self.variables = [Variable(name) for name in variable_names(variable_count)]
+
+    def leaf(self):
+        rng = self.rng
+        if not self.variables or rng.random() < self.constant_rate:
+            return Constant(rng.randint(-9, 9))
+        return self.variables[rng.randrange(len(self.variables))]
+
+    def combine(self, left, right):
+        if self.rng.random() < self.multiplication_rate:
+            return Multiplication(left, right)
+        return Addition(left, right)
+
+
+def left_chain(length: int, variable_count: int = 8, seed: Optional[int] = None,
+               constant_rate: float = 0.3, multiplication_rate: float = 0.5):
+    """
+    Build a left-deep chain such as ((((a + b) * c) + d) ...).
+
+    This is the shape produced by folding a list of operands, and its depth
+    equals its length.
+
+    Args:
+        length: The number of leaves.
+        variable_count: The number of distinct variables.
+        seed: The random seed.
+        constant_rate: The probability that a leaf is a constant.
+        multiplication_rate: The probability that a node is a multiplication.
+
+    Returns:
+        Expression: The generated tree.
+    """
+    if length < 1:
+        raise ValueError("length must be positive")
+    factory = _LeafFactory(random.Random(seed), variable_count, constant_rate, multiplication_rate)
+    tree = factory.leaf()
+    for _ in range(length - 1):
+        tree = factory.combine(tree, factory.leaf())
+    return tree
+
+
+def balanced_tree(leaves: int, variable_count: int = 8, seed: Optional[int] = None,
+                  constant_rate: float = 0.3, multiplication_rate: float = 0.5):
+    """
+    Build a balanced tree whose depth is logarithmic in its number of leaves.
+
+    Args:
+        leaves: The number of leaves.
+        variable_count: The number of distinct variables.
+        seed: The random seed.
+        constant_rate: The probability that a leaf is a constant.
+        multiplication_rate: The probability that a node is a multiplication.
+
+    Returns:
+        Expression: The generated tree.
+    """
+    if leaves < 1:
+        raise ValueError("leaves must be positive")
+    factory = _LeafFactory(random.Random(seed), variable_count, constant_rate, multiplication_rate)
+    return combine_pairwise([factory.leaf() for _ in range(leaves)], factory.combine)
+
+
+def wide_sum(terms: int, variable_count: int = 8, seed: Optional[int] = None):
+    """
+    Build a wide, shallow sum of coefficient * variable terms.
+
+    Args:
+        terms: The number of terms.
+        variable_count: The number of distinct variables.
+        seed: The random seed.
+
+    Returns:
+        Expression: The generated tree.
+    """
+    if terms < 1:
+        raise ValueError("terms must be positive")
+    rng = random.Random(seed)
+    variables = [Variable(name) for name in variable_names(variable_count)]
+    products = [
+        Multiplication(Constant(rng.randint(-9, 9)), variables[rng.randrange(variable_count)])
+        for _ in range(terms)
+    ]
+    return combine_pairwise(products, Addition)
+
+
+def shared_subexpressions(levels: int, variable_count: int = 8, seed: Optional[int] = None,
+                          multiplication_rate: float = 0.5):
+    """
+    Build a DAG in which every level uses the previous level twice.
+
+    The result has about 2 * levels distinct nodes but expands to a tree of
+    more than 2 ** levels nodes, which is pathological for evaluators that
+    do not share work between identical subtrees.
+
+    Args:
+        levels: The number of levels.
+        variable_count: The number of distinct variables.
+        seed: The random seed.
+        multiplication_rate: The probability that a level is a multiplication.
+
+    Returns:
+        Expression: The generated tree.
+    """
+    factory = _LeafFactory(random.Random(seed), variable_count, 0.0, multiplication_rate)
+    tree = factory.leaf()
+    for _ in range(levels):
+        tree = factory.combine(tree, factory.combine(tree, factory.leaf()))
+    return tree
+
+
+def random_tree(size: int, max_depth: Optional[int] = None, variable_count: int = 8,
+                repetition_rate: float = 0.0, seed: Optional[int] = None,
+                constant_rate: float = 0.3, multiplication_rate: float = 0.5):
+    """
+    Build a random tree with a controllable size, depth and amount of sharing.
+
+    The tree is grown top-down by splitting the number of leaves of every
+    subtree at a random point, within the bounds that still let both halves
+    fit under max_depth. With probability repetition_rate a subtree is
+    replaced by an already built one, so the result is a DAG with shared
+    subexpressions and fewer distinct nodes than its size.
+
+    Args:
+        size: The number of nodes in the tree, counting shared subtrees once
+            per use. Even sizes are rounded up to the next odd number.
+        max_depth: The maximum depth of the tree, where a leaf has depth 1,
+            or None for no limit.
+        variable_count: The number of distinct variables.
+        repetition_rate: The probability that a subtree reuses a built one.
+        seed: The random seed.
+        constant_rate: The probability that a fresh leaf is a constant.
+        multiplication_rate: The probability that a node is a multiplication.
+
+    Returns:
+        Expression: The generated tree.
+
+    Raises:
+        ValueError: If max_depth is too small to hold a tree of this size.
+    """
+    if size < 1:
+        raise ValueError("size must be positive")
+    leaves = (size + 1) // 2
+    if max_depth is not None and max_depth < 1 + (leaves - 1).bit_length():
+        raise ValueError(f"max_depth {max_depth} is too small for {size} nodes")
+
+    rng = random.Random(seed)
+    factory = _LeafFactory(rng, variable_count, constant_rate, multiplication_rate)
+    built: List = []
+    built_depths = array('l')
+    built_leaves = array('q')
+    results: List = []
+    depths = array('l')
+    counts = array('q')
+    # Frames are (leaves, depth budget, children done).
+    stack = [(leaves, max_depth if max_depth is not None else -1, False)]
+
+    while stack:
+        n, budget, done = stack.pop()
+        if done:
+            right, left = results.pop(), results.pop()
+            depth = max(depths.pop(), depths.pop()) + 1
+            count = counts.pop() + counts.pop()
+            node = factory.combine(left, right)
+            results.append(node)
+            depths.append(depth)
+            counts.append(count)
+            built.append(node)
+            built_depths.append(depth)
+            built_leaves.append(count)
+            continue
+        low, high = 1, n - 1
+        child_budget = -1
+        if budget >= 0:
+            # Each child has budget - 1 levels and can hold 2 ** (budget - 2) leaves.
+            capacity = 1 << (budget - 2) if budget >= 2 else 0
+            low, high = max(low, n - capacity), min(high, capacity)
+            child_budget = budget - 1
+        if built and n > 1 and rng.random() < repetition_rate:
+            # Reuse a built subtree as the whole slot, or as its left child
+            # with a fresh right child making up the remaining leaves.
+            index = rng.randrange(len(built))
+            reused = built_leaves[index]
+            reused_depth = built_depths[index]
+            if reused == n and (budget < 0 or reused_depth <= budget):
+                results.append(built[index])
+                depths.append(reused_depth)
+                counts.append(reused)
+                continue
+            if low <= reused <= high and (budget < 0 or reused_depth <= child_budget):
+                results.append(built[index])
+                depths.append(reused_depth)
+                counts.append(reused)
+                stack.append((n, budget, True))
+                stack.append((n - reused, child_budget, False))
+                continue
+        if n == 1:
+            results.append(factory.leaf())
+            depths.append(1)
+            counts.append(1)
+            continue
+        split = rng.randint(low, high)
+        stack.append((n, budget, True))
+        stack.append((n - split, child_budget, False))
+        stack.append((split, child_budget, False))
+
+    return results[0]
+
+
+def random_values(names: Sequence[str], seed: Optional[int] = None,
+                  low: float = -10.0, high: float = 10.0) -> Dict[str, float]:
+    """
+    Draw one random value per variable name.
+
+    Args:
+        names: The variable names.
+        seed: The random seed.
+        low: The lower bound of the values.
+        high: The upper bound of the values.
+
+    Returns:
+        Dict[str, float]: The values by name.
+    """
+    rng = random.Random(seed)
+    return {name: rng.uniform(low, high) for name in names}
+
+
+def random_context(names: Sequence[str], seed: Optional[int] = None,
+                   low: float = -10.0, high: float = 10.0) -> Context:
+    """
+    Build a context with one random value per variable name.
+
+    Args:
+        names: The variable names.
+        seed: The random seed.
+        low: The lower bound of the values.
+        high: The upper bound of the values.
+
+    Returns:
+        Context: The populated context.
+    """
+    context = Context()
+    for name, value in random_values(names, seed, low, high).items():
+        context.set_variable(name, value)
+    return context
+
+
+def random_columns(names: Sequence[str], rows: int, seed: Optional[int] = None,
+                   low: float = -10.0, high: float = 10.0) -> Dict[str, array]:
+    """
+    Build one random float64 column per variable name.
+
+    The result can be written to a ColumnStore with ColumnStore.write.
+
+    Args:
+        names: The variable names.
+        rows: The number of rows per column.
+        seed: The random seed.
+        low: The lower bound of the values.
+        high: The upper bound of the values.
+
+    Returns:
+        Dict[str, array]: The columns by name.
+    """
+    rng = random.Random(seed)
+    uniform = rng.uniform
+    return {name: array('d', (uniform(low, high) for _ in range(rows))) for name in names}